@@ -0,0 +1,97 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+import cv2
+import numpy as np
+from memory_usage import peak_rss_mb
+from pose_backend import create_backend, tracked_keypoints, BACKENDS, YOLO_MODEL_PATH
+
+# --- Benchmark Configuration ---
+BENCHMARK_FRAMES = 300
+WARMUP_FRAMES = 5
+
+
+def run_backend(name, video, frames, model_path, onnx_path=None, threads=0):
+    """Tracks poses through the video with one backend, timing every frame. Returns a result dict."""
+    baseline_mb = peak_rss_mb()
+    backend = create_backend(name, model_path=model_path, onnx_path=onnx_path, threads=threads)
+    cap = cv2.VideoCapture(video)
+    latencies, people = [], 0
+    for index in range(frames + WARMUP_FRAMES):
+        success, frame = cap.read()
+        if not success:
+            break
+        start = time.perf_counter()
+        result = backend.track(frame)
+        elapsed = time.perf_counter() - start
+        if index >= WARMUP_FRAMES:
+            latencies.append(elapsed)
+            track_ids, _ = tracked_keypoints(result)
+            people += 0 if track_ids is None else len(track_ids)
+    cap.release()
+
+    if not latencies:
+        raise IOError(f"Could not read more than {WARMUP_FRAMES} frames from '{video}'.")
+    timed = np.array(latencies) * 1000
+    peak_mb = peak_rss_mb()
+    return {
+        "backend": name,
+        "frames": len(timed),
+        "fps": 1000 / timed.mean(),
+        "p50_ms": float(np.percentile(timed, 50)),
+        "p95_ms": float(np.percentile(timed, 95)),
+        "p99_ms": float(np.percentile(timed, 99)),
+        "peak_mb": peak_mb,
+        "model_mb": peak_mb - baseline_mb if peak_mb is not None else None,
+        "people_per_frame": people / len(timed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pose backends on the same recorded video.")
+    parser.add_argument("video", help="Recorded classroom video")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS),
+                        help="Backends to compare (default: all)")
+    parser.add_argument("--frames", type=int, default=BENCHMARK_FRAMES,
+                        help=f"Timed frames per backend (default: {BENCHMARK_FRAMES})")
+    parser.add_argument("--model", default=YOLO_MODEL_PATH, help=f"YOLO weights (default: {YOLO_MODEL_PATH})")
+    parser.add_argument("--onnx-model", help="Exported model for the onnx backend (default: the weights' name with .onnx)")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime threads, 0 for all cores (default: 0)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # Child process: one backend, result as JSON on stdout
+        print(json.dumps(run_backend(args.backends[0], args.video, args.frames, args.model, args.onnx_model,
+                                     args.threads)))
+        return
+
+    # Each backend runs in its own process so peak memory is not shared between them
+    rows = []
+    for name in args.backends:
+        command = [sys.executable, __file__, args.video, "--worker", "--backends", name,
+                   "--frames", str(args.frames), "--model", args.model, "--threads", str(args.threads)]
+        if args.onnx_model:
+            command += ["--onnx-model", args.onnx_model]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"{name}: failed\n{completed.stderr.strip()}")
+            continue
+        rows.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    print(f"{'backend':>10} {'frames':>7} {'fps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'peak MB':>8} {'people':>7}")
+    for row in rows:
+        print(f"{row['backend']:>10} {row['frames']:>7} {row['fps']:>8.1f} {row['p50_ms']:>8.1f} "
+              f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+              f"{row['peak_mb'] if row['peak_mb'] is not None else float('nan'):>8.0f} {row['people_per_frame']:>7.1f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import time
+import numpy as np
+from classifier import classify_keypoints, classify_person
+
+# --- Benchmark Configuration ---
+PEOPLE_COUNTS = [1, 2, 5, 10, 20, 40, 60, 100, 150, 200]
+NUM_KEYPOINTS = 17
+FRAME_WIDTH, FRAME_HEIGHT = 1280, 720
+
+
+def random_keypoints(num_people, rng):
+    """Generates plausible (num_people, 17, 3) float32 keypoints covering all rule branches."""
+    kp = np.empty((num_people, NUM_KEYPOINTS, 3), dtype=np.float32)
+    kp[:, :, 0] = rng.uniform(0, FRAME_WIDTH, (num_people, NUM_KEYPOINTS))
+    kp[:, :, 1] = rng.uniform(0, FRAME_HEIGHT, (num_people, NUM_KEYPOINTS))
+    kp[:, :, 2] = rng.uniform(0.2, 1.0, (num_people, NUM_KEYPOINTS))
+    return kp
+
+
+def time_call(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-person loop vs vectorized classifier microbenchmark.")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed calls per people count (default: 200)")
+    parser.add_argument("--torch", action="store_true",
+                        help="Feed the per-person loop torch tensors, as main.py used to")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    print(f"{'people':>7} {'loop (us)':>12} {'vectorized (us)':>16} {'speedup':>9}  match")
+    for num_people in PEOPLE_COUNTS:
+        keypoints = random_keypoints(num_people, rng)
+        loop_input = keypoints
+        if args.torch:
+            import torch
+            loop_input = torch.from_numpy(keypoints)
+
+        def run_loop():
+            return [classify_person(loop_input[i]) for i in range(num_people)]
+
+        def run_vectorized():
+            return classify_keypoints(keypoints)
+
+        match = np.array_equal(np.array(run_loop(), dtype=np.int8), run_vectorized())
+        loop_secs = time_call(run_loop, args.repeats)
+        vec_secs = time_call(run_vectorized, args.repeats)
+        print(f"{num_people:>7} {loop_secs * 1e6:>12.1f} {vec_secs * 1e6:>16.1f} "
+              f"{loop_secs / vec_secs:>8.1f}x  {'yes' if match else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import time
+import cv2
+import numpy as np
+from dashboard import DashboardRenderer
+
+# --- Benchmark Configuration ---
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "4K": (3840, 2160)}
+STATS_CHANGE_EVERY = 15 # Frames between changes in the student counts, roughly twice a second
+# Largest per-channel difference from the original drawing. Written against OpenCV 4.x,
+# where text is aliased and the renderer reproduces it exactly (0); OpenCV 5.x
+# anti-aliases text and blended edge pixels may round differently (at most 1).
+MAX_PIXEL_DIFF = 1
+
+
+def legacy_draw_dashboard(frame, stats):
+    """The original full-frame implementation (without alert timing), kept for comparison."""
+    total_students = stats.get("total_students", 0)
+    attentive_count = stats.get("attentive_count", 0)
+    inattentive_count = stats.get("inattentive_count", 0)
+    writing_count = stats.get("writing_count", 0)
+    sleeping_count = stats.get("sleeping_count", 0)
+    total_attentive = attentive_count + writing_count
+    attentiveness_percentage = (total_attentive / total_students) * 100 if total_students > 0 else 0
+
+    overlay = frame.copy()
+    panel_x, panel_y, panel_w, panel_h = 20, 20, 350, 210
+    cv2.rectangle(overlay, (panel_x, panel_y), (panel_x + panel_w, panel_y + panel_h), (0, 0, 0), -1)
+    alpha = 0.6
+    annotated_frame = cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0)
+
+    cv2.putText(annotated_frame, f"Total Students: {total_students}", (40, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    cv2.putText(annotated_frame, f"Attentive: {attentive_count}", (40, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+    cv2.putText(annotated_frame, f"Writing: {writing_count}", (40, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+    cv2.putText(annotated_frame, f"Inattentive: {inattentive_count}", (40, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+    cv2.putText(annotated_frame, f"Sleeping: {sleeping_count}", (40, 180), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (128, 0, 128), 2)
+    cv2.putText(annotated_frame, f"Engagement: {attentiveness_percentage:.1f}%", (40, 210), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 0), 2)
+    return annotated_frame
+
+
+def make_stats(frame_index):
+    step = frame_index // STATS_CHANGE_EVERY
+    attentive = 20 + step % 7
+    return {
+        "total_students": 40, "attentive_count": attentive, "writing_count": 5,
+        "inattentive_count": 15 - step % 7, "sleeping_count": 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame dashboard cost at common resolutions.")
+    parser.add_argument("--frames", type=int, default=300, help="Frames drawn per resolution (default: 300)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"OpenCV {cv2.__version__}")
+    print(f"{'resolution':>10} {'legacy (ms)':>12} {'renderer (ms)':>14} {'speedup':>9}  max diff  match")
+    for name, (width, height) in RESOLUTIONS.items():
+        source = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        frame = source.copy()
+        renderer = DashboardRenderer()
+
+        # Both paths should produce the same pixels when no alert is showing
+        expected = legacy_draw_dashboard(source, make_stats(0)).astype(np.int16)
+        max_diff = int(np.abs(renderer.draw(source.copy(), make_stats(0), now=0.0) - expected).max())
+
+        start = time.perf_counter()
+        for i in range(args.frames):
+            legacy_draw_dashboard(source, make_stats(i))
+        legacy_ms = (time.perf_counter() - start) * 1000 / args.frames
+
+        start = time.perf_counter()
+        for i in range(args.frames):
+            renderer.draw(frame, make_stats(i), now=float(i))
+        renderer_ms = (time.perf_counter() - start) * 1000 / args.frames
+
+        print(f"{name:>10} {legacy_ms:>12.3f} {renderer_ms:>14.3f} {legacy_ms / renderer_ms:>8.1f}x  "
+              f"{max_diff:>8}  {'yes' if max_diff <= MAX_PIXEL_DIFF else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from keypoint_dataset import KeypointDatasetWriter, load_keypoint_dataset, export_csv
+
+# --- Benchmark Configuration ---
+NUM_SAMPLES = 100_000
+NUM_KEYPOINTS = 17
+CHUNK_SIZE = 1000 # Samples per write, like a data_processor batch
+LABELS = ['ATTENTIVE', 'INATTENTIVE', 'SLEEPING']
+
+
+def dir_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the CSV and binary keypoint dataset formats.")
+    parser.add_argument("--samples", type=int, default=NUM_SAMPLES, help=f"Samples to generate (default: {NUM_SAMPLES})")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    keypoints = rng.uniform(0, 640, (args.samples, NUM_KEYPOINTS, 3)).astype(np.float32)
+    keypoints[:, :, 2] /= 640
+    labels = rng.choice(LABELS, args.samples).tolist()
+    sources = [f"train/images/img_{i:06d}.jpg" for i in range(args.samples)]
+
+    workdir = tempfile.mkdtemp(prefix="kpds_bench_")
+    try:
+        dataset_path = os.path.join(workdir, "bench.kpds")
+        csv_path = os.path.join(workdir, "bench.csv")
+
+        start = time.perf_counter()
+        writer = KeypointDatasetWriter(dataset_path)
+        for i in range(0, args.samples, CHUNK_SIZE):
+            writer.write(labels[i:i + CHUNK_SIZE], keypoints[i:i + CHUNK_SIZE], sources[i:i + CHUNK_SIZE])
+            writer.flush()
+        writer.close()
+        binary_write = time.perf_counter() - start
+
+        # Same 33-keypoint header as data_processor.py writes, so pandas has to fill the gaps
+        start = time.perf_counter()
+        export_csv(load_keypoint_dataset(dataset_path), csv_path, header_keypoints=33)
+        csv_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        df = pd.read_csv(csv_path)
+        df.fillna(0, inplace=True)
+        X_csv = df.drop('label', axis=1).to_numpy(dtype=np.float32)
+        csv_load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dataset = load_keypoint_dataset(dataset_path)
+        X_bin = np.asarray(dataset.feature_matrix()) # Force every page in, for a fair comparison
+        X_bin.sum()
+        binary_load = time.perf_counter() - start
+
+        match = np.array_equal(X_csv[:, :NUM_KEYPOINTS * 3], X_bin) and (df['label'].to_numpy() == dataset.label_names).all()
+
+        print(f"Samples: {args.samples} x {NUM_KEYPOINTS} keypoints")
+        print(f"{'format':>8} {'size (MB)':>10} {'write (s)':>10} {'load (s)':>10}")
+        print(f"{'csv':>8} {dir_size(csv_path) / 1e6:>10.1f} {csv_write:>10.2f} {csv_load:>10.3f}")
+        print(f"{'binary':>8} {dir_size(dataset_path) / 1e6:>10.1f} {binary_write:>10.2f} {binary_load:>10.3f}")
+        print(f"Load speedup: {csv_load / binary_load:.1f}x | contents identical: {'yes' if match else 'NO'}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
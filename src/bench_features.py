@@ -0,0 +1,34 @@
+import argparse
+import time
+import numpy as np
+from features import pose_features, NUM_FEATURES, NUM_KEYPOINTS
+
+# --- Benchmark Configuration ---
+BATCH_SIZES = [1, 10, 60, 200, 1000, 10000, 100000]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the vectorized pose feature transform.")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds spent timing each batch size (default: 0.5)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{NUM_KEYPOINTS} keypoints -> {NUM_FEATURES} features per pose")
+    print(f"{'poses':>8} {'per call (us)':>14} {'poses per ms':>14}")
+    for batch_size in BATCH_SIZES:
+        keypoints = np.empty((batch_size, NUM_KEYPOINTS, 3), dtype=np.float32)
+        keypoints[:, :, :2] = rng.uniform(0, 1280, (batch_size, NUM_KEYPOINTS, 2))
+        keypoints[:, :, 2] = rng.uniform(0.2, 1.0, (batch_size, NUM_KEYPOINTS))
+
+        pose_features(keypoints) # Warm-up
+        calls = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.min_time:
+            pose_features(keypoints)
+            calls += 1
+        per_call = (time.perf_counter() - start) / calls
+        print(f"{batch_size:>8} {per_call * 1e6:>14.1f} {batch_size / (per_call * 1000):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import os
+import time
+import joblib
+import numpy as np
+from forest_engine import load_compiled_forest
+from model_trainer import MODEL_FILE, compiled_forest_path, export_forest
+
+# --- Benchmark Configuration ---
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+
+def time_call(fn, repeats):
+    fn() # Warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call latency of the compiled forest vs scikit-learn predict.")
+    parser.add_argument("--model", default=MODEL_FILE, help=f"Trained joblib model (default: {MODEL_FILE})")
+    parser.add_argument("--repeats", type=int, default=100, help="Timed calls per batch size (default: 100)")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    forest_path = compiled_forest_path(args.model)
+    if not os.path.isfile(forest_path):
+        export_forest(model, forest_path)
+    engine = load_compiled_forest(forest_path)
+
+    # Plausible keypoint features: pixel coordinates with confidences in every third column
+    rng = np.random.default_rng(0)
+    pool = rng.uniform(0, 640, (max(BATCH_SIZES), model.n_features_in_)).astype(np.float32)
+    pool[:, 2::3] /= 640
+
+    print(f"{engine.n_estimators} trees, {len(engine.feature)} nodes, max depth {engine.max_depth}")
+    print(f"{'batch':>6} {'sklearn (ms)':>13} {'compiled (ms)':>14} {'speedup':>9}  match")
+    for batch_size in BATCH_SIZES:
+        X = pool[:batch_size]
+        match = np.array_equal(engine.predict(X), np.asarray(model.predict(X)).astype(str))
+        sklearn_secs = time_call(lambda: model.predict(X), args.repeats)
+        engine_secs = time_call(lambda: engine.predict(X), args.repeats)
+        print(f"{batch_size:>6} {sklearn_secs * 1000:>13.3f} {engine_secs * 1000:>14.3f} "
+              f"{sklearn_secs / engine_secs:>8.1f}x  {'yes' if match else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import time
+import cv2
+import mediapipe as mp
+from pose_detector import PoseDetector
+
+# --- Benchmark Configuration ---
+BENCHMARK_FRAMES = 200
+REPEATS = 20 # Extraction passes over the recorded results, so the per-frame figures are stable
+
+mp_pose = mp.solutions.pose
+
+
+def legacy_convert(frame):
+    """The old cam_integration_mp.py colour handling: BGR->RGB for MediaPipe, then back again."""
+    image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
+
+
+def legacy_extract(results, h, w):
+    """The old per-landmark Python path: a list of 33 dicts plus find_position()'s [id, cx, cy] list."""
+    all_landmarks_data = []
+    lm_list = []
+    for id, landmark in enumerate(results.pose_landmarks.landmark):
+        all_landmarks_data.append({
+            'id': id,
+            'name': mp_pose.PoseLandmark(id).name,
+            'x': landmark.x,
+            'y': landmark.y,
+            'z': landmark.z,
+            'visibility': landmark.visibility
+        })
+        lm_list.append([id, int(landmark.x * w), int(landmark.y * h)])
+    return all_landmarks_data, lm_list
+
+
+def time_per_frame(function, items, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for item in items:
+            function(item)
+    return (time.perf_counter() - start) / (repeats * len(items)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame overhead of PoseDetector's landmark arrays "
+                                                 "versus the old list-of-dicts path.")
+    parser.add_argument("video", help="Recorded video with a person in view")
+    parser.add_argument("--frames", type=int, default=BENCHMARK_FRAMES,
+                        help=f"Frames to run MediaPipe on (default: {BENCHMARK_FRAMES})")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help=f"Timing passes (default: {REPEATS})")
+    args = parser.parse_args()
+
+    # --- Run MediaPipe once and keep every frame's results; only the overhead around it is timed ---
+    detector = PoseDetector()
+    frames, recorded = [], []
+    for _, landmarks, frame in detector.stream(args.video):
+        if landmarks is not None:
+            frames.append(frame)
+            recorded.append(detector.results)
+        if len(frames) >= args.frames:
+            break
+    if not recorded:
+        raise IOError(f"No pose found in the first frames of '{args.video}'.")
+    h, w = frames[0].shape[:2]
+
+    def new_extract(results):
+        detector.results = results
+        detector._fill_landmarks(h, w)
+
+    rows = [
+        ("colour, old (2 conversions)", time_per_frame(legacy_convert, frames, args.repeats)),
+        ("colour, new (1 into buffer)", time_per_frame(detector._to_rgb, frames, args.repeats)),
+        ("landmarks, old (33 dicts)", time_per_frame(lambda r: legacy_extract(r, h, w), recorded, args.repeats)),
+        ("landmarks, new ((33, 4) array)", time_per_frame(new_extract, recorded, args.repeats)),
+    ]
+    print(f"{len(recorded)} frames of {w}x{h} with a pose")
+    print(f"{'step':>32} {'us/frame':>10}")
+    for name, micros in rows:
+        print(f"{name:>32} {micros:>10.1f}")
+    old_total, new_total = rows[0][1] + rows[2][1], rows[1][1] + rows[3][1]
+    print(f"{'total overhead':>32} {old_total:>10.1f} -> {new_total:.1f} ({old_total / new_total:.1f}x less)")
+    detector.close()
+
+
+if __name__ == "__main__":
+    main()
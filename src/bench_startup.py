@@ -0,0 +1,68 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from pose_backend import BACKENDS
+
+# --- Benchmark Configuration ---
+BENCHMARK_RUNS = 5
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def run_once(video, backend, warmup, report_file):
+    """Starts main.py headless on the video until its first classified frame. Returns its startup report."""
+    command = [sys.executable, MAIN_SCRIPT, "--source", video, "--headless", "--port", "0",
+               "--backend", backend, "--warmup", str(warmup), "--stats-interval", "0",
+               "--startup-report", report_file, "--exit-after-first-frame"]
+    start = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True)
+    wall_secs = time.perf_counter() - start
+    if completed.returncode != 0 or not os.path.isfile(report_file):
+        raise RuntimeError(f"main.py failed:\n{completed.stderr.strip()}")
+    with open(report_file) as f:
+        report = json.load(f)
+    os.remove(report_file)
+    report["milestones"]["process exit"] = wall_secs
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time from process start to the first classified frame of main.py.")
+    parser.add_argument("video", help="Recorded classroom video standing in for the camera")
+    parser.add_argument("--runs", type=int, default=BENCHMARK_RUNS,
+                        help=f"Fresh processes per configuration (default: {BENCHMARK_RUNS})")
+    parser.add_argument("--backend", choices=BACKENDS, default='yolo', help="Pose engine (default: yolo)")
+    parser.add_argument("--warmup", type=int, nargs="+", default=[0, 1],
+                        help="Warm-up inference counts to compare (default: 0 1)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for warmup in args.warmup:
+            reports = [run_once(args.video, args.backend, warmup, os.path.join(directory, f"startup_{run}.json"))
+                       for run in range(args.runs)]
+            row = {"backend": args.backend, "warmup": warmup, "runs": len(reports), "phases": {}, "milestones": {}}
+            for section in ("phases", "milestones"):
+                for name in reports[0][section]:
+                    values = [report[section][name] for report in reports if name in report[section]]
+                    row[section][name] = {"median_s": round(float(np.median(values)), 3),
+                                          "max_s": round(float(np.max(values)), 3)}
+            rows.append(row)
+
+    for row in rows:
+        print(f"\n--- {row['backend']}, {row['warmup']} warm-up inference(s), {row['runs']} runs (median / max) ---")
+        for section in ("phases", "milestones"):
+            for name, value in row[section].items():
+                print(f"{name:>16} {value['median_s']:>8.2f} s {value['max_s']:>8.2f} s")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import time
+import cv2
+import numpy as np
+from ultralytics import YOLO
+from main import MODEL_PATH
+from tiled_inference import TiledPoseDetector, make_layout, parse_roi, TILE_SIZE, TILE_OVERLAP, MERGE_IOU
+
+# --- Benchmark Configuration ---
+BENCHMARK_FRAMES = 100
+
+
+def match_count(boxes_a, boxes_b, iou_threshold=MERGE_IOU):
+    """Number of boxes in boxes_a overlapping some box in boxes_b by at least iou_threshold."""
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return 0
+    a, b = boxes_a[:, None, :], boxes_b[None, :, :]
+    iw = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    ih = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = iw * ih
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    iou = inter / np.maximum(area_a + area_b - inter, 1e-6)
+    return int((iou.max(axis=1) >= iou_threshold).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detections recovered by tiled inference vs time per frame.")
+    parser.add_argument("video", help="Recorded classroom video")
+    parser.add_argument("--frames", type=int, default=BENCHMARK_FRAMES,
+                        help=f"Frames to process (default: {BENCHMARK_FRAMES})")
+    parser.add_argument("--model", default=MODEL_PATH, help=f"Pose model weights (default: {MODEL_PATH})")
+    parser.add_argument("--roi", action="append", type=parse_roi, metavar="X0,Y0,X1,Y1",
+                        help="Seating region to tile, as fractions of the frame; repeat for several regions")
+    parser.add_argument("--tile-sizes", type=int, nargs="+", default=[TILE_SIZE, TILE_SIZE // 2],
+                        help=f"Tile sizes to compare (default: {TILE_SIZE} {TILE_SIZE // 2})")
+    parser.add_argument("--overlap", type=float, default=TILE_OVERLAP,
+                        help=f"Tile overlap (default: {TILE_OVERLAP})")
+    parser.add_argument("--full-frame-tile", action="store_true", help="Add the whole frame as an extra tile")
+    args = parser.parse_args()
+
+    cap = cv2.VideoCapture(args.video)
+    frames = []
+    while len(frames) < args.frames:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise IOError(f"Could not read frames from '{args.video}'.")
+
+    model = YOLO(args.model)
+    height, width = frames[0].shape[:2]
+    model.predict(frames[0], verbose=False) # Warm-up
+
+    # --- Baseline: the whole frame at the model's input size ---
+    baseline = []
+    start = time.perf_counter()
+    for frame in frames:
+        baseline.append(model.predict(frame, verbose=False)[0].boxes.xyxy.cpu().numpy())
+    baseline_ms = (time.perf_counter() - start) / len(frames) * 1000
+    baseline_count = sum(len(b) for b in baseline) / len(frames)
+
+    print(f"{len(frames)} frames of {width}x{height}")
+    print(f"{'mode':>16} {'tiles':>6} {'ms/frame':>10} {'people':>8} {'recovered':>10} {'lost':>6}")
+    print(f"{'full frame':>16} {1:>6} {baseline_ms:>10.1f} {baseline_count:>8.1f} {'-':>10} {'-':>6}")
+
+    for tile_size in args.tile_sizes:
+        layout = make_layout(width, height, args.roi, tile_size, args.overlap, args.full_frame_tile)
+        detector = TiledPoseDetector(model, layout)
+        detector.detect(frames[0]) # Warm-up at this batch size
+
+        found, recovered, lost = 0, 0, 0
+        start = time.perf_counter()
+        tiled = [detector.detect(frame).boxes.xyxy.cpu().numpy() for frame in frames]
+        tiled_ms = (time.perf_counter() - start) / len(frames) * 1000
+        for boxes, full in zip(tiled, baseline):
+            found += len(boxes)
+            recovered += len(boxes) - match_count(boxes, full) # People the full frame missed
+            lost += len(full) - match_count(full, boxes) # People only the full frame found
+        n = len(frames)
+        print(f"{f'tiles {tile_size}px':>16} {len(layout['tiles']):>6} {tiled_ms:>10.1f} {found / n:>8.1f} "
+              f"{recovered / n:>10.1f} {lost / n:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import numpy as np
+
+# --- Keypoint IDs (COCO order used by YOLOv8-Pose) ---
+NOSE, L_SHOULDER, R_SHOULDER, L_WRIST, R_WRIST, L_HIP, R_HIP = 0, 5, 6, 9, 10, 11, 12
+
+# --- Rule Configuration ---
+CONF_THRESHOLD = 0.5
+HEAD_RAISED_MARGIN_PX = 10 # Nose must be at least this far above the shoulder line
+
+# --- Status Codes ---
+# Statuses are carried around as small integers so a whole frame fits in one array.
+ATTENTIVE, WRITING, INATTENTIVE, SLEEPING = 0, 1, 2, 3
+STATUS_NAMES = ("ATTENTIVE", "WRITING", "INATTENTIVE", "SLEEPING")
+NUM_STATUSES = len(STATUS_NAMES)
+
+
+def to_numpy(keypoints):
+    """
+    Converts a keypoint array (NumPy array or torch tensor, e.g. results[0].keypoints.data)
+    to a float32 NumPy array with a single device transfer.
+    """
+    if hasattr(keypoints, "cpu"):
+        keypoints = keypoints.cpu().numpy()
+    return np.asarray(keypoints, dtype=np.float32)
+
+
+def classify_keypoints(keypoints, conf_threshold=CONF_THRESHOLD):
+    """
+    Applies the posture rules to every person in a frame at once.
+
+    Args:
+        keypoints: Array of shape (num_people, num_keypoints, 3) holding x, y and
+            confidence for each keypoint.
+        conf_threshold: Minimum confidence for a keypoint to be used.
+
+    Returns:
+        An int8 array of shape (num_people,) with ATTENTIVE, WRITING or INATTENTIVE
+        for each person. SLEEPING depends on history and is decided by the caller.
+    """
+    kp = to_numpy(keypoints)
+    num_people = kp.shape[0]
+    status = np.full(num_people, INATTENTIVE, dtype=np.int8)
+    if num_people == 0:
+        return status
+
+    y = kp[:, :, 1]
+    confident = kp[:, :, 2] > conf_threshold
+
+    shoulder_avg_y = (y[:, L_SHOULDER] + y[:, R_SHOULDER]) / 2
+    hip_avg_y = (y[:, L_HIP] + y[:, R_HIP]) / 2
+
+    # Head raised above the shoulders -> ATTENTIVE
+    upper_body_visible = confident[:, NOSE] & confident[:, L_SHOULDER] & confident[:, R_SHOULDER]
+    attentive = upper_body_visible & (y[:, NOSE] < shoulder_avg_y - HEAD_RAISED_MARGIN_PX)
+
+    # Otherwise, a wrist between the shoulder and hip lines -> WRITING
+    torso_visible = confident[:, L_HIP] & confident[:, R_HIP] & (confident[:, L_WRIST] | confident[:, R_WRIST])
+    left_wrist_in_area = (shoulder_avg_y < y[:, L_WRIST]) & (y[:, L_WRIST] < hip_avg_y)
+    right_wrist_in_area = (shoulder_avg_y < y[:, R_WRIST]) & (y[:, R_WRIST] < hip_avg_y)
+    writing = upper_body_visible & ~attentive & torso_visible & (left_wrist_in_area | right_wrist_in_area)
+
+    status[attentive] = ATTENTIVE
+    status[writing] = WRITING
+    return status
+
+
+def classify_person(person_keypoints, conf_threshold=CONF_THRESHOLD):
+    """
+    Reference implementation of the rules for a single person, kept for parity
+    checks against classify_keypoints().
+
+    Returns:
+        One of ATTENTIVE, WRITING or INATTENTIVE.
+    """
+    status = INATTENTIVE
+
+    nose_y, nose_conf = person_keypoints[NOSE][1], person_keypoints[NOSE][2]
+    l_sh_y, l_sh_conf = person_keypoints[L_SHOULDER][1], person_keypoints[L_SHOULDER][2]
+    r_sh_y, r_sh_conf = person_keypoints[R_SHOULDER][1], person_keypoints[R_SHOULDER][2]
+    l_wrist_y, l_wrist_conf = person_keypoints[L_WRIST][1], person_keypoints[L_WRIST][2]
+    r_wrist_y, r_wrist_conf = person_keypoints[R_WRIST][1], person_keypoints[R_WRIST][2]
+    l_hip_y, l_hip_conf = person_keypoints[L_HIP][1], person_keypoints[L_HIP][2]
+    r_hip_y, r_hip_conf = person_keypoints[R_HIP][1], person_keypoints[R_HIP][2]
+
+    if nose_conf > conf_threshold and l_sh_conf > conf_threshold and r_sh_conf > conf_threshold:
+        shoulder_avg_y = (l_sh_y + r_sh_y) / 2
+        if nose_y < shoulder_avg_y - HEAD_RAISED_MARGIN_PX:
+            status = ATTENTIVE
+        else:
+            if l_hip_conf > conf_threshold and r_hip_conf > conf_threshold and (l_wrist_conf > conf_threshold or r_wrist_conf > conf_threshold):
+                hip_avg_y = (l_hip_y + r_hip_y) / 2
+                left_wrist_in_area = shoulder_avg_y < l_wrist_y < hip_avg_y
+                right_wrist_in_area = shoulder_avg_y < r_wrist_y < hip_avg_y
+                if left_wrist_in_area or right_wrist_in_area:
+                    status = WRITING
+    return status
+
+
+def count_statuses(status):
+    """Returns the number of people in each status as an array indexed by status code."""
+    return np.bincount(status, minlength=NUM_STATUSES)
+
+
+class RuleClassifier:
+    """The hand-written posture rules, behind the same interface as LearnedClassifier."""
+    def __init__(self, conf_threshold=CONF_THRESHOLD):
+        self.conf_threshold = conf_threshold
+
+    def classify(self, keypoints, track_ids, track_states):
+        return classify_keypoints(keypoints, self.conf_threshold)
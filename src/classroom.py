@@ -0,0 +1,118 @@
+import time
+from classifier import RuleClassifier, count_statuses, ATTENTIVE, WRITING, INATTENTIVE, SLEEPING
+from dashboard import DashboardRenderer
+from instrumentation import metrics
+from pipeline import LatencyWindow
+from pose_backend import tracked_keypoints
+from session import SessionStats, LOG_FILE, timeline_path, recover_sessions
+from track_state import TrackStateStore, TRACK_TTL_SECS
+
+
+CLASSIFIER_TYPES = ('rules', 'learned')
+
+
+def classifier_factory(kind='rules', model_path=None, predict_every=1):
+    """
+    Returns a function creating one classifier per stream. The learned model is loaded
+    only once here and shared by every classifier the function creates.
+    """
+    if kind == 'rules':
+        return RuleClassifier
+
+    from learned_classifier import LearnedClassifier, load_model, default_model_path
+    model_path = model_path or default_model_path()
+    model = load_model(model_path)
+    print(f"Loaded attentiveness model from {model_path} ({model.n_features_in_} features).")
+    return lambda: LearnedClassifier(model, predict_every)
+
+
+def empty_stats():
+    """Returns the dashboard stats for a frame with nobody in it."""
+    return {
+        "total_students": 0, "attentive_count": 0, "inattentive_count": 0,
+        "writing_count": 0, "sleeping_count": 0
+    }
+
+
+class ClassroomStream:
+    """
+    Everything that belongs to one camera: its track history, session totals,
+    dashboard and log file. The single-camera and multi-camera loops both feed
+    tracked pose results into one of these per stream.
+    """
+    def __init__(self, name="camera", log_file=LOG_FILE, track_ttl_secs=TRACK_TTL_SECS, classifier=None,
+                 status_filter=None, record_timeline=True):
+        self.name = name
+        self.log_file = log_file
+        self.classifier = classifier if classifier is not None else RuleClassifier()
+        self.classifier_latency = LatencyWindow(f"classifier:{name}")
+        self.track_states = TrackStateStore(ttl_secs=track_ttl_secs, status_filter=status_filter)
+        if record_timeline:
+            recovered = recover_sessions(log_file)
+            if recovered:
+                print(f"Recovered {recovered} unfinished session(s) into {log_file}")
+        self.session = SessionStats(timeline_file=timeline_path(log_file) if record_timeline else None)
+        self.dashboard = DashboardRenderer()
+        self.track_ids = () # Tracks and statuses of the last classified frame
+        self.statuses = ()
+
+    def classify(self, result, now=None):
+        """
+        Classifies every tracked person in a YOLO result and updates the session totals.
+
+        Args:
+            result: The tracked poses of one frame: an ultralytics Results object from
+                model.track(), or a PoseFrame from another pose backend.
+            now: Timestamp of the frame, defaults to time.time().
+
+        Returns:
+            A dictionary containing the student counts for the dashboard.
+        """
+        stats = empty_stats()
+        now = time.time() if now is None else now
+        self.track_ids, self.statuses = (), ()
+
+        # --- CLASSIFICATION LOGIC ---
+        track_ids, keypoints = tracked_keypoints(result)
+        if track_ids is not None:
+            stats["total_students"] = len(track_ids)
+
+            # One classifier call for all people, then a bulk update of the per-track history
+            classify_start = time.perf_counter()
+            statuses = self.classifier.classify(keypoints, track_ids, self.track_states)
+            classify_secs = time.perf_counter() - classify_start
+            self.classifier_latency.add(classify_secs)
+            metrics.record("classify", classify_secs)
+            with metrics.span("track_state"):
+                statuses = self.track_states.update(track_ids, statuses, now)
+            self.track_ids, self.statuses = track_ids, statuses
+
+            counts = count_statuses(statuses)
+            stats["attentive_count"] = int(counts[ATTENTIVE])
+            stats["writing_count"] = int(counts[WRITING])
+            stats["inattentive_count"] = int(counts[INATTENTIVE])
+            stats["sleeping_count"] = int(counts[SLEEPING])
+
+            self.session.add(stats, now)
+        else:
+            self.session.advance(now) # Nobody in view: the session clock still moves on
+
+        return stats
+
+    def render(self, result, stats, now=None):
+        """Returns the pose-annotated frame with this stream's dashboard drawn on it."""
+        with metrics.span("plot"):
+            frame = result.plot()
+        with metrics.span("dashboard"):
+            return self.dashboard.draw(frame, stats, now)
+
+    def track_report(self):
+        """One-line summary of the track store and classifier latency, printed alongside the pipeline report."""
+        track_stats = self.track_states.stats()
+        return (f"[tracks:{self.name}] {track_stats['active_tracks']} active | {track_stats['evictions']} evicted | "
+                f"{track_stats['memory_bytes'] / 1024:.1f} KiB || {self.classifier_latency.format()}")
+
+    def save_session(self, end_time=None):
+        """Writes the session summary to this stream's log file."""
+        if self.session.save(self.log_file, end_time):
+            print(f"Session summary saved to {self.log_file}")
@@ -6,14 +6,150 @@ import time
 ALERT_ENGAGEMENT_THRESHOLD = 60.0 # Alert if engagement is below 60%
 ALERT_TIME_THRESHOLD_SECS = 60.0 # For 10 consecutive seconds
 
-# --- Alert State Variables ---
-# We track the timer outside the function to maintain state across frames
-low_engagement_start_time = None
-alert_active = False
+# --- Panel Layout ---
+PANEL_X, PANEL_Y, PANEL_W, PANEL_H = 20, 20, 350, 210
+PANEL_ALPHA = 0.6 # Transparency factor
+PANEL_COLOR = (0, 0, 0) # Black
+ALERT_PANEL_COLOR = (0, 0, 128) # Dark red
+
+# (label, stats key, position, color) for each line of text on the panel
+TEXT_FONT = cv2.FONT_HERSHEY_SIMPLEX
+TEXT_SCALE, TEXT_THICKNESS = 0.8, 2
+TEXT_LINE_TYPE = cv2.LINE_8 # Aliased on OpenCV 4.x; 5.x anti-aliases text regardless, see _render_text()
+TEXT_LINES = [
+    ("Total Students", "total_students", (40, 60), (255, 255, 255)),
+    ("Attentive", "attentive_count", (40, 90), (0, 255, 0)),
+    ("Writing", "writing_count", (40, 120), (0, 255, 255)),
+    ("Inattentive", "inattentive_count", (40, 150), (0, 0, 255)),
+    ("Sleeping", "sleeping_count", (40, 180), (128, 0, 128)),
+]
+ENGAGEMENT_LINE = ((40, 210), (255, 255, 0))
+
+
+def engagement_percentage(stats):
+    """Share of students attentive or writing, 0 when nobody is in view."""
+    total_students = stats.get("total_students", 0)
+    total_attentive = stats.get("attentive_count", 0) + stats.get("writing_count", 0)
+    return (total_attentive / total_students) * 100 if total_students > 0 else 0
+
+
+class DashboardRenderer:
+    """
+    Draws the summary dashboard and handles the visual alert system for one camera stream.
+
+    Only the panel region of the frame is touched: it is blended in place, and the
+    text is rendered once into a cached layer that is redrawn only when the numbers
+    on it change.
+    """
+    def __init__(self, engagement_threshold=ALERT_ENGAGEMENT_THRESHOLD,
+                 alert_time_threshold_secs=ALERT_TIME_THRESHOLD_SECS):
+        self.engagement_threshold = engagement_threshold
+        self.alert_time_threshold_secs = alert_time_threshold_secs
+
+        # --- Alert State ---
+        self.low_engagement_start_time = None
+        self.alert_active = False
+
+        # --- Render Caches ---
+        self._panel_fills = {} # {(color, roi_shape): solid panel used for blending}
+        self._text_key = None
+        self._text_layer = None
+        self._text_inverse_alpha = None
+
+    def update_alert(self, attentiveness_percentage, total_students, now):
+        """Advances the low-engagement timer and returns whether the alert is active."""
+        if attentiveness_percentage < self.engagement_threshold and total_students > 0:
+            if self.low_engagement_start_time is None:
+                # If engagement just dropped, start the timer
+                self.low_engagement_start_time = now
+            else:
+                # If timer is running, check if it has exceeded the threshold
+                if now - self.low_engagement_start_time > self.alert_time_threshold_secs:
+                    self.alert_active = True
+        else:
+            # If engagement is good, reset the timer and turn off the alert
+            self.low_engagement_start_time = None
+            self.alert_active = False
+        return self.alert_active
+
+    def _panel_fill(self, color, shape):
+        key = (color, shape)
+        fill = self._panel_fills.get(key)
+        if fill is None:
+            fill = np.empty(shape, dtype=np.uint8)
+            fill[:] = color
+            self._panel_fills[key] = fill
+        return fill
+
+    def _render_text(self, lines, shape):
+        """
+        Renders the panel text onto black, which leaves each pixel's color already scaled
+        by its coverage, plus 255 minus that coverage for compositing. With aliased text
+        the coverage is 0 or 255 and compositing copies the text pixels exactly; with
+        anti-aliased text the edges are blended as putText would blend them.
+        """
+        layer = np.zeros(shape, dtype=np.uint8)
+        mask = np.zeros(shape[:2], dtype=np.uint8)
+        for text, (x, y), color in lines:
+            origin = (x - PANEL_X, y - PANEL_Y)
+            cv2.putText(layer, text, origin, TEXT_FONT, TEXT_SCALE, color, TEXT_THICKNESS, TEXT_LINE_TYPE)
+            cv2.putText(mask, text, origin, TEXT_FONT, TEXT_SCALE, 255, TEXT_THICKNESS, TEXT_LINE_TYPE)
+        self._text_layer = layer
+        self._text_inverse_alpha = cv2.cvtColor(255 - mask, cv2.COLOR_GRAY2BGR)
+
+    def draw(self, frame, stats, now=None):
+        """
+        Draws the dashboard onto the frame in place.
+
+        Args:
+            frame: The video frame to draw on.
+            stats: A dictionary containing the student counts.
+            now: Timestamp used for the alert timer, defaults to time.time().
+
+        Returns:
+            The same frame, with the dashboard drawn on it.
+        """
+        total_students = stats.get("total_students", 0)
+
+        # Calculate overall attentiveness percentage
+        attentiveness_percentage = engagement_percentage(stats)
+
+        # --- Visual Alert Logic ---
+        alert_active = self.update_alert(attentiveness_percentage, total_students,
+                                         time.time() if now is None else now)
+        panel_color = ALERT_PANEL_COLOR if alert_active else PANEL_COLOR
+
+        # The filled rectangle includes its far corner, hence the +1
+        frame_h, frame_w = frame.shape[:2]
+        x1, y1 = min(PANEL_X + PANEL_W + 1, frame_w), min(PANEL_Y + PANEL_H + 1, frame_h)
+        if x1 <= PANEL_X or y1 <= PANEL_Y:
+            return frame
+        roi = frame[PANEL_Y:y1, PANEL_X:x1]
+
+        # Blend only the panel region, writing straight back into the frame
+        cv2.addWeighted(self._panel_fill(panel_color, roi.shape), PANEL_ALPHA, roi, 1 - PANEL_ALPHA, 0, dst=roi)
+
+        # Re-render the text layer only if what it says has changed
+        lines = [(f"{label}: {stats.get(key, 0)}", position, color) for label, key, position, color in TEXT_LINES]
+        lines.append((f"Engagement: {attentiveness_percentage:.1f}%",) + ENGAGEMENT_LINE)
+        text_key = (tuple(text for text, _, _ in lines), roi.shape)
+        if text_key != self._text_key:
+            self._render_text(lines, roi.shape)
+            self._text_key = text_key
+        cv2.multiply(roi, self._text_inverse_alpha, dst=roi, scale=1 / 255)
+        cv2.add(roi, self._text_layer, dst=roi)
+
+        return frame
+
+
+# --- Default Renderer ---
+# Kept so single-stream callers can still use the plain function
+_default_renderer = DashboardRenderer()
+
 
 def draw_dashboard(frame, stats):
     """
-    Draws the summary dashboard and handles the visual alert system.
+    Draws the summary dashboard on the frame in place using a shared default renderer.
 
     Args:
         frame: The video frame to draw on.
@@ -22,50 +158,4 @@ def draw_dashboard(frame, stats):
     Returns:
         The frame with the dashboard drawn on it.
     """
-    global low_engagement_start_time, alert_active
-    
-    # Extract stats from the dictionary
-    total_students = stats.get("total_students", 0)
-    attentive_count = stats.get("attentive_count", 0)
-    inattentive_count = stats.get("inattentive_count", 0)
-    writing_count = stats.get("writing_count", 0)
-    sleeping_count = stats.get("sleeping_count", 0)
-
-    # Calculate overall attentiveness percentage
-    total_attentive = attentive_count + writing_count
-    attentiveness_percentage = (total_attentive / total_students) * 100 if total_students > 0 else 0
-
-    # --- Visual Alert Logic ---
-    current_time = time.time()
-    if attentiveness_percentage < ALERT_ENGAGEMENT_THRESHOLD and total_students > 0:
-        if low_engagement_start_time is None:
-            # If engagement just dropped, start the timer
-            low_engagement_start_time = current_time
-        else:
-            # If timer is running, check if it has exceeded the threshold
-            if current_time - low_engagement_start_time > ALERT_TIME_THRESHOLD_SECS:
-                alert_active = True
-    else:
-        # If engagement is good, reset the timer and turn off the alert
-        low_engagement_start_time = None
-        alert_active = False
-
-    # Determine panel color based on the alert status
-    panel_color = (0, 0, 128) if alert_active else (0, 0, 0) # Dark red if alert, black otherwise
-
-    # Create a semi-transparent panel for the dashboard
-    overlay = frame.copy()
-    panel_x, panel_y, panel_w, panel_h = 20, 20, 350, 210
-    cv2.rectangle(overlay, (panel_x, panel_y), (panel_x + panel_w, panel_y + panel_h), panel_color, -1)
-    alpha = 0.6 # Transparency factor
-    annotated_frame = cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0)
-
-    # Display the summary text on the panel
-    cv2.putText(annotated_frame, f"Total Students: {total_students}", (40, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-    cv2.putText(annotated_frame, f"Attentive: {attentive_count}", (40, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-    cv2.putText(annotated_frame, f"Writing: {writing_count}", (40, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-    cv2.putText(annotated_frame, f"Inattentive: {inattentive_count}", (40, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-    cv2.putText(annotated_frame, f"Sleeping: {sleeping_count}", (40, 180), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (128, 0, 128), 2)
-    cv2.putText(annotated_frame, f"Engagement: {attentiveness_percentage:.1f}%", (40, 210), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 0), 2)
-
-    return annotated_frame
+    return _default_renderer.draw(frame, stats)
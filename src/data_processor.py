@@ -1,15 +1,24 @@
 import cv2
-from ultralytics import YOLO
+import argparse
 import csv
 import os
+import time
 import numpy as np
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
+from keypoint_dataset import KeypointDatasetWriter, DATASET_SUFFIX
+from features import pose_features, FEATURE_NAMES, FEATURE_SETS
+from pose_backend import create_backend, BACKENDS, PROVIDERS, NUM_KEYPOINTS
 
 # --- CONFIGURATION ---
-DATASET_PATH = "C:/Users/S.Arjun/Downloads/student behavior.v15i.yolov8"
 OUTPUT_CSV_FILE = os.path.join('data', 'classroom_actions.csv')
-os.makedirs('data', exist_ok=True)
+OUTPUT_DATASET = os.path.join('data', 'classroom_actions' + DATASET_SUFFIX)
+OUTPUT_FORMATS = ('binary', 'csv')
+MODEL_PATH = 'yolov8n-pose.pt'
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_WORKERS = os.cpu_count() or 4
+PREFETCH_BATCHES = 2 # Batches decoded ahead of the model, per worker
 
 # --- LABEL MAPPING ---
 LABEL_MAPPING = {
@@ -19,77 +28,289 @@ LABEL_MAPPING = {
     'down': 'SLEEPING'
 }
 
-# --- SCRIPT ---
-model = YOLO('yolov8n-pose.pt')
+# Every pose backend emits the 17-keypoint COCO skeleton (see pose_backend.py)
+HEADER = ['label'] + [f'kp_{i}_{v}' for i in range(NUM_KEYPOINTS) for v in ['x', 'y', 'conf']]
+POSE_FEATURES_HEADER = ['label'] + FEATURE_NAMES
 
-try:
-    with open(os.path.join(DATASET_PATH, 'data.yaml'), 'r') as f:
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract pose keypoints from a labelled YOLOv8 dataset export.")
+    parser.add_argument("--dataset", required=True, help="Root of the Roboflow YOLOv8 export (contains data.yaml)")
+    parser.add_argument("--backend", choices=BACKENDS, default='yolo',
+                        help="Pose engine used to extract keypoints (default: yolo)")
+    parser.add_argument("--onnx-model", help="Exported model for --backend onnx (default: the weights' name with .onnx)")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="ONNX Runtime threads for --backend onnx, 0 for all cores (default: 0)")
+    parser.add_argument("--onnx-provider", choices=PROVIDERS, default='cpu',
+                        help="ONNX Runtime execution provider for --backend onnx (default: cpu)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default='binary',
+                        help="'binary' writes a memory-mappable keypoint dataset directory, "
+                             "'csv' the classic text table (default: binary)")
+    parser.add_argument("--features", choices=FEATURE_SETS, default='raw',
+                        help="CSV only: 'raw' writes pixel keypoints, 'pose' the body-relative features from "
+                             "features.py. Binary datasets always keep the raw keypoints (default: raw)")
+    parser.add_argument("--output", help=f"Output path (default: {OUTPUT_DATASET} or {OUTPUT_CSV_FILE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Threads decoding images (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Images per pose inference call (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--resume", action="store_true",
+                        help="Append to an existing output and skip images listed in its checkpoint manifest")
+    return parser.parse_args()
+
+
+def load_class_names(dataset_path):
+    with open(os.path.join(dataset_path, 'data.yaml'), 'r') as f:
         data_yaml = yaml.safe_load(f)
-    class_names = data_yaml['names']
-    print("--- Found Labels in data.yaml ---")
-    print(class_names)
-    print("---------------------------------")
-except Exception as e:
-    print(f"ERROR: Could not read data.yaml. Please check the DATASET_PATH: {e}")
-    exit()
-
-header = ['label'] + [f'kp_{i}_{v}' for i in range(33) for v in ['x', 'y', 'conf']]
-with open(OUTPUT_CSV_FILE, 'w', newline='') as f:
-    writer = csv.writer(f)
-    writer.writerow(header)
-
-rows_written = 0
-
-for split in ['train', 'valid', 'test']:
-    image_folder = os.path.join(DATASET_PATH, split, 'images')
-    label_folder = os.path.join(DATASET_PATH, split, 'labels')
-
-    if not os.path.isdir(image_folder):
-        print(f"Info: '{split}' folder not found. Skipping.")
-        continue
-
-    image_files = [f for f in os.listdir(image_folder) if f.endswith(('.jpg', '.jpeg', '.png'))]
-    
-    print(f"\nProcessing {len(image_files)} images in '{split}' split...")
-
-    for image_file in tqdm(image_files, desc=f"Processing {split}"):
-        image_path = os.path.join(image_folder, image_file)
-        label_path = os.path.join(label_folder, os.path.splitext(image_file)[0] + '.txt')
-
-        frame = cv2.imread(image_path)
-        if frame is None:
+    return data_yaml['names']
+
+
+def list_images(dataset_path):
+    """Returns (split, image_path, label_path) for every image in the train/valid/test splits."""
+    tasks = []
+    for split in ['train', 'valid', 'test']:
+        image_folder = os.path.join(dataset_path, split, 'images')
+        label_folder = os.path.join(dataset_path, split, 'labels')
+
+        if not os.path.isdir(image_folder):
+            print(f"Info: '{split}' folder not found. Skipping.")
             continue
 
-        results = model(frame, verbose=False)
-
-        if os.path.isfile(label_path) and results[0].keypoints.data.numel() > 0:
-            try:
-                with open(label_path, 'r') as f:
-                    first_line = f.readline()
-                    if not first_line: continue
-                    class_id = int(first_line.split()[0])
-                    original_label = class_names[class_id]
-
-                if original_label in LABEL_MAPPING:
-                    our_label = LABEL_MAPPING[original_label]
-                    keypoints = results[0].keypoints.data[0].cpu().numpy()
-                    keypoints_row = keypoints.flatten()
-
-                    # --- FIX: Combine label and data in a standard Python list ---
-                    labeled_row = [our_label] + keypoints_row.tolist()
-
-                    with open(OUTPUT_CSV_FILE, 'a', newline='') as f:
-                        writer = csv.writer(f)
-                        writer.writerow(labeled_row)
-                    rows_written += 1
-            except Exception:
-                continue
-
-print(f"\n--- PROCESSING SUMMARY ---")
-if rows_written > 0:
-    print(f"✅ Success! Wrote {rows_written} rows to the dataset.")
-    print(f"Data saved to {OUTPUT_CSV_FILE}")
-else:
-    print(f"❌ Warning: No matching labels were found.")
-    print("Please check the 'Found Labels' printed above against the LABEL_MAPPING in the script.")
-print("--------------------------")
+        image_files = sorted(f for f in os.listdir(image_folder) if f.endswith(('.jpg', '.jpeg', '.png')))
+        print(f"Found {len(image_files)} images in '{split}' split.")
+        for image_file in image_files:
+            label_path = os.path.join(label_folder, os.path.splitext(image_file)[0] + '.txt')
+            tasks.append((split, os.path.join(image_folder, image_file), label_path))
+    return tasks
+
+
+def read_label(label_path, class_names):
+    """Returns our label for an image, or None if it has no usable annotation."""
+    if not os.path.isfile(label_path):
+        return None
+    try:
+        with open(label_path, 'r') as f:
+            first_line = f.readline()
+        if not first_line:
+            return None
+        original_label = class_names[int(first_line.split()[0])]
+    except (ValueError, IndexError, KeyError, OSError):
+        return None
+    return LABEL_MAPPING.get(original_label)
+
+
+def load_sample(task, class_names):
+    """
+    Worker function: reads the label and, only if it is one we use, decodes the image.
+
+    Returns:
+        (image_path, label, frame), with frame None if the image should be skipped.
+    """
+    _, image_path, label_path = task
+    label = read_label(label_path, class_names)
+    if label is None:
+        return image_path, None, None
+    return image_path, label, cv2.imread(image_path)
+
+
+class Checkpoint:
+    """
+    A manifest of image paths that have been fully processed, stored next to the output
+    file. Paths are appended only after their rows have been flushed to the output, and
+    each batch ends with a ROWS_MARKER line holding the output's row count at that point.
+    On resume, paths after the last marker are treated as not done, and the output is
+    truncated back to the marker's row count, so rows of a batch that was interrupted
+    are neither lost nor written twice.
+    """
+    ROWS_MARKER = '#rows '
+
+    def __init__(self, output_path):
+        self.path = output_path + '.manifest'
+        self.done = set()
+        self.rows = None # Committed output rows, or None for a manifest without markers
+        self._file = None
+
+    def load(self):
+        if os.path.isfile(self.path):
+            pending = set()
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.rstrip('\n')
+                    if line.startswith(self.ROWS_MARKER):
+                        self.done |= pending
+                        pending = set()
+                        self.rows = int(line[len(self.ROWS_MARKER):])
+                    elif line.strip():
+                        pending.add(line)
+            if self.rows is None:
+                self.done = pending # Written before markers existed: every listed path is done
+        return self.done
+
+    def open(self, resume):
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def mark(self, image_paths, rows):
+        self._file.writelines(f"{p}\n" for p in image_paths)
+        self._file.write(f"{self.ROWS_MARKER}{rows}\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class CsvRowWriter:
+    """
+    Writes the dataset through one buffered file handle instead of reopening it per row.
+
+    With resume, the existing file is first truncated to `rows` data rows (the count in
+    the checkpoint), or without it to its last complete line, dropping whatever a
+    crashed run wrote after that.
+    """
+    def __init__(self, path, resume, feature_set='raw', rows=None):
+        self.feature_set = feature_set
+        self.count = 0
+        write_header = not (resume and os.path.isfile(path) and os.path.getsize(path) > 0)
+        if not write_header:
+            self.count = self._truncate(path, rows)
+        self._file = open(path, 'a' if resume else 'w', newline='')
+        self._writer = csv.writer(self._file)
+        if write_header:
+            self._writer.writerow(POSE_FEATURES_HEADER if feature_set == 'pose' else HEADER)
+
+    @staticmethod
+    def _truncate(path, rows):
+        """Cuts the file after the header and `rows` data rows (all complete ones if None). Returns the rows kept."""
+        keep, kept = 0, -1 # The header is not a data row
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n') or kept == rows:
+                    break
+                keep += len(line)
+                kept += 1
+        with open(path, 'r+b') as f:
+            f.truncate(keep)
+        return max(kept, 0)
+
+    def write(self, labels, keypoints, sources):
+        """Writes one row per sample. keypoints has shape (num_samples, num_keypoints, 3)."""
+        if self.feature_set == 'pose':
+            rows = pose_features(keypoints).tolist()
+        else:
+            rows = keypoints.reshape(len(labels), -1).tolist()
+        self._writer.writerows([label] + row for label, row in zip(labels, rows))
+        self.count += len(rows)
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def iter_batches(tasks, class_names, workers, batch_size):
+    """
+    Decodes images in a thread pool (cv2.imread releases the GIL) and yields them in
+    batches. The next window of images is decoded while the current one is being run
+    through the model, and only two windows of frames are held in memory at once.
+    """
+    window = max(batch_size * workers * PREFETCH_BATCHES, batch_size)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def submit(start):
+            return [pool.submit(load_sample, task, class_names) for task in tasks[start:start + window]]
+
+        pending = submit(0)
+        for start in range(0, len(tasks), window):
+            current, pending = pending, submit(start + window)
+            samples = [future.result() for future in current]
+            for batch_start in range(0, len(samples), batch_size):
+                yield samples[batch_start:batch_start + batch_size]
+
+
+def process_dataset(backend, tasks, class_names, writer, checkpoint, workers, batch_size):
+    """Runs the pose backend over all tasks and writes one row per labelled image. Returns the rows written."""
+    rows_written = 0
+    images_done = 0
+    start_time = time.monotonic()
+
+    with tqdm(total=len(tasks), desc="Extracting keypoints", unit="img") as progress:
+        for batch in iter_batches(tasks, class_names, workers, batch_size):
+            usable = [(path, label, frame) for path, label, frame in batch if frame is not None]
+            if usable:
+                detections = backend.detect([frame for _, _, frame in usable])
+                labels, keypoints, sources = [], [], []
+                for (path, label, _), people in zip(usable, detections):
+                    if len(people) > 0:
+                        labels.append(label)
+                        keypoints.append(people[0])
+                        sources.append(path)
+                if labels:
+                    writer.write(labels, np.stack(keypoints), sources)
+                    rows_written += len(labels)
+
+            # Rows reach the disk before their images are marked done
+            writer.flush()
+            checkpoint.mark((path for path, _, _ in batch), writer.count)
+
+            images_done += len(batch)
+            progress.update(len(batch))
+            elapsed = time.monotonic() - start_time
+            progress.set_postfix(rows=rows_written, img_per_s=f"{images_done / elapsed:.1f}" if elapsed > 0 else "-")
+
+    elapsed = time.monotonic() - start_time
+    if images_done:
+        print(f"\nProcessed {images_done} images in {elapsed:.1f}s ({images_done / elapsed:.1f} images/second).")
+    return rows_written
+
+
+def main():
+    args = parse_args()
+    if args.output is None:
+        args.output = OUTPUT_CSV_FILE if args.format == 'csv' else OUTPUT_DATASET
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+
+    try:
+        class_names = load_class_names(args.dataset)
+        print("--- Found Labels in data.yaml ---")
+        print(class_names)
+        print("---------------------------------")
+    except Exception as e:
+        print(f"ERROR: Could not read data.yaml. Please check the --dataset path: {e}")
+        exit()
+
+    tasks = list_images(args.dataset)
+
+    checkpoint = Checkpoint(args.output)
+    if args.resume:
+        done = checkpoint.load()
+        tasks = [task for task in tasks if task[1] not in done]
+        print(f"Resuming: {len(done)} images already processed, {len(tasks)} remaining.")
+
+    backend = create_backend(args.backend, static_images=True, model_path=MODEL_PATH, onnx_path=args.onnx_model,
+                             threads=args.threads, provider=args.onnx_provider)
+    if args.format == 'csv':
+        writer = CsvRowWriter(args.output, args.resume, args.features, rows=checkpoint.rows)
+    else:
+        writer = KeypointDatasetWriter(args.output, resume=args.resume, count=checkpoint.rows)
+    checkpoint.open(args.resume)
+    try:
+        rows_written = process_dataset(backend, tasks, class_names, writer, checkpoint,
+                                       max(1, args.workers), max(1, args.batch_size))
+    finally:
+        writer.close()
+        checkpoint.close()
+
+    print(f"\n--- PROCESSING SUMMARY ---")
+    if rows_written > 0:
+        print(f"✅ Success! Wrote {rows_written} rows to the dataset.")
+        print(f"Data saved to {args.output}")
+    else:
+        print(f"❌ Warning: No matching labels were found.")
+        print("Please check the 'Found Labels' printed above against the LABEL_MAPPING in the script.")
+    print("--------------------------")
+
+
+if __name__ == "__main__":
+    main()
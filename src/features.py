@@ -0,0 +1,154 @@
+import numpy as np
+from classifier import to_numpy, NOSE, L_SHOULDER, R_SHOULDER, L_WRIST, R_WRIST, L_HIP, R_HIP, CONF_THRESHOLD
+
+# --- Additional Keypoint IDs (COCO order used by YOLOv8-Pose) ---
+L_EYE, R_EYE, L_EAR, R_EAR = 1, 2, 3, 4
+L_ELBOW, R_ELBOW = 7, 8
+L_KNEE, R_KNEE = 13, 14
+NUM_KEYPOINTS = 17
+
+# --- Feature Configuration ---
+FEATURE_SETS = ('raw', 'pose')
+MIN_SCALE_PX = 1e-3 # Below this a shoulder width or torso length is treated as missing
+TORSO_TO_SHOULDER_RATIO = 1.3 # Typical torso length / shoulder width, used when shoulders overlap
+CHUNK_POSES = 2048 # Poses per chunk in pose_features(), sized so a chunk's temporaries fit in L2
+
+# (name, first joint, middle joint, last joint): the angle is measured at the middle joint
+JOINT_ANGLES = [
+    ("l_elbow", L_SHOULDER, L_ELBOW, L_WRIST),
+    ("r_elbow", R_SHOULDER, R_ELBOW, R_WRIST),
+    ("l_shoulder", L_ELBOW, L_SHOULDER, L_HIP),
+    ("r_shoulder", R_ELBOW, R_SHOULDER, R_HIP),
+    ("l_hip", L_SHOULDER, L_HIP, L_KNEE),
+    ("r_hip", R_SHOULDER, R_HIP, R_KNEE),
+]
+_ANGLE_JOINTS = np.array([[a, b, c] for _, a, b, c in JOINT_ANGLES])
+
+FEATURE_NAMES = (
+    [f"kp_{i}_{axis}_rel" for i in range(NUM_KEYPOINTS) for axis in ("x", "y")]
+    + [f"angle_{name}" for name, _, _, _ in JOINT_ANGLES]
+    + ["neck_tilt", "torso_lean"]
+    + ["nose_dx", "nose_dy", "ears_dy", "nose_below_ears"]
+    + [f"kp_{i}_visible" for i in range(NUM_KEYPOINTS)]
+)
+NUM_FEATURES = len(FEATURE_NAMES)
+
+
+def _angle_from_vertical(dx, dy):
+    """Angle of a vector against straight up in image coordinates, in radians (-pi, pi]."""
+    return np.arctan2(dx, -dy)
+
+
+def pose_features(keypoints, conf_threshold=CONF_THRESHOLD):
+    """
+    Turns raw pixel keypoints into body-relative features for a whole batch of poses.
+
+    Coordinates are centred on the torso and divided by the shoulder width, so the
+    features do not depend on where a student sits in the frame or on the image size.
+
+    Args:
+        keypoints: Array of shape (num_poses, num_keypoints, 3) with x, y and confidence
+            in COCO order. Only the first 17 keypoints are used.
+        conf_threshold: Keypoints at or below this confidence are treated as missing.
+
+    Returns:
+        A float32 array of shape (num_poses, NUM_FEATURES), columns as in FEATURE_NAMES.
+        Features built from missing keypoints are 0.
+    """
+    kp = to_numpy(keypoints)[:, :NUM_KEYPOINTS]
+    num_poses = len(kp)
+    features = np.empty((num_poses, NUM_FEATURES), dtype=np.float32)
+    # Large batches go through in chunks whose temporaries stay in the CPU cache
+    for start in range(0, num_poses, CHUNK_POSES):
+        _pose_features_chunk(kp[start:start + CHUNK_POSES], conf_threshold, features[start:start + CHUNK_POSES])
+    return features
+
+
+def _pose_features_chunk(kp, conf_threshold, features):
+    """
+    pose_features() for one chunk, written into `features`.
+
+    Works on one contiguous row of values per keypoint coordinate (structure of arrays)
+    and fills the features transposed, one contiguous row per feature, so every step
+    is a short run of in-place vector operations instead of strided column access.
+    """
+    x, y, conf = np.ascontiguousarray(kp.transpose(2, 1, 0)) # Each (num_keypoints, num_poses)
+    visible = conf > conf_threshold
+    out = np.empty((NUM_FEATURES, len(kp)), dtype=np.float32)
+
+    # --- Body frame: torso centre and shoulder-width scale ---
+    shoulder_x, shoulder_y = (x[L_SHOULDER] + x[R_SHOULDER]) * 0.5, (y[L_SHOULDER] + y[R_SHOULDER]) * 0.5
+    hip_x, hip_y = (x[L_HIP] + x[R_HIP]) * 0.5, (y[L_HIP] + y[R_HIP]) * 0.5
+    shoulders_visible = visible[L_SHOULDER] & visible[R_SHOULDER]
+    hips_visible = visible[L_HIP] & visible[R_HIP]
+    torso_visible = shoulders_visible & hips_visible
+
+    center_x = np.where(torso_visible, (shoulder_x + hip_x) * 0.5, shoulder_x)
+    center_y = np.where(torso_visible, (shoulder_y + hip_y) * 0.5, shoulder_y)
+    torso_dx, torso_dy = shoulder_x - hip_x, shoulder_y - hip_y
+    shoulder_width = np.hypot(x[L_SHOULDER] - x[R_SHOULDER], y[L_SHOULDER] - y[R_SHOULDER])
+    torso_length = np.hypot(torso_dx, torso_dy)
+    scale = np.where(shoulders_visible & (shoulder_width > MIN_SCALE_PX), shoulder_width,
+                     np.where(torso_visible & (torso_length > MIN_SCALE_PX),
+                              torso_length / TORSO_TO_SHOULDER_RATIO, 1.0))
+    inv_scale = np.reciprocal(scale, dtype=np.float32)
+
+    column = 0
+    relative_x, relative_y = out[column:column + NUM_KEYPOINTS * 2:2], out[column + 1:column + NUM_KEYPOINTS * 2:2]
+    np.subtract(x, center_x, out=relative_x)
+    np.subtract(y, center_y, out=relative_y)
+    for relative in (relative_x, relative_y):
+        relative *= inv_scale
+        relative *= visible
+    column += NUM_KEYPOINTS * 2
+
+    # --- Joint angles, all at once ---
+    first, middle, last = _ANGLE_JOINTS.T
+    v1x, v1y = x[first] - x[middle], y[first] - y[middle]
+    v2x, v2y = x[last] - x[middle], y[last] - y[middle]
+    angles = out[column:column + len(JOINT_ANGLES)]
+    cross = v1x * v2y
+    cross -= v1y * v2x
+    v1x *= v2x
+    v1y *= v2y
+    v1x += v1y # Dot product
+    np.arctan2(cross, v1x, out=angles)
+    np.abs(angles, out=angles)
+    angles *= visible[first] & visible[middle] & visible[last]
+    column += len(JOINT_ANGLES)
+
+    # --- Head and torso orientation ---
+    nose_dx, nose_dy = x[NOSE] - shoulder_x, y[NOSE] - shoulder_y
+    head_visible = visible[NOSE] & shoulders_visible
+    np.multiply(_angle_from_vertical(nose_dx, nose_dy), head_visible, out=out[column])
+    np.multiply(_angle_from_vertical(torso_dx, torso_dy), torso_visible, out=out[column + 1])
+    column += 2
+
+    # --- Head-to-shoulder offsets ---
+    ear_y = (y[L_EAR] + y[R_EAR]) * 0.5
+    ears_visible = visible[L_EAR] & visible[R_EAR] & shoulders_visible
+    head_scale = inv_scale * head_visible
+    np.multiply(nose_dx, head_scale, out=out[column])
+    np.multiply(nose_dy, head_scale, out=out[column + 1])
+    np.multiply(ear_y - shoulder_y, inv_scale * ears_visible, out=out[column + 2])
+    np.multiply(y[NOSE] - ear_y, inv_scale * (ears_visible & visible[NOSE]), out=out[column + 3])
+    column += 4
+
+    # --- Confidence mask ---
+    out[column:column + NUM_KEYPOINTS] = visible
+    features[:] = out.T
+
+
+def raw_features(keypoints):
+    """The original feature layout: flattened pixel x, y and confidence per keypoint."""
+    kp = to_numpy(keypoints)
+    return kp.reshape(len(kp), -1)
+
+
+def build_features(keypoints, feature_set='raw'):
+    """Computes the named feature set for a batch of keypoints."""
+    if feature_set == 'pose':
+        return pose_features(keypoints)
+    if feature_set == 'raw':
+        return raw_features(keypoints)
+    raise ValueError(f"Unknown feature set '{feature_set}'. Expected one of {FEATURE_SETS}.")
@@ -0,0 +1,81 @@
+import numpy as np
+
+# --- Compiled Forest Format ---
+# A random forest flattened into one set of node arrays shared by all trees:
+#   feature    int32    feature tested at each node (0 at leaves)
+#   threshold  float64  go left if x[feature] <= threshold (+inf at leaves, so leaves loop on themselves)
+#   left/right int32    global index of each child (a leaf points to itself)
+#   is_leaf    bool
+#   value      float64  per-node class probabilities of shape (num_nodes, num_classes)
+#   roots      int32    global index of each tree's root
+#   classes    the class labels, in model.classes_ order
+#   feature_set  which features.py feature set the forest was trained on (optional, default 'raw')
+FORMAT_VERSION = 1
+
+
+class CompiledForest:
+    """
+    Evaluates a random forest exported by model_trainer.py with plain NumPy.
+
+    Every sample walks every tree at the same time: each step is a handful of vectorized
+    gathers over a (num_samples, num_trees) array of node indices. It exposes the parts
+    of the scikit-learn API that LearnedClassifier uses (classes_, n_features_in_,
+    predict_proba, predict), so it can be dropped in for the joblib model.
+    """
+    def __init__(self, feature, threshold, left, right, is_leaf, value, roots, classes, n_features_in, max_depth,
+                 feature_set='raw'):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.is_leaf = is_leaf
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features_in)
+        self.max_depth = int(max_depth)
+        self.feature_set_ = str(feature_set)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def apply(self, X):
+        """Returns the leaf reached in every tree, as an array of shape (num_trees, num_samples)."""
+        # scikit-learn compares float32 inputs against float64 thresholds; do the same
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input of shape (n, {self.n_features_in_}), got {X.shape}.")
+
+        rows = np.arange(len(X))[None, :]
+        node = np.repeat(self.roots[:, None], len(X), axis=1)
+        for _ in range(self.max_depth):
+            if self.is_leaf[node].all():
+                break
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict_proba(self, X):
+        """Averages the leaf class probabilities over all trees, like RandomForestClassifier."""
+        # Summing over the leading axis adds the trees one after another, in the same
+        # order scikit-learn accumulates them, so the result matches it to within rounding
+        proba = self.value[self.apply(X)].sum(axis=0)
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def load_compiled_forest(path):
+    """Loads a forest saved by model_trainer.export_forest()."""
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["version"]) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled forest version {int(data['version'])} in '{path}'.")
+        return CompiledForest(
+            feature=data["feature"], threshold=data["threshold"], left=data["left"], right=data["right"],
+            is_leaf=data["is_leaf"], value=data["value"], roots=data["roots"], classes=data["classes"],
+            n_features_in=data["n_features_in"], max_depth=data["max_depth"],
+            feature_set=str(data["feature_set"]) if "feature_set" in data.files else 'raw',
+        )
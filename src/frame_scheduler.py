@@ -0,0 +1,105 @@
+import cv2
+
+# --- Configuration ---
+MOTION_SIZE = (64, 36) # Frames are shrunk to this (width, height) before differencing
+MOTION_THRESHOLD = 0.0 # Mean absolute grey-level change that triggers inference; 0 disables motion gating
+MIN_INFER_RATE_HZ = 1.0 # Inference runs at least this often, even in a still room
+MAX_INFER_RATE_HZ = 0.0 # Inference runs at most this often; 0 means no cap
+CPU_BUDGET = 1.0 # Share of wall time inference may keep busy; 1.0 means no limit
+DURATION_SMOOTHING = 0.2 # Weight of the newest inference time in its running average
+
+
+class InferenceScheduler:
+    """
+    Decides per frame whether to run full pose inference or reuse the last result.
+
+    A frame is inferred when it is the first one, when the last inference is older
+    than 1 / min_rate_hz, or when all of these hold: 1 / max_rate_hz has passed, the
+    average inference time fits within cpu_budget of the time since the last run, and
+    the scene moved by at least motion_threshold since the last inferred frame. Motion
+    is the mean absolute difference of small greyscale copies of the two frames, so
+    the check costs a fraction of a millisecond.
+    """
+    def __init__(self, motion_threshold=MOTION_THRESHOLD, min_rate_hz=MIN_INFER_RATE_HZ,
+                 max_rate_hz=MAX_INFER_RATE_HZ, cpu_budget=CPU_BUDGET, motion_size=MOTION_SIZE):
+        self.motion_threshold = motion_threshold
+        self.max_interval = 1.0 / min_rate_hz if min_rate_hz > 0 else float("inf")
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self.cpu_budget = cpu_budget
+        self.motion_size = motion_size
+        self.inferred = 0
+        self.skipped = 0
+        self.forced = 0 # Inferences triggered by min_rate_hz rather than by motion
+        self.avg_infer_secs = 0.0
+        self.last_motion = 0.0
+        self._last_infer_time = None
+        self._reference = None # Small greyscale copy of the last inferred frame
+
+    def _thumbnail(self, frame):
+        small = cv2.resize(frame, self.motion_size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def motion_score(self, frame):
+        """Mean absolute grey-level change between `frame` and the last inferred frame (0-255)."""
+        if self._reference is None:
+            return float("inf")
+        return float(cv2.absdiff(self._thumbnail(frame), self._reference).mean())
+
+    def should_infer(self, frame, now):
+        """
+        Returns True if `frame` should go through pose inference.
+
+        Args:
+            frame: The captured BGR frame.
+            now: Timestamp of the frame in seconds.
+        """
+        if self._last_infer_time is None:
+            return self._accept(frame, now)
+
+        elapsed = now - self._last_infer_time
+        if elapsed >= self.max_interval:
+            self.forced += 1
+            return self._accept(frame, now)
+        over_budget = self.cpu_budget < 1.0 and self.avg_infer_secs > self.cpu_budget * elapsed
+        if elapsed < self.min_interval or over_budget:
+            self.skipped += 1
+            return False
+        if self.motion_threshold > 0:
+            self.last_motion = self.motion_score(frame)
+            if self.last_motion < self.motion_threshold:
+                self.skipped += 1
+                return False
+        return self._accept(frame, now)
+
+    def _accept(self, frame, now):
+        self.inferred += 1
+        self._last_infer_time = now
+        if self.motion_threshold > 0:
+            self._reference = self._thumbnail(frame)
+        return True
+
+    def record_inference(self, duration_secs):
+        """Feeds back how long an inference took, for the CPU budget."""
+        if self.avg_infer_secs == 0.0:
+            self.avg_infer_secs = duration_secs
+        else:
+            self.avg_infer_secs += DURATION_SMOOTHING * (duration_secs - self.avg_infer_secs)
+
+    def stats(self):
+        total = self.inferred + self.skipped
+        return {
+            "inferred": self.inferred,
+            "skipped": self.skipped,
+            "forced": self.forced,
+            "inferred_ratio": self.inferred / total if total else 0.0,
+            "avg_infer_ms": self.avg_infer_secs * 1000,
+            "last_motion": self.last_motion,
+        }
+
+    def format(self):
+        s = self.stats()
+        return (f"[scheduler] {s['inferred']} inferred ({s['forced']} forced) | {s['skipped']} skipped | "
+                f"{s['inferred_ratio'] * 100:.0f}% inferred | {s['avg_infer_ms']:.1f} ms/inference | "
+                f"motion {s['last_motion']:.2f}")
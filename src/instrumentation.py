@@ -0,0 +1,312 @@
+import bisect
+import cProfile
+import json
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+import cv2
+
+# --- Instrumentation Configuration ---
+METRICS_INTERVAL_SECS = 5.0 # Length of one metrics window, and how often a snapshot is dumped
+HISTOGRAM_MIN_SECS = 10e-6 # Bucket bounds grow geometrically from 10 us...
+HISTOGRAM_MAX_SECS = 10.0 # ...to 10 s; slower spans land in the overflow bucket
+HISTOGRAM_GROWTH = 1.25 # Each bucket is 25% wider than the previous one
+FRAME_SPAN = "frame" # Span wrapped around one whole iteration of the display loop
+OVERLAY_ORIGIN = (20, 30) # Offset of the overlay text from the bottom-left corner
+OVERLAY_LINE_HEIGHT = 22
+OVERLAY_COLOR = (255, 255, 255)
+
+
+def _bucket_bounds():
+    bounds, bound = [], HISTOGRAM_MIN_SECS
+    while bound < HISTOGRAM_MAX_SECS:
+        bounds.append(bound)
+        bound *= HISTOGRAM_GROWTH
+    return bounds
+
+
+BUCKET_BOUNDS = _bucket_bounds() # Upper bound of each bucket in seconds
+
+
+class Histogram:
+    """
+    Fixed-size latency histogram: geometric buckets, so recording is one bisect and
+    memory does not grow with the number of samples. Percentiles are reported as the
+    upper bound of their bucket, i.e. to within 25%.
+    """
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total_secs = 0.0
+        self.max_secs = 0.0
+
+    def add(self, secs):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, secs)] += 1
+        self.count += 1
+        self.total_secs += secs
+        if secs > self.max_secs:
+            self.max_secs = secs
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (0-100), in seconds."""
+        if self.count == 0:
+            return 0.0
+        rank, seen = q / 100 * self.count, 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKET_BOUNDS[bucket], self.max_secs) if bucket < len(BUCKET_BOUNDS) else self.max_secs
+        return self.max_secs
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_secs / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max_secs * 1000, 3),
+        }
+
+
+class _Span:
+    __slots__ = ("_metrics", "_name", "_start")
+
+    def __init__(self, metrics, name):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.record(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class _NullSpan:
+    """What span() returns while instrumentation is off: entering and leaving it does nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Instrumentation:
+    """
+    Named timing spans aggregated into per-window histograms.
+
+    Spans from any thread go into the current window; the display loop calls tick()
+    once per iteration, which closes the window every interval_secs and turns it into
+    a snapshot for the overlay, the /metrics endpoint and the metrics file. While
+    disabled, span() hands out a shared no-op context manager and record() returns at
+    once. Counters are updated without a lock, so a sample may occasionally be lost
+    when two threads record the same span at the same instant.
+    """
+    def __init__(self, interval_secs=METRICS_INTERVAL_SECS):
+        self.enabled = False
+        self.overlay = False
+        self.interval_secs = interval_secs
+        self.dump_file = None
+        self.last_snapshot = None
+        self._histograms = {}
+        self._window_start = time.monotonic()
+
+    def span(self, name):
+        """Context manager timing the enclosed block under `name`."""
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def record(self, name, secs):
+        if not self.enabled:
+            return
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms.setdefault(name, Histogram())
+        histogram.add(secs)
+
+    def set_enabled(self, enabled):
+        """Turns collection on or off at runtime; a new window starts either way."""
+        self.enabled = enabled
+        self._histograms = {}
+        self._window_start = time.monotonic()
+        if not enabled:
+            self.last_snapshot = None
+        print(f"[metrics] instrumentation {'on' if enabled else 'off'}")
+
+    def toggle(self):
+        self.set_enabled(not self.enabled)
+
+    def toggle_overlay(self):
+        """Shows or hides the on-screen overlay, turning collection on with it."""
+        self.overlay = not self.overlay
+        if self.overlay and not self.enabled:
+            self.set_enabled(True)
+
+    def handle_key(self, key):
+        """Runtime toggles from the GUI window: 'm' for collection, 'o' for the overlay."""
+        if key == ord("m"):
+            self.toggle()
+        elif key == ord("o"):
+            self.toggle_overlay()
+
+    def tick(self):
+        """
+        Closes the current window once interval_secs have passed.
+
+        Returns:
+            The new snapshot, or None if the window is still open or collection is off.
+        """
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed < self.interval_secs:
+            return None
+        histograms, self._histograms = self._histograms, {}
+        self._window_start = now
+        frames = histograms[FRAME_SPAN].count if FRAME_SPAN in histograms else 0
+        self.last_snapshot = {
+            "time": time.time(),
+            "window_secs": round(elapsed, 3),
+            "fps": round(frames / elapsed, 2),
+            "spans": {name: histogram.summary() for name, histogram in sorted(histograms.items())},
+        }
+        if self.dump_file is not None:
+            with open(self.dump_file, 'a') as f:
+                f.write(json.dumps(self.last_snapshot) + "\n")
+        return self.last_snapshot
+
+    def format(self, snapshot=None):
+        snapshot = snapshot or self.last_snapshot
+        if snapshot is None:
+            return "[metrics] no data yet"
+        spans = " | ".join(f"{name}: p50 {s['p50_ms']:.1f} p95 {s['p95_ms']:.1f} ms"
+                           for name, s in snapshot["spans"].items())
+        return f"[metrics] {snapshot['fps']:.1f} fps || {spans}"
+
+    def draw_overlay(self, frame):
+        """Writes FPS and per-span p50/p95 latency over the bottom-left corner of the frame, in place."""
+        if not self.overlay or self.last_snapshot is None:
+            return frame
+        lines = [f"{self.last_snapshot['fps']:.1f} fps"] + [
+            f"{name}: {s['p50_ms']:.1f} / {s['p95_ms']:.1f} ms" for name, s in self.last_snapshot["spans"].items()
+        ]
+        x, bottom = OVERLAY_ORIGIN[0], frame.shape[0] - OVERLAY_ORIGIN[1]
+        for i, text in enumerate(reversed(lines)):
+            y = bottom - i * OVERLAY_LINE_HEIGHT
+            cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 4)
+            cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, OVERLAY_COLOR, 1)
+        return frame
+
+
+class SampledProfiler:
+    """
+    Runs cProfile around one in every `every` calls of sample() and writes the
+    accumulated statistics to a .prof file (readable with pstats or snakeviz).
+    Without a path, sample() always returns a no-op context manager.
+
+    cProfile only sees the thread that enabled it, so all samples must come from one thread.
+    """
+    def __init__(self, path=None, every=100):
+        self.path = path
+        self.every = every
+        self.samples = 0
+        self._calls = 0
+        self._profile = cProfile.Profile()
+
+    def sample(self):
+        if self.path is None:
+            return _NULL_SPAN
+        self._calls += 1
+        if self._calls % self.every:
+            return _NULL_SPAN
+        self.samples += 1
+        return self._profile
+
+    def dump(self):
+        if self.path is None or self.samples == 0:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._profile.dump_stats(self.path)
+        print(f"[metrics] profile of {self.samples} sampled frames written to {self.path}")
+
+
+class StartupTimer:
+    """
+    Startup breakdown: how long each phase took (phases may overlap when run in
+    background threads) and when milestones such as the first classified frame were
+    reached, in seconds since t0.
+    """
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.phases = {}
+        self.milestones = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def mark(self, name):
+        self.milestones[name] = time.perf_counter() - self.t0
+
+    def report(self):
+        return {"phases": {name: round(secs, 3) for name, secs in self.phases.items()},
+                "milestones": {name: round(secs, 3) for name, secs in self.milestones.items()}}
+
+    def format(self):
+        phases = " | ".join(f"{name} {secs:.2f} s" for name, secs in self.phases.items())
+        milestones = " | ".join(f"{name} at {secs:.2f} s" for name, secs in self.milestones.items())
+        return f"[startup] {phases} || {milestones}"
+
+
+# --- Process-wide Instance ---
+# Shared by every module, so instrumented code only needs `from instrumentation import metrics`
+metrics = Instrumentation()
+
+
+def configure(args):
+    """
+    Sets up instrumentation from the --metrics* and --profile* options, and lets SIGUSR1
+    toggle collection at runtime (the keyboard does the same in the GUI).
+
+    Returns:
+        The SampledProfiler for --profile (a no-op one without it).
+    """
+    metrics.interval_secs = args.metrics_interval
+    if args.metrics_file:
+        os.makedirs(os.path.dirname(args.metrics_file) or ".", exist_ok=True)
+        metrics.dump_file = args.metrics_file
+    if args.metrics or args.metrics_file or args.overlay:
+        metrics.set_enabled(True)
+    metrics.overlay = args.overlay
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, lambda signum, frame: metrics.toggle())
+    return SampledProfiler(args.profile, args.profile_every)
+
+
+def add_arguments(parser):
+    """Adds the instrumentation options shared by the live scripts."""
+    parser.add_argument("--metrics", action="store_true",
+                        help="Time every pipeline stage from the start; toggle at runtime with 'm' in the window "
+                             "or SIGUSR1 when headless")
+    parser.add_argument("--metrics-interval", type=float, default=METRICS_INTERVAL_SECS,
+                        help=f"Seconds per metrics window (default: {METRICS_INTERVAL_SECS})")
+    parser.add_argument("--metrics-file", help="Append one JSON snapshot per metrics window to this file")
+    parser.add_argument("--overlay", action="store_true",
+                        help="Draw FPS and stage latencies on the frame; toggle with 'o'")
+    parser.add_argument("--profile", metavar="FILE.prof", help="Write a cProfile of sampled inference calls here")
+    parser.add_argument("--profile-every", type=int, default=100,
+                        help="Profile one in this many inference calls (default: 100)")
@@ -0,0 +1,204 @@
+import csv
+import json
+import os
+import numpy as np
+
+# --- Format ---
+# A keypoint dataset is a directory of append-only column files:
+#   keypoints.f32  raw float32 array of shape (count, num_keypoints, 3): x, y, confidence
+#   labels.u8      one uint8 category code per sample
+#   sources.txt    the source image path of each sample, one per line
+#   meta.json      format version, keypoint count, category names and committed sample count
+# The raw column files can be memory-mapped directly, so loading never parses text.
+FORMAT_VERSION = 1
+DATASET_SUFFIX = '.kpds'
+KEYPOINTS_FILE = 'keypoints.f32'
+LABELS_FILE = 'labels.u8'
+SOURCES_FILE = 'sources.txt'
+META_FILE = 'meta.json'
+
+
+def is_keypoint_dataset(path):
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def _read_meta(path):
+    with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported keypoint dataset version {meta.get('version')} in '{path}'.")
+    return meta
+
+
+class KeypointDatasetWriter:
+    """
+    Appends samples to a keypoint dataset in chunks.
+
+    The sample count in meta.json is only advanced after the column files have been
+    flushed, so a crash leaves at most some trailing bytes that readers ignore and
+    that are trimmed when the dataset is reopened with resume=True. Passing `count`
+    trims it further back to that many samples, e.g. to the last checkpoint of a run
+    that committed samples it never recorded as done.
+    """
+    def __init__(self, path, num_keypoints=None, resume=False, count=None):
+        self.path = path
+        self._pending = 0 # Samples written but not yet committed to meta.json
+        os.makedirs(path, exist_ok=True)
+
+        if resume and is_keypoint_dataset(path):
+            meta = _read_meta(path)
+            self.num_keypoints = meta["num_keypoints"]
+            self.categories = list(meta["categories"])
+            self.count = meta["count"] if count is None else min(count, meta["count"])
+            self._truncate_to_count()
+            mode = 'ab'
+        else:
+            self.num_keypoints = num_keypoints
+            self.categories = []
+            self.count = 0
+            mode = 'wb'
+
+        self._keypoints = open(os.path.join(path, KEYPOINTS_FILE), mode)
+        self._labels = open(os.path.join(path, LABELS_FILE), mode)
+        self._sources = open(os.path.join(path, SOURCES_FILE), mode)
+        if mode == 'wb' or count is not None:
+            self._write_meta() # Also records a count trimmed back to the checkpoint
+
+    def _truncate_to_count(self):
+        """Drops bytes written after the last committed sample (e.g. by a crashed run)."""
+        row_bytes = (self.num_keypoints or 0) * 3 * 4
+        for name, size in ((KEYPOINTS_FILE, self.count * row_bytes), (LABELS_FILE, self.count)):
+            with open(os.path.join(self.path, name), 'r+b') as f:
+                f.truncate(size)
+        sources_path = os.path.join(self.path, SOURCES_FILE)
+        with open(sources_path, 'rb') as f:
+            lines = f.read().split(b'\n')[:self.count]
+        with open(sources_path, 'wb') as f:
+            f.write(b''.join(line + b'\n' for line in lines))
+
+    def _write_meta(self):
+        meta = {
+            "version": FORMAT_VERSION,
+            "num_keypoints": self.num_keypoints,
+            "categories": self.categories,
+            "count": self.count,
+        }
+        tmp_path = os.path.join(self.path, META_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, META_FILE))
+
+    def _codes_for(self, labels):
+        for label in labels:
+            if label not in self.categories:
+                if len(self.categories) >= 255:
+                    raise ValueError("A keypoint dataset supports at most 255 categories.")
+                self.categories.append(label)
+        return np.array([self.categories.index(label) for label in labels], dtype=np.uint8)
+
+    def write(self, labels, keypoints, sources):
+        """
+        Appends a chunk of samples.
+
+        Args:
+            labels: Category name of each sample.
+            keypoints: Array of shape (num_samples, num_keypoints, 3).
+            sources: Source image path of each sample.
+        """
+        keypoints = np.ascontiguousarray(keypoints, dtype=np.float32)
+        if self.num_keypoints is None:
+            self.num_keypoints = keypoints.shape[1]
+        if keypoints.shape[1:] != (self.num_keypoints, 3):
+            raise ValueError(f"Expected keypoints of shape (n, {self.num_keypoints}, 3), got {keypoints.shape}.")
+
+        self._keypoints.write(keypoints.tobytes())
+        self._labels.write(self._codes_for(labels).tobytes())
+        self._sources.write(''.join(f"{source}\n" for source in sources).encode('utf-8'))
+        self._pending += len(labels)
+
+    def flush(self):
+        """Makes everything written so far durable and commits it to meta.json."""
+        for f in (self._keypoints, self._labels, self._sources):
+            f.flush()
+            os.fsync(f.fileno())
+        self.count += self._pending
+        self._pending = 0
+        self._write_meta()
+
+    def close(self):
+        self.flush()
+        for f in (self._keypoints, self._labels, self._sources):
+            f.close()
+
+
+class KeypointDataset:
+    """A loaded keypoint dataset. `keypoints` and `labels` are read-only memory maps."""
+    def __init__(self, path, keypoints, labels, categories):
+        self.path = path
+        self.keypoints = keypoints
+        self.labels = labels
+        self.categories = categories
+        self._sources = None
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def num_keypoints(self):
+        return self.keypoints.shape[1]
+
+    @property
+    def label_names(self):
+        """The category name of every sample as a NumPy string array."""
+        return np.asarray(self.categories)[self.labels]
+
+    @property
+    def sources(self):
+        """Source image paths, read on first access only."""
+        if self._sources is None:
+            with open(os.path.join(self.path, SOURCES_FILE), 'r', encoding='utf-8') as f:
+                self._sources = f.read().split('\n')[:len(self)]
+        return self._sources
+
+    def feature_matrix(self):
+        """Flattens the keypoints to (num_samples, num_keypoints * 3), the layout used for training."""
+        return self.keypoints.reshape(len(self), -1)
+
+
+def load_keypoint_dataset(path):
+    """
+    Opens a keypoint dataset without reading its contents into memory.
+
+    Returns:
+        A KeypointDataset whose arrays are backed by np.memmap.
+    """
+    meta = _read_meta(path)
+    count, num_keypoints = meta["count"], meta["num_keypoints"]
+    if count == 0:
+        keypoints = np.zeros((0, num_keypoints or 0, 3), dtype=np.float32)
+        labels = np.zeros(0, dtype=np.uint8)
+    else:
+        keypoints = np.memmap(os.path.join(path, KEYPOINTS_FILE), dtype=np.float32, mode='r',
+                              shape=(count, num_keypoints, 3))
+        labels = np.memmap(os.path.join(path, LABELS_FILE), dtype=np.uint8, mode='r', shape=(count,))
+    return KeypointDataset(path, keypoints, labels, meta["categories"])
+
+
+def export_csv(dataset, csv_path, header_keypoints=None):
+    """
+    Writes a keypoint dataset out in the classic classroom_actions.csv layout.
+
+    Args:
+        header_keypoints: Number of keypoints named in the header (the legacy CSV named 33
+            while YOLOv8 emits 17). Defaults to the dataset's own keypoint count.
+    """
+    header_keypoints = header_keypoints or dataset.num_keypoints
+    header = ['label'] + [f'kp_{i}_{v}' for i in range(header_keypoints) for v in ['x', 'y', 'conf']]
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        features = dataset.feature_matrix()
+        names = dataset.label_names
+        for start in range(0, len(dataset), 10000):
+            rows = features[start:start + 10000].tolist()
+            writer.writerows([label] + row for label, row in zip(names[start:start + 10000].tolist(), rows))
@@ -0,0 +1,99 @@
+import os
+import numpy as np
+from classifier import to_numpy, STATUS_NAMES, INATTENTIVE
+from features import pose_features
+from track_state import NO_STATUS
+
+# --- Configuration ---
+MODEL_FILE = os.path.join('models', 'attentiveness_model.joblib')
+COMPILED_MODEL_FILE = os.path.join('models', 'attentiveness_model.forest.npz')
+
+
+def default_model_path():
+    """Prefers the compiled forest, which needs neither scikit-learn nor joblib at runtime."""
+    return COMPILED_MODEL_FILE if os.path.isfile(COMPILED_MODEL_FILE) else MODEL_FILE
+
+
+def load_model(model_path=None):
+    """
+    Loads the trained attentiveness model once, so several streams can share it.
+
+    A '.npz' path is loaded as a compiled forest evaluated by forest_engine; anything
+    else is treated as a joblib-pickled scikit-learn model.
+    """
+    model_path = model_path or default_model_path()
+    if not os.path.isfile(model_path):
+        raise FileNotFoundError(f"Trained model not found at '{model_path}'. Please run model_trainer.py first.")
+    if model_path.endswith('.npz'):
+        from forest_engine import load_compiled_forest
+        return load_compiled_forest(model_path)
+    import joblib
+    return joblib.load(model_path)
+
+
+class LearnedClassifier:
+    """
+    Classifies students with the model trained by model_trainer.py.
+
+    All tracked people in a frame go through a single predict call. With
+    predict_every > 1, the model only runs every N frames and the other frames
+    reuse each track's last raw prediction (not the smoothed status, which would be
+    fed back into the status filter as a fresh vote); tracks without one are still
+    predicted.
+    """
+    def __init__(self, model, predict_every=1):
+        self.model = model
+        self.predict_every = max(1, predict_every)
+        self.num_features = model.n_features_in_
+        # Set by model_trainer.py; models trained before feature sets existed used raw keypoints
+        self.feature_set = str(getattr(model, 'feature_set_', 'raw'))
+        # Model class index -> our status code; labels we do not know count as INATTENTIVE
+        self._class_codes = np.array(
+            [STATUS_NAMES.index(c) if c in STATUS_NAMES else INATTENTIVE for c in model.classes_], dtype=np.int8
+        )
+        self._frame_count = 0
+
+    def build_features(self, keypoints):
+        """
+        Turns (num_people, num_keypoints, 3) keypoints into the features the model was trained on.
+
+        For raw features, models trained on the legacy 33-keypoint CSV expect more columns than
+        YOLOv8's 17 keypoints fill; the rest are zero, exactly like fillna(0) during training.
+        """
+        if self.feature_set == 'pose':
+            return pose_features(keypoints)
+        flat = keypoints.reshape(len(keypoints), -1)
+        if flat.shape[1] == self.num_features:
+            return flat
+        features = np.zeros((len(flat), self.num_features), dtype=np.float32)
+        width = min(flat.shape[1], self.num_features)
+        features[:, :width] = flat[:, :width]
+        return features
+
+    def predict(self, keypoints):
+        """Returns a status code for every person, from one model call."""
+        if len(keypoints) == 0:
+            return np.empty(0, dtype=np.int8)
+        probabilities = self.model.predict_proba(self.build_features(keypoints))
+        return self._class_codes[probabilities.argmax(axis=1)]
+
+    def classify(self, keypoints, track_ids, track_states):
+        """
+        Args:
+            keypoints: Keypoints of every tracked person, as from results[0].keypoints.data.
+            track_ids: Tracker IDs aligned with keypoints.
+            track_states: The stream's TrackStateStore, used for the last prediction per track.
+
+        Returns:
+            An int8 array of status codes, one per person.
+        """
+        keypoints = to_numpy(keypoints)
+        self._frame_count += 1
+        if self.predict_every == 1 or self._frame_count % self.predict_every == 1:
+            return self.predict(keypoints)
+
+        statuses = track_states.last_status(track_ids, raw=True)
+        missing = statuses == NO_STATUS
+        if missing.any():
+            statuses[missing] = self.predict(keypoints[missing])
+        return statuses
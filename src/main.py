@@ -1,158 +1,362 @@
+import time
+STARTUP_T0 = time.perf_counter() # Before the imports below, which are part of the startup breakdown
 import cv2
-from ultralytics import YOLO
-import tkinter as tk
+import copy
+import json
+import argparse
+import threading
 import numpy as np
-import time
-from dashboard import draw_dashboard
-import csv
-import os
-from datetime import datetime
-
-# Load the YOLOv8-Pose model
-model = YOLO('yolov8n-pose.pt')
-
-# Open the webcam
-cap = cv2.VideoCapture(0)
-
-if not cap.isOpened():
-    print("Error: Could not open video stream from webcam.")
-    exit()
-
-print("Starting real-time classification. Press 'q' to quit and save session.")
-
-# --- Fullscreen Setup ---
-window_name = "Classroom Attentiveness Classification"
-cv2.namedWindow(window_name, cv2.WND_PROP_FULLSCREEN)
-cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-
-# Get screen resolution
-root = tk.Tk()
-screen_width = root.winfo_screenwidth()
-screen_height = root.winfo_screenheight()
-root.destroy()
-
-# --- Keypoint IDs & State Tracking ---
-NOSE, L_SHOULDER, R_SHOULDER, L_WRIST, R_WRIST, L_HIP, R_HIP = 0, 5, 6, 9, 10, 11, 12
-CONF_THRESHOLD = 0.5
-SLEEP_THRESHOLD_SECS = 120.0
-
-student_states = {} # {track_id: [status, timestamp]}
-
-# --- Session Logging Setup ---
-LOG_DIRECTORY = 'data'
-LOG_FILE = os.path.join(LOG_DIRECTORY, 'session_log.csv')
-os.makedirs(LOG_DIRECTORY, exist_ok=True) # Creates the 'data' folder if it doesn't exist
-
-session_start_time = time.time()
-session_stats_agg = {
-    "attentive": 0, "inattentive": 0, "writing": 0, "sleeping": 0
-}
-session_total_frames = 0
-
-while True:
-    success, frame = cap.read()
-    if not success:
-        break
-
-    results = model.track(frame, persist=True)
-    annotated_frame = results[0].plot()
-
-    stats = {
-        "total_students": 0, "attentive_count": 0, "inattentive_count": 0,
-        "writing_count": 0, "sleeping_count": 0
-    }
-
-    # --- CLASSIFICATION LOGIC ---
-    if results[0].boxes.id is not None:
-        keypoints_data = results[0].keypoints.data
-        track_ids = results[0].boxes.id.cpu().numpy().astype(int)
-        stats["total_students"] = len(track_ids)
-
-        for i, track_id in enumerate(track_ids):
-            person_keypoints = keypoints_data[i]
-            status = "INATTENTIVE"
-
-            nose_y, nose_conf = person_keypoints[NOSE][1], person_keypoints[NOSE][2]
-            l_sh_y, l_sh_conf = person_keypoints[L_SHOULDER][1], person_keypoints[L_SHOULDER][2]
-            r_sh_y, r_sh_conf = person_keypoints[R_SHOULDER][1], person_keypoints[R_SHOULDER][2]
-            l_wrist_y, l_wrist_conf = person_keypoints[L_WRIST][1], person_keypoints[L_WRIST][2]
-            r_wrist_y, r_wrist_conf = person_keypoints[R_WRIST][1], person_keypoints[R_WRIST][2]
-            l_hip_y, l_hip_conf = person_keypoints[L_HIP][1], person_keypoints[L_HIP][2]
-            r_hip_y, r_hip_conf = person_keypoints[R_HIP][1], person_keypoints[R_HIP][2]
-            
-            if nose_conf > CONF_THRESHOLD and l_sh_conf > CONF_THRESHOLD and r_sh_conf > CONF_THRESHOLD:
-                shoulder_avg_y = (l_sh_y + r_sh_y) / 2
-                if nose_y < shoulder_avg_y - 10:
-                    status = "ATTENTIVE"
-                else:
-                    if l_hip_conf > CONF_THRESHOLD and r_hip_conf > CONF_THRESHOLD and (l_wrist_conf > CONF_THRESHOLD or r_wrist_conf > CONF_THRESHOLD):
-                        hip_avg_y = (l_hip_y + r_hip_y) / 2
-                        left_wrist_in_area = shoulder_avg_y < l_wrist_y < hip_avg_y
-                        right_wrist_in_area = shoulder_avg_y < r_wrist_y < hip_avg_y
-                        if left_wrist_in_area or right_wrist_in_area:
-                            status = "WRITING"
-            
-            current_time = time.time()
-            if status == "INATTENTIVE":
-                if track_id in student_states and student_states[track_id][0] == "INATTENTIVE":
-                    if current_time - student_states[track_id][1] > SLEEP_THRESHOLD_SECS:
-                        status = "SLEEPING"
-                else:
-                    student_states[track_id] = ["INATTENTIVE", current_time]
+from classroom import ClassroomStream, classifier_factory, CLASSIFIER_TYPES
+from pipeline import (LatestQueue, QueueClosed, Stage, StageStats, CaptureStage, PipelineMonitor, BackgroundTask,
+                      DROP_POLICIES, DROP_OLDEST, parse_source)
+from track_state import TRACK_TTL_SECS
+from frame_scheduler import (InferenceScheduler, MOTION_THRESHOLD, MIN_INFER_RATE_HZ, MAX_INFER_RATE_HZ,
+                             CPU_BUDGET)
+from result_server import start_result_server, frame_message, SERVER_HOST, SERVER_PORT, PREVIEW_FPS, PREVIEW_WIDTH
+from pose_backend import create_backend, BACKENDS, PROVIDERS
+from tiled_inference import TILE_SIZE, TILE_OVERLAP, parse_roi
+from temporal_filter import status_filter_factory, SMOOTHING_MODES, SMOOTHING_WINDOW, SMOOTHING_ALPHA
+import instrumentation
+from instrumentation import metrics, FRAME_SPAN, StartupTimer
+
+# --- Pipeline Configuration ---
+WINDOW_NAME = "Classroom Attentiveness Classification"
+QUEUE_SIZE = 1 # Frames waiting between stages; 1 means the freshest frame always wins
+STATS_INTERVAL_SECS = 5.0 # How often per-stage FPS and queue depth are printed
+MODEL_PATH = 'yolov8n-pose.pt'
+WARMUP_INFERENCES = 1 # Inferences on a blank frame before the session starts, so the first real frame is not slow
+WARMUP_FRAME_SIZE = (640, 480) # Used when the camera does not report its resolution
+# Options of the single-stream pipeline that the multi-stream loop does not implement
+SINGLE_STREAM_OPTIONS = ("drop_policy", "queue_size", "motion_threshold", "min_infer_rate", "max_infer_rate",
+                         "cpu_budget", "tiles", "roi", "tile_size", "tile_overlap", "full_frame_tile", "tile_layout")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Real-time classroom attentiveness classification.")
+    parser.add_argument("--source", nargs="+", default=["0"],
+                        help="Camera index, video file or stream URL. Give several to monitor multiple "
+                             "classrooms from one process, without the queue, scheduler and tiling options "
+                             "(default: 0)")
+    parser.add_argument("--backend", choices=BACKENDS, default='yolo',
+                        help="Pose engine: 'yolo' (YOLOv8-Pose, multi-person), 'mediapipe' (one person, "
+                             "CPU-friendly) or 'onnx' (YOLOv8-Pose exported by onnx_pose.py, run by ONNX Runtime "
+                             "on the CPU; tracking still needs torch and ultralytics) (default: yolo)")
+    parser.add_argument("--onnx-model", help="Exported model for --backend onnx, e.g. an INT8 '.int8.onnx' "
+                                             "(default: the weights' name with .onnx)")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="ONNX Runtime threads for --backend onnx, 0 for all cores (default: 0)")
+    parser.add_argument("--onnx-provider", choices=PROVIDERS, default='cpu',
+                        help="ONNX Runtime execution provider for --backend onnx (default: cpu)")
+    parser.add_argument("--drop-policy", choices=DROP_POLICIES, default=DROP_OLDEST,
+                        help="What a full queue does with new frames: 'oldest' keeps the freshest frame, "
+                             "'newest' keeps the queued one, 'block' never drops (default: oldest)")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help=f"Maximum frames queued between stages (default: {QUEUE_SIZE})")
+    parser.add_argument("--stats-interval", type=float, default=STATS_INTERVAL_SECS,
+                        help=f"Seconds between pipeline FPS reports, 0 to disable (default: {STATS_INTERVAL_SECS})")
+    parser.add_argument("--track-ttl", type=float, default=TRACK_TTL_SECS,
+                        help=f"Seconds before an unseen track's history is dropped (default: {TRACK_TTL_SECS})")
+    parser.add_argument("--classifier", choices=CLASSIFIER_TYPES, default='rules',
+                        help="'rules' uses the posture heuristics, 'learned' the model trained by "
+                             "model_trainer.py (default: rules)")
+    parser.add_argument("--model-file", help="Trained model for --classifier learned: a compiled '.forest.npz' "
+                                             "or a '.joblib' file (default: the compiled forest if present)")
+    parser.add_argument("--predict-every", type=int, default=1,
+                        help="Run the learned model every N frames and reuse each track's last label "
+                             "in between (default: 1)")
+    parser.add_argument("--smoothing", choices=SMOOTHING_MODES, default='none',
+                        help="Per-track status smoothing: 'vote' takes the majority over a window of frames, "
+                             "'ema' an exponential average, 'none' reports every frame as classified (default: none)")
+    parser.add_argument("--smoothing-window", type=int, default=SMOOTHING_WINDOW,
+                        help=f"Frames in the --smoothing vote window (default: {SMOOTHING_WINDOW})")
+    parser.add_argument("--smoothing-alpha", type=float, default=SMOOTHING_ALPHA,
+                        help=f"Weight of the newest frame for --smoothing ema (default: {SMOOTHING_ALPHA})")
+    parser.add_argument("--motion-threshold", type=float, default=MOTION_THRESHOLD,
+                        help="Skip pose inference while the mean grey-level change since the last inferred frame "
+                             "stays below this (0-255); 0 infers regardless of motion (default: 0)")
+    parser.add_argument("--min-infer-rate", type=float, default=MIN_INFER_RATE_HZ,
+                        help=f"Inferences per second forced even without motion (default: {MIN_INFER_RATE_HZ})")
+    parser.add_argument("--max-infer-rate", type=float, default=MAX_INFER_RATE_HZ,
+                        help="Upper limit on inferences per second, 0 for no limit (default: 0)")
+    parser.add_argument("--cpu-budget", type=float, default=CPU_BUDGET,
+                        help="Share of wall time pose inference may use, e.g. 0.5 for half a core; "
+                             f"skipped frames reuse the last result (default: {CPU_BUDGET})")
+    parser.add_argument("--tiles", action="store_true",
+                        help="Run pose inference on overlapping tiles of the frame, batched, so distant rows are "
+                             "seen at a higher resolution (implied by --roi or --tile-layout)")
+    parser.add_argument("--roi", action="append", type=parse_roi, metavar="X0,Y0,X1,Y1",
+                        help="Seating region to tile, as fractions of the frame; repeat for several regions")
+    parser.add_argument("--tile-size", type=int, default=TILE_SIZE,
+                        help=f"Tile edge in frame pixels (default: {TILE_SIZE})")
+    parser.add_argument("--tile-overlap", type=float, default=TILE_OVERLAP,
+                        help=f"Fraction of each tile shared with its neighbours (default: {TILE_OVERLAP})")
+    parser.add_argument("--full-frame-tile", action="store_true",
+                        help="Also run the whole frame as a tile, for people close to the camera")
+    parser.add_argument("--tile-layout",
+                        help="Tile layout JSON to use as is, instead of the cached one in data/tile_layouts")
+    parser.add_argument("--headless", action="store_true",
+                        help="No window: publish results over HTTP instead (see result_server.py). Stop with Ctrl+C")
+    parser.add_argument("--host", default=SERVER_HOST, help=f"Address the --headless server binds to (default: {SERVER_HOST})")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help=f"Port of the --headless server (default: {SERVER_PORT})")
+    parser.add_argument("--preview-fps", type=float, default=PREVIEW_FPS,
+                        help="Frames per second of the --headless MJPEG preview, 0 to disable (default: 0)")
+    parser.add_argument("--preview-width", type=int, default=PREVIEW_WIDTH,
+                        help=f"Width the preview is scaled down to (default: {PREVIEW_WIDTH})")
+    parser.add_argument("--warmup", type=int, default=WARMUP_INFERENCES,
+                        help=f"Pose inferences on a blank frame before the session starts (default: {WARMUP_INFERENCES})")
+    parser.add_argument("--startup-report", help="Write the startup breakdown to this JSON file")
+    parser.add_argument("--exit-after-first-frame", action="store_true",
+                        help="Stop after the first classified frame without logging the session (startup benchmark)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    if len(args.source) > 1:
+        # The multi-stream loop has its own one-frame queues and batches every stream's
+        # frame together, so these would be silently ignored
+        ignored = [f"--{dest.replace('_', '-')}" for dest in SINGLE_STREAM_OPTIONS
+                   if getattr(args, dest) != parser.get_default(dest)]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} cannot be used with more than one --source")
+    args.tiles = args.tiles or bool(args.roi) or bool(args.tile_layout)
+    if args.backend != 'yolo' and (args.tiles or len(args.source) > 1):
+        parser.error("tiled inference and multiple sources need --backend yolo")
+    return args
+
+
+def make_frame_tracker(backend, cap, args):
+    """
+    Returns a function running tracked pose inference on one frame: the backend's own
+    tracking on the whole frame, or tiled inference with the camera's tile layout when
+    --tiles is on.
+    """
+    if not args.tiles:
+        return backend.track
+
+    from tiled_inference import TiledPoseTracker, load_layout, load_or_create_layout
+    from multi_stream import stream_name
+    camera = stream_name(args.source[0], 0)
+    if args.tile_layout:
+        layout = load_layout(args.tile_layout)
+    else:
+        width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        layout = load_or_create_layout(camera, width, height, rois=args.roi, tile_size=args.tile_size,
+                                       overlap=args.tile_overlap, full_frame=args.full_frame_tile)
+    print(f"Tiled inference: {len(layout['tiles'])} tiles per frame.")
+    return TiledPoseTracker(backend.model, layout).track
+
+
+def run_single_stream(args):
+    startup = StartupTimer(STARTUP_T0)
+    startup.mark("imported")
+
+    # Load the pose model in the background while the camera and window are set up
+    def load_backend():
+        with startup.phase("model"):
+            return create_backend(args.backend, model_path=MODEL_PATH, onnx_path=args.onnx_model,
+                                  threads=args.threads, provider=args.onnx_provider)
+    backend_loader = BackgroundTask("model-load", load_backend)
+    backend_loader.start()
+
+    # Open the webcam
+    with startup.phase("camera"):
+        cap = cv2.VideoCapture(parse_source(args.source[0]))
+
+    if not cap.isOpened():
+        print("Error: Could not open video stream from webcam.")
+        exit()
+
+    server = None
+    if args.headless:
+        server = start_result_server(args)
+        print("Starting real-time classification. Press Ctrl+C to quit and save session.")
+    else:
+        print("Starting real-time classification. Press 'q' to quit and save session, "
+              "'m' to toggle metrics, 'o' the metrics overlay.")
+
+        # --- Fullscreen Setup ---
+        with startup.phase("window"):
+            cv2.namedWindow(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN)
+            cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+            # Get screen resolution
+            import tkinter as tk
+            root = tk.Tk()
+            screen_width = root.winfo_screenwidth()
+            screen_height = root.winfo_screenheight()
+            root.destroy()
+
+    with startup.phase("classifier"):
+        make_classifier = classifier_factory(args.classifier, args.model_file, args.predict_every)
+        make_filter = status_filter_factory(args.smoothing, args.smoothing_window, args.smoothing_alpha)
+        classroom = ClassroomStream(track_ttl_secs=args.track_ttl, classifier=make_classifier(),
+                                    status_filter=make_filter() if make_filter is not None else None)
+
+    with startup.phase("model wait"):
+        backend = backend_loader.result()
+
+    # --- Pipeline Setup ---
+    # capture thread -> frame_queue -> inference worker -> result_queue -> render loop (main thread,
+    # because OpenCV windows must be driven from the main thread on most platforms)
+    frame_queue = LatestQueue(args.queue_size, args.drop_policy)
+    result_queue = LatestQueue(args.queue_size, args.drop_policy)
+
+    try:
+        track_frame = make_frame_tracker(backend, cap, args)
+    except ValueError as e:
+        print(f"Error: {e}")
+        cap.release()
+        cv2.destroyAllWindows()
+        if server is not None:
+            server.stop()
+        exit()
+    profiler = instrumentation.configure(args)
+
+    # --- Warm-up ---
+    # The first inference initializes the runtime and the tracker; do it on a blank frame
+    # before the session timer starts instead of on the first frame of the lesson
+    if args.warmup > 0:
+        with startup.phase("warm-up"):
+            width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if width <= 0 or height <= 0:
+                width, height = WARMUP_FRAME_SIZE
+            blank = np.zeros((height, width, 3), dtype=np.uint8)
+            for _ in range(args.warmup):
+                track_frame(blank)
+
+    scheduler = InferenceScheduler(args.motion_threshold, args.min_infer_rate, args.max_infer_rate, args.cpu_budget)
+    last = {"result": None, "stats": None, "tracks": None}
+    # The inference thread updates the track store and the session while the main thread
+    # reports on them and, at shutdown, saves the session. Each frame's stats and tracks
+    # are new objects handed over through the result queue, and the dashboard is only
+    # used by the main thread, so rendering needs no lock.
+    classroom_lock = threading.Lock()
+
+    def inference_work(item):
+        frame_index, capture_time, frame = item
+        if scheduler.should_infer(frame, capture_time):
+            infer_start = time.perf_counter()
+            with profiler.sample():
+                with metrics.span("track"):
+                    result = track_frame(frame)
+                with classroom_lock:
+                    last["stats"] = classroom.classify(result, capture_time)
+                    last["tracks"] = (classroom.track_ids, classroom.statuses)
+            last["result"] = result
+            scheduler.record_inference(time.perf_counter() - infer_start)
+            return frame_index, capture_time, result, last["stats"], last["tracks"]
+
+        # Skipped: draw the last tracks and statuses over the new frame
+        result = copy.copy(last["result"])
+        result.orig_img = frame
+        # Like classify(), only frames with people count towards the session
+        with classroom_lock:
+            if len(last["tracks"][0]) > 0:
+                classroom.session.add(last["stats"], capture_time)
             else:
-                student_states[track_id] = [status, current_time]
-
-            if status == "ATTENTIVE": stats["attentive_count"] += 1
-            elif status == "WRITING": stats["writing_count"] += 1
-            elif status == "SLEEPING": stats["sleeping_count"] += 1
-            else: stats["inattentive_count"] += 1
-
-        session_stats_agg["attentive"] += stats["attentive_count"]
-        session_stats_agg["inattentive"] += stats["inattentive_count"]
-        session_stats_agg["writing"] += stats["writing_count"]
-        session_stats_agg["sleeping"] += stats["sleeping_count"]
-        session_total_frames += 1
-
-    annotated_frame = draw_dashboard(annotated_frame, stats)
-    display_frame = cv2.resize(annotated_frame, (screen_width, screen_height))
-    cv2.imshow(window_name, display_frame)
-
-    if cv2.waitKey(1) & 0xFF == ord("q"):
-        break
-
-# --- Session Summary & Logging ---
-session_end_time = time.time()
-session_duration_secs = session_end_time - session_start_time
-
-if session_total_frames > 0:
-    total_classifications = sum(session_stats_agg.values())
-    if total_classifications > 0:
-        avg_attentive_pct = (session_stats_agg["attentive"] / total_classifications) * 100
-        avg_inattentive_pct = (session_stats_agg["inattentive"] / total_classifications) * 100
-        avg_writing_pct = (session_stats_agg["writing"] / total_classifications) * 100
-        avg_sleeping_pct = (session_stats_agg["sleeping"] / total_classifications) * 100
-        total_engaged_classifications = session_stats_agg["attentive"] + session_stats_agg["writing"]
-        avg_overall_engagement_pct = (total_engaged_classifications / total_classifications) * 100
-
-        log_data = {
-            "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "Duration (s)": f"{session_duration_secs:.1f}",
-            "Avg Engagement (%)": f"{avg_overall_engagement_pct:.1f}",
-            "Attentive (%)": f"{avg_attentive_pct:.1f}",
-            "Writing (%)": f"{avg_writing_pct:.1f}",
-            "Inattentive (%)": f"{avg_inattentive_pct:.1f}",
-            "Sleeping (%)": f"{avg_sleeping_pct:.1f}"
-        }
-
-        file_exists = os.path.isfile(LOG_FILE)
-        with open(LOG_FILE, 'a', newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=log_data.keys())
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(log_data)
-        
-        print(f"Session summary saved to {LOG_FILE}")
-
-print("Stopping program.")
-cap.release()
-cv2.destroyAllWindows()
+                classroom.session.advance(capture_time)
+        return frame_index, capture_time, result, last["stats"], last["tracks"]
+
+    capture = CaptureStage(cap, frame_queue)
+    inference = Stage("inference", frame_queue, result_queue, inference_work)
+    render_stats = StageStats("render")
+    monitor = PipelineMonitor(
+        [capture.stats, inference.stats, render_stats],
+        {"frames": frame_queue, "results": result_queue},
+        interval_secs=args.stats_interval,
+    )
+
+    classroom.session.start_time = time.time()
+    capture.start()
+    inference.start()
+
+    # --- Render & Display Loop (or publish, when headless) ---
+    try:
+        while True:
+            try:
+                frame_index, capture_time, result, stats, tracks = result_queue.get(timeout=0.1)
+            except TimeoutError:
+                if server is None:
+                    key = cv2.waitKey(1) & 0xFF
+                    if key == ord("q"):
+                        break
+                    metrics.handle_key(key)
+                continue
+            except QueueClosed:
+                break # Upstream stages have finished (end of stream or camera failure)
+
+            render_start = time.monotonic()
+            with metrics.span(FRAME_SPAN):
+                if server is not None:
+                    with metrics.span("publish"):
+                        server.publish(frame_message(classroom, frame_index, capture_time, stats, tracks))
+                    if server.wants_preview(classroom.name):
+                        annotated_frame = metrics.draw_overlay(classroom.render(result, stats, capture_time))
+                        with metrics.span("preview"):
+                            server.publish_preview(classroom.name, annotated_frame)
+                else:
+                    annotated_frame = metrics.draw_overlay(classroom.render(result, stats))
+                    with metrics.span("resize"):
+                        display_frame = cv2.resize(annotated_frame, (screen_width, screen_height))
+                    with metrics.span("imshow"):
+                        cv2.imshow(WINDOW_NAME, display_frame)
+                        key = cv2.waitKey(1) & 0xFF
+            render_stats.tick(time.monotonic() - render_start)
+            if "first frame" not in startup.milestones:
+                startup.mark("first frame")
+                print(startup.format())
+                if args.exit_after_first_frame:
+                    break
+            if monitor.maybe_report() is not None:
+                with classroom_lock:
+                    print(classroom.track_report())
+                print(scheduler.format())
+                if metrics.enabled:
+                    print(metrics.format())
+            metrics.tick()
+
+            if server is None:
+                if key == ord("q"):
+                    break
+                metrics.handle_key(key)
+    except KeyboardInterrupt:
+        pass
+
+    # --- Shutdown ---
+    capture.stop()
+    frame_queue.close()
+    # The render loop no longer consumes results; closing the queue releases an inference
+    # worker blocked in put() (--drop-policy block), so the join below does not wait it out
+    result_queue.close()
+    capture.join(timeout=2.0)
+    inference.join(timeout=5.0)
+    for stage in (capture, inference):
+        if stage.error is not None:
+            print(f"Error in {stage.name} stage: {stage.error}")
+
+    # --- Session Summary & Logging ---
+    if not args.exit_after_first_frame:
+        with classroom_lock: # The inference thread may still be running if join() timed out
+            classroom.save_session()
+    profiler.dump()
+    if args.startup_report:
+        with open(args.startup_report, 'w') as f:
+            json.dump(startup.report(), f, indent=2)
+
+    print("Stopping program.")
+    cap.release()
+    if server is not None:
+        server.stop()
+    else:
+        cv2.destroyAllWindows()
+
+
+def main():
+    args = parse_args()
+    if len(args.source) > 1:
+        from multi_stream import run_multi_stream
+        run_multi_stream(args)
+    else:
+        run_single_stream(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import sys
+
+# resource only exists on Unix; psutil is optional and covers Windows
+try:
+    import resource
+except ImportError:
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def peak_rss_mb():
+    """
+    Peak resident memory of this process in MiB, or None where it cannot be measured
+    (Windows without psutil).
+    """
+    if resource is not None:
+        # ru_maxrss is in KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    if psutil is not None:
+        memory = psutil.Process().memory_info()
+        # peak_wset is the Windows peak working set; elsewhere fall back to the current RSS
+        return getattr(memory, "peak_wset", memory.rss) / (1024 * 1024)
+    return None
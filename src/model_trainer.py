@@ -1,66 +1,384 @@
+import argparse
+import itertools
+import json
+import time
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import accuracy_score, classification_report, f1_score
 import joblib
+from joblib import Parallel, delayed
+import numpy as np
 import os
+from forest_engine import CompiledForest, load_compiled_forest, FORMAT_VERSION as FOREST_FORMAT_VERSION
+from keypoint_dataset import is_keypoint_dataset, load_keypoint_dataset, DATASET_SUFFIX
+from features import build_features, FEATURE_NAMES, FEATURE_SETS, NUM_KEYPOINTS
 
 # --- Configuration ---
-DATA_FILE = os.path.join('data', 'classroom_actions.csv')
+DATA_FILE = os.path.join('data', 'classroom_actions' + DATASET_SUFFIX)
+CSV_DATA_FILE = os.path.join('data', 'classroom_actions.csv')
 MODEL_FILE = os.path.join('models', 'attentiveness_model.joblib')
-os.makedirs('models', exist_ok=True) # Create models directory if it doesn't exist
-
-# --- 1. Load the Dataset ---
-print(f"Loading dataset from {DATA_FILE}...")
-try:
-    df = pd.read_csv(DATA_FILE)
-except FileNotFoundError:
-    print(f"Error: Dataset file not found at {DATA_FILE}")
-    print("Please run the dataset_processor.py script first.")
-    exit()
-
-# --- FIX: Instead of dropping rows, fill missing values with 0 ---
-df.fillna(0, inplace=True)
-
-if df.empty:
-    print("Error: The dataset is still empty after loading. Please check the CSV file.")
-    exit()
-
-print(f"Dataset loaded successfully with {len(df)} samples.")
-print("\nClass distribution:")
-print(df['label'].value_counts())
-
-# --- 2. Prepare the Data ---
-# Separate features (keypoints) from the label
-X = df.drop('label', axis=1) # All columns except 'label' are features
-y = df['label']              # The 'label' column is our target
-
-# --- 3. Split Data into Training and Testing Sets ---
-# 80% for training, 20% for testing. random_state ensures reproducibility.
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-print(f"\nData split into {len(X_train)} training samples and {len(X_test)} testing samples.")
-
-# --- 4. Train the Model ---
-# We use a RandomForestClassifier, which is a powerful and reliable model for this kind of task.
-print("\nTraining the RandomForestClassifier model...")
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
-print("Model training complete.")
-
-# --- 5. Evaluate the Model ---
-print("\nEvaluating model performance...")
-y_pred = model.predict(X_test)
-
-accuracy = accuracy_score(y_test, y_pred)
-print(f"\nModel Accuracy: {accuracy * 100:.2f}%")
-
-print("\nClassification Report:")
-print(classification_report(y_test, y_pred))
-
-# --- 6. Save the Trained Model ---
-print(f"\nSaving the trained model to {MODEL_FILE}...")
-joblib.dump(model, MODEL_FILE)
-print("Model saved successfully.")
+FOREST_SUFFIX = '.forest.npz'
+SEARCH_REPORT_FILE = os.path.join('models', 'model_search_report.json')
 
+# --- Model Search Configuration ---
+# Each entry expands to one candidate per combination of its parameter values.
+# Override with --grid pointing to a JSON file of the same shape.
+DEFAULT_SEARCH_GRID = {
+    "random_forest": {"n_estimators": [50, 100, 200], "max_depth": [None, 12, 20]},
+    "gradient_boosting": {"learning_rate": [0.05, 0.1], "max_iter": [100, 200], "max_depth": [None, 6]},
+    "logistic_regression": {"C": [0.1, 1.0, 10.0]},
+}
+CV_FOLDS = 5
+MAX_LATENCY_MS = 2.0 # Single-sample inference budget in the live loop
+ACCURACY_TOLERANCE = 0.005 # Within this much of the best accuracy, the faster model wins
+LATENCY_REPEATS = 50
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the attentiveness classifier on extracted keypoints.")
+    parser.add_argument("--data", help=f"Keypoint dataset directory or CSV file "
+                                       f"(default: {DATA_FILE}, falling back to {CSV_DATA_FILE})")
+    parser.add_argument("--model", default=MODEL_FILE, help=f"Where to save the trained model (default: {MODEL_FILE})")
+    parser.add_argument("--features", choices=FEATURE_SETS, default='pose',
+                        help="'pose' trains on body-relative features from features.py, 'raw' on pixel "
+                             "keypoints (default: pose)")
+    parser.add_argument("--search", action="store_true",
+                        help="Cross-validate a grid of models in parallel and keep the best instead of "
+                             "training the single default forest")
+    parser.add_argument("--grid", help="JSON file with the model grid for --search (default: built-in grid)")
+    parser.add_argument("--folds", type=int, default=CV_FOLDS, help=f"Cross-validation folds (default: {CV_FOLDS})")
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel fit jobs, -1 for all cores (default: -1)")
+    parser.add_argument("--max-latency-ms", type=float, default=MAX_LATENCY_MS,
+                        help=f"Single-sample inference budget a model must meet to be chosen (default: {MAX_LATENCY_MS})")
+    parser.add_argument("--report", default=SEARCH_REPORT_FILE,
+                        help=f"Where --search writes its JSON report (default: {SEARCH_REPORT_FILE})")
+    parser.add_argument("--no-compile", action="store_true",
+                        help=f"Skip exporting the forest for the fast NumPy engine (<model>{FOREST_SUFFIX})")
+    return parser.parse_args()
+
+
+def load_dataset(path, feature_set='pose'):
+    """
+    Loads the features and labels from either dataset format.
+
+    Returns:
+        (X, y, feature_set): the feature matrix, a pandas Series of labels and the
+        feature set X actually contains.
+    """
+    if is_keypoint_dataset(path):
+        # Binary format: the keypoints are memory-mapped, nothing is parsed
+        dataset = load_keypoint_dataset(path)
+        y = pd.Series(dataset.label_names, name='label')
+        if feature_set == 'raw':
+            return dataset.feature_matrix(), y, feature_set
+        return build_features(dataset.keypoints, feature_set), y, feature_set
+
+    df = pd.read_csv(path)
+    # --- FIX: Instead of dropping rows, fill missing values with 0 ---
+    df.fillna(0, inplace=True)
+    # Separate features (keypoints) from the label
+    X = df.drop('label', axis=1) # All columns except 'label' are features
+    y = df['label']              # The 'label' column is our target
+
+    if list(X.columns) == FEATURE_NAMES:
+        # data_processor.py already wrote pose features at extraction time
+        return X, y, 'pose'
+    if feature_set == 'pose':
+        keypoints = X.to_numpy(dtype=np.float32).reshape(len(X), -1, 3)[:, :NUM_KEYPOINTS]
+        return build_features(keypoints, feature_set), y, feature_set
+    return X, y, feature_set
+
+
+def compiled_forest_path(model_path):
+    return os.path.splitext(model_path)[0] + FOREST_SUFFIX
+
+
+def compile_forest(model):
+    """
+    Flattens a fitted RandomForestClassifier into the node arrays used by forest_engine.
+
+    Returns:
+        A dictionary of NumPy arrays, ready for np.savez.
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+
+    features, thresholds, lefts, rights, leaves, values = [], [], [], [], [], []
+    for offset, tree in zip(offsets, trees):
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+        leaves.append(is_leaf)
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+        lefts.append((np.where(is_leaf, node_ids, tree.children_left) + offset).astype(np.int32))
+        rights.append((np.where(is_leaf, node_ids, tree.children_right) + offset).astype(np.int32))
+
+        # Normalize each node's class weights the same way DecisionTreeClassifier.predict_proba does
+        value = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        values.append(value / normalizer)
+
+    return {
+        "version": np.array(FOREST_FORMAT_VERSION),
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "is_leaf": np.concatenate(leaves),
+        "value": np.concatenate(values),
+        "roots": offsets.astype(np.int32),
+        "classes": np.asarray(model.classes_).astype(str),
+        "n_features_in": np.array(model.n_features_in_),
+        "max_depth": np.array(max(tree.max_depth for tree in trees)),
+        "feature_set": np.array(getattr(model, 'feature_set_', 'raw')),
+    }
+
+
+def export_forest(model, path, X_check=None):
+    """
+    Saves the compiled forest and, if X_check is given, verifies that the NumPy engine
+    predicts exactly what the scikit-learn model predicts on it. The forest is written
+    to a temporary file first and only moved to `path` once it has passed the check, so
+    a mismatched forest is never left where the live loop would load it.
+
+    Returns:
+        True if the forest was saved to `path` (its predictions match, or no check was requested).
+    """
+    tmp_path = os.fspath(path) + '.tmp'
+    with open(tmp_path, 'wb') as f: # A file object stops np.savez from appending '.npz'
+        np.savez(f, **compile_forest(model))
+    if X_check is not None:
+        engine = load_compiled_forest(tmp_path)
+        X_check = np.asarray(X_check, dtype=np.float32)
+        if not np.array_equal(engine.predict(X_check), np.asarray(model.predict(X_check)).astype(str)):
+            os.remove(tmp_path)
+            return False
+    os.replace(tmp_path, path)
+    return True
+
+
+def build_estimator(family, params):
+    """Creates an unfitted model for one grid entry."""
+    if family == "random_forest":
+        return RandomForestClassifier(random_state=42, n_jobs=1, **params)
+    if family == "gradient_boosting":
+        return HistGradientBoostingClassifier(random_state=42, **params)
+    if family == "logistic_regression":
+        # Keypoints are in pixels; standardize them so the linear model converges
+        return make_pipeline(StandardScaler(), LogisticRegression(max_iter=2000, **params))
+    raise ValueError(f"Unknown model family '{family}' in the search grid.")
+
+
+def expand_grid(grid):
+    """Returns a list of (name, family, params) for every combination in the grid."""
+    candidates = []
+    for family, space in grid.items():
+        keys = sorted(space)
+        for values in itertools.product(*(space[key] for key in keys)):
+            params = dict(zip(keys, values))
+            name = family + "".join(f"|{key}={value}" for key, value in params.items())
+            candidates.append((name, family, params))
+    return candidates
+
+
+def _fit_fold(candidate_index, family, params, X, y, train_idx, test_idx, labels, return_model=False):
+    """
+    Fits one candidate on one fold. Runs in a worker process.
+
+    With return_model, the fitted model is sent back too, so its inference latency can
+    be measured without fitting the candidate again.
+    """
+    model = build_estimator(family, params)
+    start = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_secs = time.perf_counter() - start
+    y_pred = model.predict(X[test_idx])
+    return {
+        "candidate": candidate_index,
+        "accuracy": accuracy_score(y[test_idx], y_pred),
+        "f1": f1_score(y[test_idx], y_pred, labels=labels, average=None, zero_division=0).tolist(),
+        "fit_secs": fit_secs,
+        "model": model if return_model else None,
+    }
+
+
+def measure_latency(model, sample, repeats=LATENCY_REPEATS):
+    """Median wall time of predicting a single sample, in milliseconds."""
+    model.predict(sample) # Warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(sample)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def select_best(results, max_latency_ms, accuracy_tolerance=ACCURACY_TOLERANCE):
+    """
+    Picks the model to deploy. Only candidates within the latency budget are eligible
+    (if none is, the fastest one wins); among those, every candidate within the accuracy
+    tolerance of the most accurate one is considered equal, and the fastest is chosen.
+    """
+    eligible = [r for r in results if r["latency_ms"] <= max_latency_ms]
+    if not eligible:
+        return min(results, key=lambda r: r["latency_ms"])
+    best_accuracy = max(r["cv_accuracy"] for r in eligible)
+    contenders = [r for r in eligible if r["cv_accuracy"] >= best_accuracy - accuracy_tolerance]
+    return min(contenders, key=lambda r: r["latency_ms"])
+
+
+def run_search(X_train, y_train, grid, folds, jobs, max_latency_ms):
+    """
+    Cross-validates every candidate in the grid, fanning all (candidate, fold) fits out
+    over the available cores, then measures each candidate's live inference latency on
+    its first-fold model. Nothing is fitted outside the parallel jobs; the caller fits
+    only the chosen candidate on the full training split.
+
+    Returns:
+        (best_result, all_results), where each result is a JSON-serializable dict.
+    """
+    X = np.ascontiguousarray(X_train, dtype=np.float32)
+    y = np.asarray(y_train)
+    labels = sorted(np.unique(y).tolist())
+    candidates = expand_grid(grid)
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=42).split(X, y))
+
+    print(f"\nCross-validating {len(candidates)} candidates x {folds} folds on {len(X)} samples...")
+    fold_results = Parallel(n_jobs=jobs, verbose=5)(
+        delayed(_fit_fold)(i, family, params, X, y, train_idx, test_idx, labels, return_model=fold == 0)
+        for i, (_, family, params) in enumerate(candidates)
+        for fold, (train_idx, test_idx) in enumerate(splits)
+    )
+
+    # Latency is measured one model at a time, after the parallel fits have finished,
+    # so the timings are not distorted by other jobs competing for the CPU
+    sample = X[:1]
+    results = []
+    for i, (name, family, params) in enumerate(candidates):
+        folds_for_candidate = [r for r in fold_results if r["candidate"] == i]
+        model = next(r["model"] for r in folds_for_candidate if r["model"] is not None)
+        latency_ms = measure_latency(model, sample)
+        result = {
+            "name": name,
+            "family": family,
+            "params": params,
+            "cv_accuracy": float(np.mean([r["accuracy"] for r in folds_for_candidate])),
+            "cv_accuracy_std": float(np.std([r["accuracy"] for r in folds_for_candidate])),
+            "f1_per_class": dict(zip(labels, np.mean([r["f1"] for r in folds_for_candidate], axis=0).tolist())),
+            "fit_secs": float(np.mean([r["fit_secs"] for r in folds_for_candidate])),
+            "latency_ms": latency_ms,
+            "sklearn_latency_ms": latency_ms,
+        }
+        if family == "random_forest":
+            # Forests run through the compiled NumPy engine in the live loop
+            engine = CompiledForest(**{k: v for k, v in compile_forest(model).items() if k != "version"})
+            result["latency_ms"] = measure_latency(engine, sample)
+        results.append(result)
+        print(f"  {name:<60} acc {result['cv_accuracy'] * 100:6.2f}% | fit {result['fit_secs']:7.2f}s | "
+              f"latency {result['latency_ms']:.3f} ms")
+
+    return select_best(results, max_latency_ms), results
+
+
+def main():
+    args = parse_args()
+    data_file = args.data
+    if data_file is None:
+        data_file = DATA_FILE if is_keypoint_dataset(DATA_FILE) else CSV_DATA_FILE
+    os.makedirs(os.path.dirname(args.model) or '.', exist_ok=True) # Create models directory if it doesn't exist
+
+    # --- 1. Load the Dataset ---
+    print(f"Loading dataset from {data_file}...")
+    try:
+        X, y, feature_set = load_dataset(data_file, args.features)
+    except FileNotFoundError:
+        print(f"Error: Dataset file not found at {data_file}")
+        print("Please run the data_processor.py script first.")
+        exit()
+
+    if len(y) == 0:
+        print("Error: The dataset is still empty after loading. Please check the dataset file.")
+        exit()
+
+    print(f"Dataset loaded successfully with {len(y)} samples ({feature_set} features, {X.shape[1]} columns).")
+    print("\nClass distribution:")
+    print(y.value_counts())
+
+    # --- 2. Split Data into Training and Testing Sets ---
+    # 80% for training, 20% for testing. random_state ensures reproducibility.
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+    print(f"\nData split into {len(X_train)} training samples and {len(X_test)} testing samples.")
+
+    # --- 3. Train the Model ---
+    search_report = None
+    if args.search:
+        grid = DEFAULT_SEARCH_GRID
+        if args.grid:
+            with open(args.grid, 'r') as f:
+                grid = json.load(f)
+        best, results = run_search(X_train, y_train, grid, args.folds, args.jobs, args.max_latency_ms)
+        print(f"\nBest model: {best['name']} (CV accuracy {best['cv_accuracy'] * 100:.2f}%, "
+              f"latency {best['latency_ms']:.3f} ms)")
+        print("Retraining it on the full training split...")
+        model = build_estimator(best["family"], best["params"])
+        if isinstance(model, RandomForestClassifier):
+            model.set_params(n_jobs=-1)
+        model.fit(np.asarray(X_train, dtype=np.float32), y_train)
+        search_report = {"folds": args.folds, "max_latency_ms": args.max_latency_ms,
+                         "best": best, "candidates": results}
+    else:
+        # We use a RandomForestClassifier, which is a powerful and reliable model for this kind of task.
+        print("\nTraining the RandomForestClassifier model...")
+        model = RandomForestClassifier(n_estimators=100, random_state=42)
+        model.fit(X_train, y_train)
+    model.feature_set_ = feature_set # Tells the live loop which features to compute
+    print("Model training complete.")
+
+    # --- 4. Evaluate the Model ---
+    print("\nEvaluating model performance...")
+    y_pred = model.predict(np.asarray(X_test, dtype=np.float32) if args.search else X_test)
+
+    accuracy = accuracy_score(y_test, y_pred)
+    print(f"\nModel Accuracy: {accuracy * 100:.2f}%")
+
+    print("\nClassification Report:")
+    print(classification_report(y_test, y_pred))
+
+    # --- 5. Save the Trained Model ---
+    print(f"\nSaving the trained model to {args.model}...")
+    joblib.dump(model, args.model)
+    print("Model saved successfully.")
+
+    if search_report is not None:
+        search_report["test_accuracy"] = accuracy
+        search_report["test_report"] = classification_report(y_test, y_pred, output_dict=True)
+        with open(args.report, 'w') as f:
+            json.dump(search_report, f, indent=2, default=str)
+        print(f"Search report saved to {args.report}")
+
+    # --- 6. Export for the Fast Inference Engine ---
+    forest_path = compiled_forest_path(args.model)
+    exported = False
+    if isinstance(model, RandomForestClassifier) and not args.no_compile:
+        print(f"\nCompiling the forest for NumPy inference to {forest_path}...")
+        exported = export_forest(model, forest_path, X_test)
+        if exported:
+            print("Compiled forest matches the scikit-learn predictions on the test split.")
+        else:
+            print("Warning: Compiled forest predictions differ from scikit-learn on the test split; "
+                  f"not installing it, the live loop will use {args.model}.")
+    if not exported and os.path.isfile(forest_path):
+        # The live loop prefers the compiled forest, so a stale one would be run instead of the new model
+        os.remove(forest_path)
+        print(f"Removed the outdated compiled forest {forest_path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import argparse
+import os
+import re
+import time
+import cv2
+import torch
+from ultralytics import YOLO
+from ultralytics.trackers.byte_tracker import BYTETracker
+from ultralytics.utils import IterableSimpleNamespace
+from ultralytics.utils.checks import check_yaml
+from classroom import ClassroomStream, classifier_factory
+from temporal_filter import status_filter_factory
+from result_server import start_result_server, frame_message
+from pipeline import LatestQueue, QueueClosed, CaptureStage, StageStats, DROP_OLDEST, parse_source
+from session import LOG_DIRECTORY
+import instrumentation
+from instrumentation import metrics, FRAME_SPAN
+
+# --- Configuration ---
+MODEL_PATH = 'yolov8n-pose.pt'
+TRACKER_CONFIG = 'bytetrack.yaml'
+TRACKER_FRAME_RATE = 30
+IDLE_WAIT_SECS = 0.005 # Sleep when no stream has a new frame ready
+BENCHMARK_FRAMES = 150 # Frames read from each stream per benchmark run
+
+
+def load_tracker_config(tracker_config=TRACKER_CONFIG):
+    """Loads an ultralytics tracker YAML (e.g. 'bytetrack.yaml') into the namespace BYTETracker expects."""
+    path = check_yaml(tracker_config)
+    try:
+        from ultralytics.utils import yaml_load
+        config = yaml_load(path)
+    except ImportError: # Newer ultralytics releases replaced yaml_load with the YAML helper
+        from ultralytics.utils import YAML
+        config = YAML.load(path)
+    return IterableSimpleNamespace(**config)
+
+
+def make_tracker(tracker_config=TRACKER_CONFIG, frame_rate=TRACKER_FRAME_RATE):
+    return BYTETracker(args=load_tracker_config(tracker_config), frame_rate=frame_rate)
+
+
+def apply_tracker(tracker, result):
+    """Runs one frame's detections through a ByteTrack tracker; returns the result with track IDs set."""
+    detections = result.boxes.cpu().numpy()
+    if len(detections) > 0:
+        tracks = tracker.update(detections, result.orig_img)
+        if len(tracks) > 0:
+            result = result[tracks[:, -1].astype(int)]
+            result.update(boxes=torch.as_tensor(tracks[:, :-1]))
+    return result
+
+
+class BatchedPoseTracker:
+    """
+    Runs YOLO pose on frames from several cameras in one batched call and keeps a
+    separate ByteTrack tracker per camera, so track IDs never leak between rooms.
+
+    This mirrors what model.track(persist=True) does internally, but with one
+    tracker per stream instead of one per predictor.
+    """
+    def __init__(self, model, num_streams, tracker_config=TRACKER_CONFIG, frame_rate=TRACKER_FRAME_RATE):
+        self.model = model
+        self.trackers = [make_tracker(tracker_config, frame_rate) for _ in range(num_streams)]
+
+    def track(self, frames):
+        """
+        Args:
+            frames: A dictionary {stream_index: frame} of the frames to process.
+
+        Returns:
+            A dictionary {stream_index: Results} with track IDs set on the boxes.
+        """
+        if not frames:
+            return {}
+        stream_indices = list(frames)
+        results = self.model.predict([frames[i] for i in stream_indices], verbose=False)
+
+        return {stream_index: apply_tracker(self.trackers[stream_index], result)
+                for stream_index, result in zip(stream_indices, results)}
+
+
+def stream_name(source, index):
+    """A short, file-name-safe name for a source, used for window titles and log files."""
+    if source.isdigit():
+        return f"cam{source}"
+    base = os.path.splitext(os.path.basename(source.rstrip('/')))[0]
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', base) or f"stream{index}"
+
+
+def make_classrooms(sources, track_ttl_secs, make_classifier=None, make_filter=None, record_timeline=True):
+    names = [stream_name(source, i) for i, source in enumerate(sources)]
+    # Keep names unique when two sources share a base name
+    names = [name if names.count(name) == 1 else f"{name}_{i}" for i, name in enumerate(names)]
+    return [
+        ClassroomStream(name, os.path.join(LOG_DIRECTORY, f"session_log_{name}.csv"), track_ttl_secs,
+                        make_classifier() if make_classifier is not None else None,
+                        make_filter() if make_filter is not None else None, record_timeline)
+        for name in names
+    ]
+
+
+def open_captures(sources):
+    captures = []
+    for source in sources:
+        cap = cv2.VideoCapture(parse_source(source))
+        if not cap.isOpened():
+            for opened in captures:
+                opened.release()
+            raise IOError(f"Could not open video source '{source}'.")
+        captures.append(cap)
+    return captures
+
+
+def run_multi_stream(args):
+    """Monitors several classrooms from one process with batched pose inference."""
+    captures = open_captures(args.source)
+    model = YOLO(MODEL_PATH)
+    tracker = BatchedPoseTracker(model, len(captures))
+    make_classifier = classifier_factory(args.classifier, args.model_file, args.predict_every)
+    make_filter = status_filter_factory(args.smoothing, args.smoothing_window, args.smoothing_alpha)
+    classrooms = make_classrooms(args.source, args.track_ttl, make_classifier, make_filter)
+
+    # One capture thread per camera; each keeps only its freshest frame
+    queues = [LatestQueue(1, DROP_OLDEST) for _ in captures]
+    capture_stages = [CaptureStage(cap, q, name=f"capture:{c.name}") for cap, q, c in zip(captures, queues, classrooms)]
+    inference_stats = StageStats("inference")
+    active = set(range(len(captures)))
+
+    server = None
+    if args.headless:
+        server = start_result_server(args)
+    quit_hint = "Press Ctrl+C to quit." if server is not None else "Press 'q' to quit."
+    print(f"Monitoring {len(captures)} streams: {', '.join(c.name for c in classrooms)}. {quit_hint}")
+    start_time = time.time()
+    for classroom in classrooms:
+        classroom.session.start_time = start_time
+    for stage in capture_stages:
+        stage.start()
+
+    profiler = instrumentation.configure(args)
+    last_report = time.monotonic()
+    try:
+        while active:
+            # --- Collect the latest frame from every stream that has one ---
+            frames = {}
+            frame_info = {} # {stream index: (frame index, capture time)}
+            for i in list(active):
+                try:
+                    frame_index, capture_time, frames[i] = queues[i].get(timeout=0)
+                    frame_info[i] = (frame_index, capture_time)
+                except TimeoutError:
+                    pass
+                except QueueClosed:
+                    active.discard(i)
+            if not frames:
+                time.sleep(IDLE_WAIT_SECS)
+                continue
+
+            # --- Batched inference, then fan out per stream ---
+            with metrics.span(FRAME_SPAN), profiler.sample():
+                inference_start = time.monotonic()
+                results = tracker.track(frames)
+                inference_secs = time.monotonic() - inference_start
+                inference_stats.tick(inference_secs)
+                metrics.record("track", inference_secs)
+
+                for i, result in results.items():
+                    classroom = classrooms[i]
+                    frame_index, capture_time = frame_info[i]
+                    stats = classroom.classify(result, capture_time)
+                    if server is None:
+                        with metrics.span("imshow"):
+                            cv2.imshow(classroom.name, metrics.draw_overlay(classroom.render(result, stats)))
+                        continue
+                    tracks = (classroom.track_ids, classroom.statuses)
+                    with metrics.span("publish"):
+                        server.publish(frame_message(classroom, frame_index, capture_time, stats, tracks))
+                    if server.wants_preview(classroom.name):
+                        annotated_frame = metrics.draw_overlay(classroom.render(result, stats, capture_time))
+                        with metrics.span("preview"):
+                            server.publish_preview(classroom.name, annotated_frame)
+            metrics.tick()
+
+            if args.stats_interval > 0 and time.monotonic() - last_report >= args.stats_interval:
+                last_report = time.monotonic()
+                fps = " | ".join(f"{s.name}: {s.stats.roll():.1f} fps" for s in capture_stages)
+                print(f"[multi-stream] batches: {inference_stats.roll():.1f}/s | {fps}")
+                for classroom in classrooms:
+                    print(classroom.track_report())
+                if metrics.enabled:
+                    print(metrics.format())
+
+            if server is None:
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord("q"):
+                    break
+                metrics.handle_key(key)
+    except KeyboardInterrupt:
+        pass
+
+    # --- Shutdown ---
+    for stage in capture_stages:
+        stage.stop()
+    for stage in capture_stages:
+        stage.join(timeout=2.0)
+        if stage.error is not None:
+            print(f"Error in {stage.name} stage: {stage.error}")
+    for classroom in classrooms:
+        classroom.save_session()
+    profiler.dump()
+    for cap in captures:
+        cap.release()
+    if server is not None:
+        server.stop()
+    else:
+        cv2.destroyAllWindows()
+    print("Stopping program.")
+
+
+def benchmark(video_files, frames_per_stream=BENCHMARK_FRAMES, model_path=MODEL_PATH):
+    """
+    Measures total throughput for 1..N streams by reading recorded videos in lock-step
+    and running them through batched inference and classification (no display).
+
+    Returns:
+        A list of (num_streams, total_frames_per_second) tuples.
+    """
+    model = YOLO(model_path)
+    rows = []
+    for num_streams in range(1, len(video_files) + 1):
+        sources = video_files[:num_streams]
+        captures = open_captures(sources)
+        tracker = BatchedPoseTracker(model, num_streams)
+        classrooms = make_classrooms(sources, track_ttl_secs=30.0, record_timeline=False)
+
+        # Warm up once so model initialization is not counted
+        success, frame = captures[0].read()
+        if success:
+            model.predict([frame] * num_streams, verbose=False)
+
+        total_frames = 0
+        start = time.perf_counter()
+        for _ in range(frames_per_stream):
+            frames = {}
+            for i, cap in enumerate(captures):
+                success, frame = cap.read()
+                if success:
+                    frames[i] = frame
+            if not frames:
+                break
+            for i, result in tracker.track(frames).items():
+                classrooms[i].classify(result)
+            total_frames += len(frames)
+        elapsed = time.perf_counter() - start
+
+        for cap in captures:
+            cap.release()
+        fps = total_frames / elapsed if elapsed > 0 else 0.0
+        rows.append((num_streams, fps))
+        print(f"{num_streams:>8} {total_frames:>8} {fps:>12.1f} {fps / num_streams:>16.1f}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-stream throughput benchmark using recorded videos.")
+    parser.add_argument("videos", nargs="+", help="Video files, one per simulated camera")
+    parser.add_argument("--frames", type=int, default=BENCHMARK_FRAMES,
+                        help=f"Frames read from each stream (default: {BENCHMARK_FRAMES})")
+    parser.add_argument("--model", default=MODEL_PATH, help=f"Pose model weights (default: {MODEL_PATH})")
+    args = parser.parse_args()
+
+    print(f"{'streams':>8} {'frames':>8} {'total fps':>12} {'fps per stream':>16}")
+    benchmark(args.videos, args.frames, args.model)
+
+
+if __name__ == "__main__":
+    main()
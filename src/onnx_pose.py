@@ -0,0 +1,311 @@
+import argparse
+import glob
+import os
+import time
+import cv2
+import numpy as np
+from pose_backend import PoseBackend, NUM_KEYPOINTS, YOLO_MODEL_PATH, PROVIDERS
+
+# --- ONNX Configuration ---
+ONNX_MODEL_PATH = 'yolov8n-pose.onnx'
+INT8_SUFFIX = '.int8.onnx'
+CONF_THRESHOLD = 0.25 # Same defaults as ultralytics predict()
+IOU_THRESHOLD = 0.7
+LETTERBOX_COLOR = 114
+CALIBRATION_IMAGES = 100 # Images used for static INT8 calibration
+PARITY_CONF = 0.5 # Keypoints compared by the parity check must be this confident in both models
+PARITY_IOU = 0.5 # People are paired between the two models by box overlap
+
+
+def int8_path(onnx_path):
+    return os.path.splitext(onnx_path)[0] + INT8_SUFFIX
+
+
+class OnnxPoseModel:
+    """
+    Runs an exported YOLOv8-Pose ONNX model with ONNX Runtime on the CPU.
+
+    The letterbox canvas, the network input and the network output are allocated once
+    and reused for every frame, with the input and output bound to ONNX Runtime
+    through I/O binding, so steady-state inference does not allocate frame-sized arrays.
+    """
+    def __init__(self, path=ONNX_MODEL_PATH, threads=0, provider='cpu',
+                 conf_threshold=CONF_THRESHOLD, iou_threshold=IOU_THRESHOLD):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads # 0 lets ONNX Runtime use every physical core
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ['OpenVINOExecutionProvider', 'CPUExecutionProvider'] if provider == 'openvino' \
+            else ['CPUExecutionProvider']
+        self.session = ort.InferenceSession(path, sess_options=options, providers=providers)
+        self.path = path
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+
+        model_input = self.session.get_inputs()[0]
+        model_output = self.session.get_outputs()[0]
+        _, _, self.height, self.width = model_input.shape
+        if not all(isinstance(d, int) for d in (self.height, self.width, *model_output.shape)):
+            raise ValueError(f"'{path}' has dynamic shapes; export it with a fixed image size (dynamic=False).")
+
+        # --- Reused buffers ---
+        self._canvas = np.full((self.height, self.width, 3), LETTERBOX_COLOR, dtype=np.uint8)
+        self._input = np.empty((1, 3, self.height, self.width), dtype=np.float32)
+        self._output = np.empty(model_output.shape, dtype=np.float32)
+        self._geometry = None # (frame shape, scale, left, top) of the last letterbox
+        self._binding = self.session.io_binding()
+        self._binding.bind_ortvalue_input(model_input.name, ort.OrtValue.ortvalue_from_numpy(self._input))
+        self._binding.bind_ortvalue_output(model_output.name, ort.OrtValue.ortvalue_from_numpy(self._output))
+
+    def _letterbox(self, frame):
+        """Resizes the frame into the canvas keeping its aspect ratio, then fills the input tensor."""
+        shape = frame.shape[:2]
+        if self._geometry is None or self._geometry[0] != shape:
+            h, w = shape
+            scale = min(self.height / h, self.width / w)
+            new_w, new_h = round(w * scale), round(h * scale)
+            left, top = (self.width - new_w) // 2, (self.height - new_h) // 2
+            self._canvas[:] = LETTERBOX_COLOR
+            self._geometry = (shape, scale, left, top, new_w, new_h)
+        _, scale, left, top, new_w, new_h = self._geometry
+        self._canvas[top:top + new_h, left:left + new_w] = cv2.resize(frame, (new_w, new_h),
+                                                                      interpolation=cv2.INTER_LINEAR)
+        # BGR HWC uint8 -> RGB CHW float32 in [0, 1], written straight into the bound input
+        np.multiply(self._canvas[:, :, ::-1].transpose(2, 0, 1), 1 / 255, out=self._input[0], casting='unsafe')
+        return scale, left, top
+
+    def __call__(self, frame):
+        """
+        Finds the people in one BGR frame.
+
+        Returns:
+            (boxes, keypoints): boxes has shape (n, 6) with x1, y1, x2, y2, confidence and
+            class 0; keypoints has shape (n, NUM_KEYPOINTS, 3). Both in frame pixels.
+        """
+        scale, left, top = self._letterbox(frame)
+        self.session.run_with_iobinding(self._binding)
+        pred = self._output[0] # (5 + 3 * NUM_KEYPOINTS, num_anchors)
+
+        candidates = np.flatnonzero(pred[4] > self.conf_threshold)
+        if len(candidates) == 0:
+            return np.zeros((0, 6), np.float32), np.zeros((0, NUM_KEYPOINTS, 3), np.float32)
+        cx, cy, w, h, scores = pred[:5, candidates]
+        xywh = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+        keep = np.asarray(cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), self.conf_threshold,
+                                           self.iou_threshold), dtype=np.intp).reshape(-1)
+        keep = keep[np.argsort(-scores[keep])]
+        anchors = candidates[keep]
+
+        frame_h, frame_w = frame.shape[:2]
+        boxes = np.zeros((len(anchors), 6), dtype=np.float32)
+        boxes[:, :2] = xywh[keep, :2]
+        boxes[:, 2:4] = xywh[keep, :2] + xywh[keep, 2:]
+        boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - left) / scale).clip(0, frame_w)
+        boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - top) / scale).clip(0, frame_h)
+        boxes[:, 4] = scores[keep]
+
+        keypoints = pred[5:, anchors].T.reshape(len(anchors), NUM_KEYPOINTS, 3).copy()
+        keypoints[:, :, 0] = (keypoints[:, :, 0] - left) / scale
+        keypoints[:, :, 1] = (keypoints[:, :, 1] - top) / scale
+        return boxes, keypoints
+
+
+class OnnxBackend(PoseBackend):
+    """
+    PoseBackend over OnnxPoseModel, tracked with ByteTrack like model.track().
+
+    Only detect() runs on ONNX Runtime alone. track(), used by the live loop, still
+    needs torch and ultralytics for the ByteTrack tracker and the Results object, so
+    they must stay installed; they are imported on the first tracked frame.
+    """
+    name = 'onnx'
+
+    def __init__(self, path=ONNX_MODEL_PATH, threads=0, provider='cpu'):
+        self.model = OnnxPoseModel(path, threads, provider)
+        self._tracker = None
+
+    def detect(self, frames):
+        return [self.model(frame)[1] for frame in frames]
+
+    def track(self, frame):
+        # ultralytics is only needed for tracking and plotting, not for ONNX inference itself
+        import torch
+        from ultralytics.engine.results import Results
+        from multi_stream import make_tracker, apply_tracker
+        if self._tracker is None:
+            self._tracker = make_tracker()
+        boxes, keypoints = self.model(frame)
+        result = Results(frame, path="", names={0: "person"},
+                         boxes=torch.from_numpy(boxes), keypoints=torch.from_numpy(keypoints))
+        return apply_tracker(self._tracker, result)
+
+
+# --- Export ---
+
+class _CalibrationReader:
+    """Feeds letterboxed images to ONNX Runtime's static quantizer."""
+    def __init__(self, model, images):
+        self._model = model
+        self._images = iter(images)
+        self._input_name = model.session.get_inputs()[0].name
+
+    def get_next(self):
+        for path in self._images:
+            frame = cv2.imread(path)
+            if frame is not None:
+                self._model._letterbox(frame)
+                return {self._input_name: self._model._input.copy()}
+        return None
+
+
+def list_images(directory, limit=None):
+    paths = sorted(p for ext in ("jpg", "jpeg", "png", "bmp")
+                   for p in glob.glob(os.path.join(directory, "**", f"*.{ext}"), recursive=True))
+    return paths[:limit] if limit else paths
+
+
+def export_onnx(model_path=YOLO_MODEL_PATH, imgsz=640, int8=False, calibration_dir=None):
+    """
+    Exports a YOLOv8-Pose model to ONNX with a fixed input size, next to the weights.
+
+    Args:
+        int8: Also write an INT8-quantized copy (<name>.int8.onnx). With calibration_dir,
+            activations are calibrated on those images (static quantization, best for CPU
+            convolutions); otherwise only weights are quantized (dynamic quantization).
+
+    Returns:
+        The path of the model to load: the INT8 copy when int8 is set.
+    """
+    from ultralytics import YOLO
+    onnx_path = YOLO(model_path).export(format='onnx', imgsz=imgsz, dynamic=False, simplify=True)
+    print(f"Exported {model_path} to {onnx_path}")
+    if not int8:
+        return onnx_path
+
+    from onnxruntime import quantization
+    quantized_path = int8_path(onnx_path)
+    if calibration_dir:
+        images = list_images(calibration_dir, CALIBRATION_IMAGES)
+        if not images:
+            raise ValueError(f"No calibration images found in '{calibration_dir}'.")
+        preprocessed = os.path.splitext(onnx_path)[0] + '.prep.onnx'
+        quantization.quant_pre_process(onnx_path, preprocessed)
+        quantization.quantize_static(preprocessed, quantized_path,
+                                     _CalibrationReader(OnnxPoseModel(onnx_path), images),
+                                     quant_format=quantization.QuantFormat.QDQ,
+                                     weight_type=quantization.QuantType.QInt8,
+                                     activation_type=quantization.QuantType.QUInt8)
+        os.remove(preprocessed)
+        print(f"Wrote INT8 model calibrated on {len(images)} images to {quantized_path}")
+    else:
+        quantization.quantize_dynamic(onnx_path, quantized_path, weight_type=quantization.QuantType.QUInt8)
+        print(f"Wrote INT8 (weights only) model to {quantized_path}")
+    return quantized_path
+
+
+# --- Parity & Latency ---
+
+def _pair_people(boxes_a, boxes_b, iou_threshold=PARITY_IOU):
+    """Greedy pairing of people between two detections by box IoU. Returns [(index_a, index_b)]."""
+    pairs, used = [], set()
+    for i, a in enumerate(boxes_a[:, :4]):
+        best, best_iou = None, iou_threshold
+        for j, b in enumerate(boxes_b[:, :4]):
+            if j in used:
+                continue
+            iw = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+            ih = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+            inter = iw * ih
+            iou = inter / max((a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter, 1e-6)
+            if iou >= best_iou:
+                best, best_iou = j, iou
+        if best is not None:
+            used.add(best)
+            pairs.append((i, best))
+    return pairs
+
+
+def check_parity(model_path, onnx_path, images, threads=0, provider='cpu'):
+    """
+    Compares ONNX keypoints with the PyTorch model on sample images and times both.
+
+    Returns:
+        A dict with people counts, the mean and max keypoint error in pixels over confident
+        keypoints of paired people, and the mean latency per image of each model.
+    """
+    from ultralytics import YOLO
+    torch_model = YOLO(model_path)
+    onnx_model = OnnxPoseModel(onnx_path, threads, provider)
+
+    errors, torch_people, onnx_people, paired = [], 0, 0, 0
+    torch_secs, onnx_secs = 0.0, 0.0
+    frames = [frame for frame in (cv2.imread(path) for path in images) if frame is not None]
+    if not frames:
+        raise ValueError("No readable images for the parity check.")
+    torch_model.predict(frames[0], verbose=False) # Warm-up both
+    onnx_model(frames[0])
+
+    for frame in frames:
+        start = time.perf_counter()
+        result = torch_model.predict(frame, verbose=False)[0]
+        torch_secs += time.perf_counter() - start
+        start = time.perf_counter()
+        onnx_boxes, onnx_kp = onnx_model(frame)
+        onnx_secs += time.perf_counter() - start
+
+        torch_boxes = result.boxes.data.cpu().numpy()
+        torch_kp = result.keypoints.data.cpu().numpy() if result.keypoints is not None else np.zeros((0, NUM_KEYPOINTS, 3))
+        torch_people += len(torch_boxes)
+        onnx_people += len(onnx_boxes)
+        for i, j in _pair_people(torch_boxes, onnx_boxes):
+            paired += 1
+            confident = (torch_kp[i, :, 2] > PARITY_CONF) & (onnx_kp[j, :, 2] > PARITY_CONF)
+            errors.extend(np.hypot(*(torch_kp[i, confident, :2] - onnx_kp[j, confident, :2]).T).tolist())
+
+    return {
+        "images": len(frames),
+        "torch_people": torch_people,
+        "onnx_people": onnx_people,
+        "paired_people": paired,
+        "mean_kp_error_px": float(np.mean(errors)) if errors else 0.0,
+        "max_kp_error_px": float(np.max(errors)) if errors else 0.0,
+        "torch_ms": torch_secs / len(frames) * 1000,
+        "onnx_ms": onnx_secs / len(frames) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the pose model to ONNX and check it against PyTorch.")
+    parser.add_argument("--model", default=YOLO_MODEL_PATH, help=f"PyTorch weights (default: {YOLO_MODEL_PATH})")
+    parser.add_argument("--imgsz", type=int, default=640, help="Fixed input size of the export (default: 640)")
+    parser.add_argument("--int8", action="store_true", help="Also write an INT8-quantized model")
+    parser.add_argument("--calibration", help="Image directory for static INT8 calibration")
+    parser.add_argument("--check", help="Image directory for the keypoint parity and latency check")
+    parser.add_argument("--check-images", type=int, default=50, help="Images used by --check (default: 50)")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime threads, 0 for all cores (default: 0)")
+    parser.add_argument("--provider", choices=PROVIDERS, default='cpu', help="ONNX Runtime provider (default: cpu)")
+    parser.add_argument("--force", action="store_true",
+                        help="Export (and quantize) again even if the model file already exists")
+    args = parser.parse_args()
+
+    onnx_path = os.path.splitext(args.model)[0] + '.onnx'
+    if args.int8:
+        onnx_path = int8_path(onnx_path)
+    if args.force or not os.path.isfile(onnx_path):
+        onnx_path = export_onnx(args.model, args.imgsz, args.int8, args.calibration)
+    else:
+        print(f"Using existing {onnx_path}; pass --force to export it again")
+    if args.check:
+        report = check_parity(args.model, onnx_path, list_images(args.check, args.check_images),
+                              args.threads, args.provider)
+        print(f"\n--- Parity on {report['images']} images ({os.path.basename(onnx_path)}) ---")
+        print(f"People: PyTorch {report['torch_people']}, ONNX {report['onnx_people']}, "
+              f"paired {report['paired_people']}")
+        print(f"Keypoint error (px): mean {report['mean_kp_error_px']:.2f}, max {report['max_kp_error_px']:.2f}")
+        print(f"Latency per image: PyTorch {report['torch_ms']:.1f} ms, ONNX {report['onnx_ms']:.1f} ms "
+              f"({report['torch_ms'] / report['onnx_ms']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
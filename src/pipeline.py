@@ -0,0 +1,284 @@
+import collections
+import threading
+import time
+from instrumentation import metrics
+
+# --- Drop Policies ---
+# What a full queue does when a producer hands it a new item.
+DROP_OLDEST = "oldest"  # Latest frame wins: discard the oldest queued item
+DROP_NEWEST = "newest"  # Keep what is queued and discard the incoming item
+BLOCK = "block"         # Wait for space (no frames lost, e.g. for video files)
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+def parse_source(source):
+    """Turns a numeric camera index given on the command line into an int for cv2.VideoCapture."""
+    return int(source) if source.isdigit() else source
+
+
+class QueueClosed(Exception):
+    """Raised by LatestQueue.get() once the queue is closed and drained."""
+
+
+class LatestQueue:
+    """
+    A small bounded queue connecting two pipeline stages.
+
+    Unlike queue.Queue, a full LatestQueue does not have to block the producer:
+    depending on the drop policy it throws away the oldest or the incoming item,
+    so a slow consumer always works on the freshest frame.
+    """
+    def __init__(self, maxsize=1, drop_policy=DROP_OLDEST):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{drop_policy}'. Expected one of {DROP_POLICIES}.")
+        self.maxsize = maxsize
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self._items = collections.deque()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        """
+        Adds an item to the queue according to the drop policy.
+
+        Returns:
+            True if the item was queued, False if it was dropped.
+        """
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._items) >= self.maxsize:
+                if self.drop_policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                elif self.drop_policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                else:
+                    while len(self._items) >= self.maxsize and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        return False
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """
+        Removes and returns the oldest queued item.
+
+        Raises:
+            TimeoutError: If no item arrived within the timeout.
+            QueueClosed: If the queue was closed and nothing is left in it.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                raise TimeoutError
+            if not self._items:
+                raise QueueClosed
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """Wakes up every waiting producer and consumer; no new items are accepted."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def qsize(self):
+        with self._cond:
+            return len(self._items)
+
+
+class StageStats:
+    """Counts items processed by one stage and reports its throughput."""
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.busy_secs = 0.0
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self.fps = 0.0
+
+    def tick(self, busy_secs=0.0):
+        """Records one processed item and how long the stage spent on it."""
+        self.count += 1
+        self._window_count += 1
+        self.busy_secs += busy_secs
+
+    def roll(self):
+        """Closes the current measurement window and updates the FPS figure."""
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed > 0:
+            self.fps = self._window_count / elapsed
+        self._window_start = now
+        self._window_count = 0
+        return self.fps
+
+
+class LatencyWindow:
+    """Keeps the most recent latency samples of one operation and summarizes them."""
+    def __init__(self, name, size=1000):
+        self.name = name
+        self._samples = collections.deque(maxlen=size)
+
+    def add(self, secs):
+        self._samples.append(secs)
+
+    def summary(self):
+        """Returns mean, p50 and p95 latency in milliseconds (zeros if there are no samples)."""
+        if not self._samples:
+            return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+        samples = sorted(self._samples)
+        return {
+            "mean_ms": sum(samples) / len(samples) * 1000,
+            "p50_ms": samples[len(samples) // 2] * 1000,
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+        }
+
+    def format(self):
+        summary = self.summary()
+        return (f"{self.name}: mean {summary['mean_ms']:.2f} ms | p50 {summary['p50_ms']:.2f} ms | "
+                f"p95 {summary['p95_ms']:.2f} ms")
+
+
+class Stage(threading.Thread):
+    """
+    A worker thread that takes items from one queue, processes them and passes
+    the result on to the next queue.
+
+    The work function may return None to swallow an item. When the input queue
+    closes the stage closes its output queue so shutdown ripples downstream.
+    """
+    def __init__(self, name, in_queue, out_queue, work):
+        super().__init__(name=name, daemon=True)
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.work = work
+        self.stats = StageStats(name)
+        self.error = None
+
+    def run(self):
+        try:
+            while True:
+                try:
+                    item = self.in_queue.get(timeout=0.5)
+                except TimeoutError:
+                    continue
+                except QueueClosed:
+                    break
+                start = time.monotonic()
+                result = self.work(item)
+                self.stats.tick(time.monotonic() - start)
+                if result is not None and self.out_queue is not None:
+                    self.out_queue.put(result)
+        except Exception as e:
+            self.error = e
+        finally:
+            if self.out_queue is not None:
+                self.out_queue.close()
+
+
+class CaptureStage(threading.Thread):
+    """
+    Reads frames from a cv2.VideoCapture-like source as fast as it delivers them
+    and pushes (frame_index, capture_time, frame) tuples into a queue.
+    """
+    def __init__(self, cap, out_queue, name="capture"):
+        super().__init__(name=name, daemon=True)
+        self.cap = cap
+        self.out_queue = out_queue
+        self.stats = StageStats(name)
+        self.error = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        frame_index = 0
+        try:
+            while not self._stop_event.is_set():
+                start = time.monotonic()
+                success, frame = self.cap.read()
+                if not success:
+                    break
+                elapsed = time.monotonic() - start
+                self.stats.tick(elapsed)
+                metrics.record("capture", elapsed)
+                self.out_queue.put((frame_index, time.time(), frame))
+                frame_index += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            self.out_queue.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class BackgroundTask(threading.Thread):
+    """
+    Runs one function on a worker thread, e.g. loading the pose model while the camera
+    opens. result() waits for it and returns its value, or re-raises its exception.
+    """
+    def __init__(self, name, function):
+        super().__init__(name=name, daemon=True)
+        self.function = function
+        self._value = None
+        self._error = None
+
+    def run(self):
+        try:
+            self._value = self.function()
+        except BaseException as e:
+            self._error = e
+
+    def result(self):
+        self.join()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class PipelineMonitor:
+    """Periodically reports per-stage FPS and queue depth so the bottleneck is visible."""
+    def __init__(self, stages, queues, interval_secs=5.0):
+        self.stages = stages
+        self.queues = queues
+        self.interval_secs = interval_secs
+        self._last_report = time.monotonic()
+
+    def snapshot(self):
+        """Rolls every stage's FPS window and returns the current figures."""
+        return {
+            "fps": {stats.name: round(stats.roll(), 1) for stats in self.stages},
+            "queue_depth": {name: q.qsize() for name, q in self.queues.items()},
+            "dropped": {name: q.dropped for name, q in self.queues.items()},
+        }
+
+    def format(self, snapshot):
+        fps = " | ".join(f"{name}: {value:.1f} fps" for name, value in snapshot["fps"].items())
+        depth = " | ".join(
+            f"{name}: {snapshot['queue_depth'][name]} queued, {snapshot['dropped'][name]} dropped"
+            for name in self.queues
+        )
+        return f"[pipeline] {fps} || {depth}"
+
+    def maybe_report(self):
+        """Prints a report if the reporting interval has elapsed. Returns the snapshot or None."""
+        if self.interval_secs <= 0:
+            return None
+        now = time.monotonic()
+        if now - self._last_report < self.interval_secs:
+            return None
+        self._last_report = now
+        snapshot = self.snapshot()
+        print(self.format(snapshot))
+        return snapshot
@@ -0,0 +1,177 @@
+import cv2
+import numpy as np
+
+# --- Common Skeleton ---
+# Every backend reports the 17 COCO keypoints used by YOLOv8-Pose, in this order, as
+# pixel x, y and a confidence in [0, 1]:
+#   0 nose, 1 left eye, 2 right eye, 3 left ear, 4 right ear, 5 left shoulder,
+#   6 right shoulder, 7 left elbow, 8 right elbow, 9 left wrist, 10 right wrist,
+#   11 left hip, 12 right hip, 13 left knee, 14 right knee, 15 left ankle, 16 right ankle
+# "Left" is the person's left in both skeletons.
+NUM_KEYPOINTS = 17
+BACKENDS = ('yolo', 'mediapipe', 'onnx')
+YOLO_MODEL_PATH = 'yolov8n-pose.pt'
+PROVIDERS = ('cpu', 'openvino') # ONNX Runtime execution providers of the 'onnx' backend, by short name
+
+# MediaPipe's 33-landmark index for each COCO keypoint. MediaPipe's extra landmarks
+# (inner/outer eye corners 1, 3, 4, 6, mouth 9-10, hands 17-22, heels and toes 29-32)
+# have no COCO counterpart and are dropped. Its landmark visibility becomes the confidence.
+MEDIAPIPE_TO_COCO = np.array([0, 2, 5, 7, 8, 11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28])
+
+# Bones drawn by PoseFrame.plot(), as pairs of COCO keypoints
+SKELETON = [(5, 6), (5, 7), (7, 9), (6, 8), (8, 10), (5, 11), (6, 12), (11, 12),
+            (11, 13), (13, 15), (12, 14), (14, 16), (0, 1), (0, 2), (1, 3), (2, 4)]
+PLOT_CONF_THRESHOLD = 0.5
+
+
+class PoseFrame:
+    """
+    Tracked poses of one frame from a backend that does not produce ultralytics Results.
+
+    Attributes:
+        orig_img: The frame the poses were found in.
+        track_ids: Integer array with one ID per person.
+        keypoints: Array of shape (num_people, NUM_KEYPOINTS, 3).
+    """
+    def __init__(self, orig_img, track_ids, keypoints):
+        self.orig_img = orig_img
+        self.track_ids = track_ids
+        self.keypoints = keypoints
+
+    def plot(self):
+        """Returns a copy of the frame with the skeletons drawn on it, like Results.plot()."""
+        img = self.orig_img.copy()
+        for person in self.keypoints:
+            visible = person[:, 2] > PLOT_CONF_THRESHOLD
+            points = person[:, :2].round().astype(int)
+            for a, b in SKELETON:
+                if visible[a] and visible[b]:
+                    cv2.line(img, tuple(points[a]), tuple(points[b]), (245, 66, 230), 2)
+            for x, y in points[visible]:
+                cv2.circle(img, (int(x), int(y)), 3, (245, 117, 66), cv2.FILLED)
+        return img
+
+
+def tracked_keypoints(result):
+    """
+    Returns (track_ids, keypoints) from a backend's tracking output: an ultralytics
+    Results or a PoseFrame. track_ids is None when nothing is being tracked.
+    """
+    if isinstance(result, PoseFrame):
+        return (result.track_ids, result.keypoints) if len(result.track_ids) else (None, None)
+    if result.boxes.id is None:
+        return None, None
+    return result.boxes.id.cpu().numpy().astype(int), result.keypoints.data
+
+
+class PoseBackend:
+    """
+    Interface of a pose engine.
+
+    detect() finds poses in a batch of independent images (dataset extraction, benchmarks);
+    track() follows people through a live stream and returns a Results-like object with
+    plot() and orig_img, which tracked_keypoints() turns into IDs and keypoints.
+    """
+    name = None
+
+    def detect(self, frames):
+        """
+        Args:
+            frames: List of BGR images.
+
+        Returns:
+            One float32 array of shape (num_people, NUM_KEYPOINTS, 3) per frame.
+        """
+        raise NotImplementedError
+
+    def track(self, frame):
+        raise NotImplementedError
+
+
+class YoloBackend(PoseBackend):
+    """YOLOv8-Pose through ultralytics: multi-person, batched, with ByteTrack tracking."""
+    name = 'yolo'
+
+    def __init__(self, model_path=YOLO_MODEL_PATH, model=None):
+        if model is None:
+            from ultralytics import YOLO
+            model = YOLO(model_path)
+        self.model = model
+
+    def detect(self, frames):
+        results = self.model.predict(frames, verbose=False)
+        return [
+            result.keypoints.data.cpu().numpy().astype(np.float32, copy=False) if result.keypoints is not None
+            else np.zeros((0, NUM_KEYPOINTS, 3), np.float32)
+            for result in results
+        ]
+
+    def track(self, frame):
+        return self.model.track(frame, persist=True, verbose=False)[0]
+
+
+class MediaPipeBackend(PoseBackend):
+    """
+    MediaPipe Pose: one person per image, mapped onto the COCO skeleton.
+
+    MediaPipe follows a single person by itself, so track() reports that person as
+    track 0. Meant for single-student setups and machines without a GPU.
+    """
+    name = 'mediapipe'
+
+    def __init__(self, static_image_mode=False, model_complexity=0, min_detection_confidence=0.5,
+                 min_tracking_confidence=0.5):
+        import mediapipe as mp
+        self._pose = mp.solutions.pose.Pose(static_image_mode=static_image_mode,
+                                            model_complexity=model_complexity,
+                                            min_detection_confidence=min_detection_confidence,
+                                            min_tracking_confidence=min_tracking_confidence)
+
+    def _process(self, frame):
+        """Keypoints of the person in one frame, shape (0 or 1, NUM_KEYPOINTS, 3)."""
+        results = self._pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if not results.pose_landmarks:
+            return np.zeros((0, NUM_KEYPOINTS, 3), np.float32)
+        landmarks = np.array([(lm.x, lm.y, lm.visibility) for lm in results.pose_landmarks.landmark],
+                             dtype=np.float32)
+        keypoints = landmarks[MEDIAPIPE_TO_COCO]
+        h, w = frame.shape[:2]
+        keypoints[:, 0] *= w
+        keypoints[:, 1] *= h
+        return keypoints[None]
+
+    def detect(self, frames):
+        return [self._process(frame) for frame in frames]
+
+    def track(self, frame):
+        keypoints = self._process(frame)
+        return PoseFrame(frame, np.zeros(len(keypoints), dtype=int), keypoints)
+
+    def close(self):
+        self._pose.close()
+
+
+def create_backend(name='yolo', static_images=False, model_path=YOLO_MODEL_PATH, onnx_path=None, threads=0,
+                   provider='cpu'):
+    """
+    Creates a pose backend by name.
+
+    Args:
+        name: One of BACKENDS.
+        static_images: True when the frames are unrelated images (dataset extraction),
+            so MediaPipe does not try to track between them.
+        model_path: Weights for the YOLO backend.
+        onnx_path: Exported model for the ONNX backend (see onnx_pose.py); defaults to
+            the weights' name with an .onnx extension.
+        threads: ONNX Runtime intra-op threads, 0 for all physical cores.
+        provider: ONNX Runtime execution provider, 'cpu' or 'openvino'.
+    """
+    if name == 'yolo':
+        return YoloBackend(model_path)
+    if name == 'mediapipe':
+        return MediaPipeBackend(static_image_mode=static_images)
+    if name == 'onnx':
+        import os
+        from onnx_pose import OnnxBackend
+        return OnnxBackend(onnx_path or os.path.splitext(model_path)[0] + '.onnx', threads, provider)
+    raise ValueError(f"Unknown pose backend '{name}'. Expected one of {BACKENDS}.")
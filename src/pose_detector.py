@@ -1,9 +1,22 @@
 import cv2
 import mediapipe as mp
+import numpy as np
+
+# --- Landmark Layout ---
+NUM_LANDMARKS = 33
+LANDMARK_FIELDS = ('x', 'y', 'z', 'visibility') # Columns of PoseDetector.landmarks
+LANDMARK_NAMES = tuple(landmark.name for landmark in mp.solutions.pose.PoseLandmark) # Row i is LANDMARK_NAMES[i]
+
 
 class PoseDetector:
     """
     A class to detect and draw human poses using MediaPipe.
+
+    The landmarks of the last processed frame are kept in arrays that are allocated once
+    and overwritten on every frame:
+        landmarks: (33, 4) float32 of normalized x, y, z and visibility.
+        pixels: (33, 2) int32 of x, y in pixels of the processed image.
+    Copy them if they need to outlive the next call.
     """
     def __init__(self, mode=False, complexity=0, smooth=True,
                  enable_seg=False, smooth_seg=True, detectionCon=0.5, trackCon=0.5):
@@ -19,47 +32,117 @@ class PoseDetector:
                                       min_detection_confidence=detectionCon,
                                       min_tracking_confidence=trackCon)
         self.mp_draw = mp.solutions.drawing_utils
+        self.results = None
+        self.found = False
+
+        # --- Reused Buffers ---
+        self.landmarks = np.zeros((NUM_LANDMARKS, len(LANDMARK_FIELDS)), dtype=np.float32)
+        self.pixels = np.zeros((NUM_LANDMARKS, 2), dtype=np.int32)
+        self._values = np.zeros((NUM_LANDMARKS, len(LANDMARK_FIELDS)), dtype=np.float64) # Landmarks as MediaPipe gives them
+        self._scaled = np.zeros((NUM_LANDMARKS, 2), dtype=np.float64) # Pixels before truncation
+        self._rgb = None
 
-    def find_pose(self, img, draw=True):
+    def _to_rgb(self, img):
+        """Converts a BGR frame into a reused RGB buffer of the same size."""
+        if self._rgb is None or self._rgb.shape != img.shape:
+            self._rgb = np.empty_like(img)
+        cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
+
+    def _fill_landmarks(self, h, w):
+        """Copies the landmarks of self.results into the reused arrays, scaling pixels to a w x h image."""
+        self.found = self.results.pose_landmarks is not None
+        if not self.found:
+            return
+        values = self._values
+        for i, lm in enumerate(self.results.pose_landmarks.landmark):
+            values[i] = (lm.x, lm.y, lm.z, lm.visibility)
+        self.landmarks[:] = values
+        # Scaled in float64, as int(lm.x * w) does, so pixels on a boundary are not rounded across it
+        np.multiply(values[:, :2], (w, h), out=self._scaled)
+        self.pixels[:] = self._scaled # Truncates like int(lm.x * w)
+
+    def find_pose(self, img, draw=True, is_rgb=False):
         """
         Processes an image to find the pose landmarks.
 
         Args:
-            img: The image to process.
+            img: The image to process, BGR unless is_rgb is set.
             draw: Flag to draw the landmarks on the image.
+            is_rgb: The image is already RGB (e.g. from an RGB capture pipeline), so the
+                BGR->RGB conversion is skipped. The input is never converted back: drawing
+                happens on img itself.
 
         Returns:
             The image with the landmarks drawn on it.
         """
-        # Convert the BGR image to RGB for MediaPipe
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        
-        # Process the image and find landmarks
+        img_rgb = img if is_rgb else self._to_rgb(img)
+
+        # Process the image and find landmarks; a read-only image is passed by reference
+        writeable = img_rgb.flags.writeable
+        img_rgb.flags.writeable = False
         self.results = self.pose.process(img_rgb)
+        img_rgb.flags.writeable = writeable
+
+        self._fill_landmarks(*img.shape[:2])
 
         # Draw the landmarks on the image if draw is True and landmarks are found
-        if self.results.pose_landmarks and draw:
+        if self.found and draw:
             self.mp_draw.draw_landmarks(img, self.results.pose_landmarks,
                                         self.mp_pose.POSE_CONNECTIONS)
         return img
 
     def find_position(self, img, draw=True):
         """
-        Finds the coordinates of each landmark. (We are not using this yet)
+        Returns the pixel coordinates of each landmark found by the last find_pose() call.
 
         Args:
-            img: The image to process.
+            img: The image to draw on.
             draw: Flag to draw circles on the landmarks.
 
         Returns:
-            A list of landmark coordinates.
+            The (33, 2) pixels array (row = landmark id), or an empty (0, 2) array if no
+            pose was found.
         """
-        lm_list = []
-        if self.results.pose_landmarks:
-            for id, lm in enumerate(self.results.pose_landmarks.landmark):
-                h, w, c = img.shape
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                lm_list.append([id, cx, cy])
-                if draw:
-                    cv2.circle(img, (cx, cy), 5, (255, 0, 0), cv2.FILLED)
-        return lm_list
\ No newline at end of file
+        if not self.found:
+            return self.pixels[:0]
+        if draw:
+            for cx, cy in self.pixels.tolist():
+                cv2.circle(img, (cx, cy), 5, (255, 0, 0), cv2.FILLED)
+        return self.pixels
+
+    def stream(self, source, draw=False, flip=False):
+        """
+        Runs pose detection over a video source.
+
+        Args:
+            source: Camera index or video file/stream URL, as for cv2.VideoCapture, or an
+                already opened cv2.VideoCapture, which is left for the caller to release.
+            draw: Draw the landmarks onto each frame.
+            flip: Mirror each frame horizontally first (webcam preview).
+
+        Yields:
+            (frame_index, landmarks, frame), with landmarks the shared (33, 4) array, or
+            None when no pose was found in the frame.
+        """
+        owned = not isinstance(source, cv2.VideoCapture)
+        cap = cv2.VideoCapture(source) if owned else source
+        if not cap.isOpened():
+            raise IOError(f"Could not open video source {source!r}.")
+        try:
+            frame_index = 0
+            while True:
+                success, frame = cap.read()
+                if not success:
+                    break
+                if flip:
+                    frame = cv2.flip(frame, 1)
+                self.find_pose(frame, draw)
+                yield frame_index, self.landmarks if self.found else None, frame
+                frame_index += 1
+        finally:
+            if owned:
+                cap.release()
+
+    def close(self):
+        self.pose.close()
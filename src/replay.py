@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import subprocess
+import time
+import cv2
+import numpy as np
+from classroom import ClassroomStream, classifier_factory, CLASSIFIER_TYPES
+from dashboard import engagement_percentage
+from memory_usage import peak_rss_mb
+from pose_backend import create_backend, BACKENDS, PROVIDERS, YOLO_MODEL_PATH
+from session import STATUS_KEYS, open_interval_path, timeline_path
+from track_state import TRACK_TTL_SECS
+from temporal_filter import status_filter_factory, SMOOTHING_MODES, SMOOTHING_WINDOW, SMOOTHING_ALPHA
+
+# --- Replay Configuration ---
+REPLAY_DIRECTORY = os.path.join('data', 'replay')
+REPLAY_START_TIME = 1704096000.0 # Simulated wall clock of the first frame (2024-01-01 08:00 UTC)
+DEFAULT_FPS = 30.0 # Simulated rate of image sequences and videos that do not report one
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+STAGES = ("capture", "inference", "classify", "render", "frame")
+
+
+class ReplaySource:
+    """
+    Frames of a video file or of a directory of images (in file name order), each with a
+    simulated timestamp start_time + index / fps, so time-based logic such as the
+    SLEEPING threshold and the low-engagement alert sees the same clock on every run.
+    """
+    def __init__(self, path, fps=None, start_time=REPLAY_START_TIME):
+        self.path = path
+        self._images = None
+        self._cap = None
+        if os.path.isdir(path):
+            self._images = sorted(os.path.join(path, name) for name in os.listdir(path)
+                                  if name.lower().endswith(IMAGE_EXTENSIONS))
+            if not self._images:
+                raise IOError(f"No images found in '{path}'.")
+            native_fps = None
+        else:
+            self._cap = cv2.VideoCapture(path)
+            if not self._cap.isOpened():
+                raise IOError(f"Could not open video '{path}'.")
+            native_fps = self._cap.get(cv2.CAP_PROP_FPS) or None
+        self.fps = fps or native_fps or DEFAULT_FPS
+        self.start_time = start_time
+        self.index = 0
+
+    def timestamp(self, index):
+        return self.start_time + index / self.fps
+
+    def read(self):
+        """Returns (frame_index, timestamp, frame), or None at the end of the source."""
+        if self._images is not None:
+            if self.index >= len(self._images):
+                return None
+            frame = cv2.imread(self._images[self.index])
+            if frame is None:
+                raise IOError(f"Could not read image '{self._images[self.index]}'.")
+        else:
+            success, frame = self._cap.read()
+            if not success:
+                return None
+        item = (self.index, self.timestamp(self.index), frame)
+        self.index += 1
+        return item
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+
+
+def latency_summary(samples):
+    """Mean, p50, p95, p99 and max of a list of durations in seconds, in milliseconds."""
+    if not samples:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ms = np.asarray(samples) * 1000
+    return {
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def git_revision():
+    """Commit the code under test was built from, so reports can be matched to versions."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def replay(source, backend, classroom, max_frames=None, render=True, realtime=False, warmup_frames=0):
+    """
+    Feeds every frame of a ReplaySource through pose tracking, classification, the
+    dashboard and the session log, in order and on one thread, so no frame is ever dropped.
+
+    Args:
+        render: Also draw the pose overlay and the dashboard, as the GUI does every frame.
+        realtime: Sleep so frames are processed no faster than the simulated frame rate.
+        warmup_frames: Leading frames processed but left out of the latency figures.
+
+    Returns:
+        (latencies, frames, engagement): per-stage lists of durations in seconds, the
+        number of frames replayed and the engagement figures of the session.
+    """
+    latencies = {stage: [] for stage in STAGES}
+    alert_frames, alerts, alert_was_active = 0, 0, False
+    frames, last_time = 0, source.start_time
+    classroom.session.start_time = source.start_time
+    wall_start = time.perf_counter()
+
+    while max_frames is None or frames < max_frames:
+        frame_start = time.perf_counter()
+        item = source.read()
+        if item is None:
+            break
+        frame_index, now, frame = item
+        capture_done = time.perf_counter()
+        result = backend.track(frame)
+        inference_done = time.perf_counter()
+        stats = classroom.classify(result, now)
+        classify_done = time.perf_counter()
+        if render:
+            classroom.render(result, stats, now)
+        else:
+            classroom.dashboard.update_alert(engagement_percentage(stats), stats["total_students"], now)
+        frame_done = time.perf_counter()
+
+        if frame_index >= warmup_frames:
+            latencies["capture"].append(capture_done - frame_start)
+            latencies["inference"].append(inference_done - capture_done)
+            latencies["classify"].append(classify_done - inference_done)
+            latencies["render"].append(frame_done - classify_done)
+            latencies["frame"].append(frame_done - frame_start)
+
+        alert_active = classroom.dashboard.alert_active
+        alert_frames += alert_active
+        alerts += alert_active and not alert_was_active
+        alert_was_active = alert_active
+        frames += 1
+        last_time = now
+
+        if realtime:
+            delay = (frames / source.fps) - (time.perf_counter() - wall_start)
+            if delay > 0:
+                time.sleep(delay)
+
+    end_time = last_time + 1 / source.fps
+    summary = classroom.session.summary(end_time)
+    classroom.save_session(end_time)
+    engagement = {
+        "summary": {key: value for key, value in summary.items() if key != "Timestamp"} if summary else None,
+        "totals": classroom.session.totals,
+        "alert_frames": alert_frames,
+        "alerts": alerts,
+        "intervals": [
+            {"t": round(record["t0"] - source.start_time, 3), "frames": record["frames"],
+             **{key: record[key] for key in STATUS_KEYS}, "engagement_pct": record["engagement_pct"]}
+            for record in classroom.session.intervals
+        ],
+    }
+    return latencies, frames, engagement
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay recorded video through the classroom pipeline and "
+                                                 "write a benchmark report.")
+    parser.add_argument("sources", nargs="+", help="Video files or directories of images, replayed one after another")
+    parser.add_argument("--output", help="JSON report (default: data/replay/<first source>.json)")
+    parser.add_argument("--fps", type=float,
+                        help=f"Simulated frame rate; defaults to the video's own, or {DEFAULT_FPS} for images")
+    parser.add_argument("--start-time", type=float, default=REPLAY_START_TIME,
+                        help="Simulated Unix time of the first frame (default: 2024-01-01 08:00 UTC)")
+    parser.add_argument("--realtime", action="store_true",
+                        help="Pace the replay at the simulated frame rate instead of running as fast as possible")
+    parser.add_argument("--max-frames", type=int, help="Stop each source after this many frames")
+    parser.add_argument("--warmup", type=int, default=5, help="Frames left out of the latency figures (default: 5)")
+    parser.add_argument("--no-render", action="store_true", help="Skip the pose overlay and dashboard drawing")
+    parser.add_argument("--backend", choices=BACKENDS, default='yolo', help="Pose engine (default: yolo)")
+    parser.add_argument("--model", default=YOLO_MODEL_PATH, help=f"YOLO weights (default: {YOLO_MODEL_PATH})")
+    parser.add_argument("--onnx-model", help="Exported model for --backend onnx (default: the weights' name with .onnx)")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime threads, 0 for all cores (default: 0)")
+    parser.add_argument("--onnx-provider", choices=PROVIDERS, default='cpu',
+                        help="ONNX Runtime execution provider for --backend onnx (default: cpu)")
+    parser.add_argument("--classifier", choices=CLASSIFIER_TYPES, default='rules',
+                        help="Attentiveness classifier (default: rules)")
+    parser.add_argument("--model-file", help="Trained model for --classifier learned")
+    parser.add_argument("--predict-every", type=int, default=1,
+                        help="Run the learned model every N frames (default: 1)")
+    parser.add_argument("--smoothing", choices=SMOOTHING_MODES, default='none',
+                        help="Per-track status smoothing: 'vote', 'ema' or 'none' (default: none)")
+    parser.add_argument("--smoothing-window", type=int, default=SMOOTHING_WINDOW,
+                        help=f"Frames in the 'vote' window (default: {SMOOTHING_WINDOW})")
+    parser.add_argument("--smoothing-alpha", type=float, default=SMOOTHING_ALPHA,
+                        help=f"Weight of the newest frame for 'ema' (default: {SMOOTHING_ALPHA})")
+    parser.add_argument("--track-ttl", type=float, default=TRACK_TTL_SECS,
+                        help=f"Seconds before an unseen track's history is dropped (default: {TRACK_TTL_SECS})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = args.output or os.path.join(
+        REPLAY_DIRECTORY, os.path.splitext(os.path.basename(os.path.normpath(args.sources[0])))[0] + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    make_classifier = classifier_factory(args.classifier, args.model_file, args.predict_every)
+    make_filter = status_filter_factory(args.smoothing, args.smoothing_window, args.smoothing_alpha)
+
+    runs = []
+    for source_path in args.sources:
+        source = ReplaySource(source_path, args.fps, args.start_time)
+        # A fresh backend per source, so tracker state does not carry over between recordings
+        backend = create_backend(args.backend, model_path=args.model, onnx_path=args.onnx_model,
+                                 threads=args.threads, provider=args.onnx_provider)
+        log_file = os.path.splitext(output)[0] + f"_{len(runs)}.csv"
+        for path in (log_file, timeline_path(log_file), open_interval_path(timeline_path(log_file))):
+            if os.path.exists(path):
+                os.remove(path) # Every run starts from an empty session log
+        classroom = ClassroomStream(name=os.path.basename(os.path.normpath(source_path)), log_file=log_file,
+                                    track_ttl_secs=args.track_ttl, classifier=make_classifier(),
+                                    status_filter=make_filter() if make_filter is not None else None)
+
+        print(f"Replaying {source_path} at {source.fps:.1f} simulated fps...")
+        start = time.perf_counter()
+        try:
+            latencies, frames, engagement = replay(source, backend, classroom, args.max_frames,
+                                                   not args.no_render, args.realtime, args.warmup)
+        finally:
+            source.release()
+        wall_secs = time.perf_counter() - start
+
+        runs.append({
+            "source": source_path,
+            "frames": frames,
+            "simulated_fps": source.fps,
+            "wall_secs": round(wall_secs, 3),
+            "fps": round(frames / wall_secs, 2) if wall_secs > 0 else 0.0,
+            "latency": {stage: latency_summary(samples) for stage, samples in latencies.items()},
+            "engagement": engagement,
+        })
+        print(f"  {frames} frames in {wall_secs:.1f} s ({runs[-1]['fps']:.1f} fps), "
+              f"frame p95 {runs[-1]['latency']['frame']['p95_ms']:.1f} ms")
+
+    peak_mb = peak_rss_mb()
+    report = {
+        "revision": git_revision(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("sources", "output")},
+        "peak_mb": round(peak_mb, 1) if peak_mb is not None else None,
+        "runs": runs,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
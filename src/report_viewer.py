@@ -1,6 +1,7 @@
 import streamlit as st
-import pandas as pd
 import os
+from session_store import SessionStore, STORE_FILE
+from session import LOG_DIRECTORY
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -8,35 +9,79 @@ st.set_page_config(
     layout="wide"
 )
 
-# --- Constants ---
-LOG_DIRECTORY = 'data'
-LOG_FILE = os.path.join(LOG_DIRECTORY, 'session_log.csv')
+ALL_ROOMS = "All rooms"
+
+
+# --- Cached Queries ---
+# Each query is keyed on the store version, so a rerun only hits SQLite after new data was imported
+@st.cache_data(show_spinner=False)
+def load_query(version, name, *args):
+    import pandas as pd # Imported on first use, so the page header renders before pandas loads
+    store = SessionStore(STORE_FILE)
+    try:
+        return pd.DataFrame(getattr(store, name)(*args))
+    finally:
+        store.close()
+
+
+def import_new_logs():
+    """Pulls anything appended to the session logs into the store and returns the store version."""
+    store = SessionStore(STORE_FILE)
+    try:
+        store.import_logs(LOG_DIRECTORY)
+        return store.version(), store.rooms()
+    finally:
+        store.close()
+
 
 # --- Main App ---
 st.title("Classroom Engagement Session Report")
 st.write("This report displays the summary of all past monitoring sessions.")
 
-# Check if the log file exists
-if os.path.isfile(LOG_FILE):
-    try:
-        # Read the CSV file into a pandas DataFrame
-        df = pd.read_csv(LOG_FILE)
-        
-        st.header("Session Data")
-        
-        # Display the data in an interactive table
-        st.dataframe(df)
-
-        st.header("Engagement Over Time")
-        
-        # Create a simple line chart to visualize trends
-        # We'll use the 'Timestamp' for the x-axis and 'Avg Engagement (%)' for the y-axis
-        st.line_chart(df.rename(columns={'Timestamp': 'index'}).set_index('index')['Avg Engagement (%)'])
-
-    except pd.errors.EmptyDataError:
-        st.warning("The log file is empty. Please run a session in `main.py` to generate data.")
-    except Exception as e:
-        st.error(f"An error occurred while reading the log file: {e}")
+if not os.path.isdir(LOG_DIRECTORY):
+    st.info(f"No session logs found in '{LOG_DIRECTORY}'. Please run a session using `main.py` to create a log.")
+    st.stop()
+
+try:
+    with st.spinner("Importing new session logs..."):
+        version, rooms = import_new_logs()
+except Exception as e:
+    st.error(f"An error occurred while importing the session logs: {e}")
+    st.stop()
+
+if not rooms:
+    st.warning("The session logs are empty. Please run a session in `main.py` to generate data.")
+    st.stop()
+
+selected = st.selectbox("Room", [ALL_ROOMS] + rooms)
+room = None if selected == ALL_ROOMS else selected
+
+st.header("Engagement Over Time")
+period = st.radio("Group by", ["Day", "Week"], horizontal=True)
+if period == "Day":
+    trend = load_query(version, "daily_engagement", room).set_index("day")
 else:
-    st.info(f"No session log file found at '{LOG_FILE}'. Please run a session using `main.py` to create a log.")
+    trend = load_query(version, "weekly_engagement", room).set_index("week")
+st.line_chart(trend["engagement_pct"])
+
+if room is None and len(rooms) > 1:
+    st.header("Rooms")
+    st.dataframe(load_query(version, "room_comparison"))
+
+st.header("Alerts")
+alerts = load_query(version, "alert_counts", room)
+if alerts.empty:
+    st.write("No low-engagement alerts recorded.")
+else:
+    st.bar_chart(alerts.pivot_table(index="day", columns="room", values="alerts", aggfunc="sum"))
+
+st.header("Session Data")
+sessions = load_query(version, "sessions", room)
+st.dataframe(sessions)
 
+timeline_sessions = sessions[sessions["source"] == "timeline"]["session_id"].tolist() if not sessions.empty else []
+if timeline_sessions:
+    st.header("Session Timeline")
+    session_id = st.selectbox("Session", timeline_sessions)
+    timeline = load_query(version, "session_timeline", session_id)
+    st.line_chart(timeline.set_index("time")["engagement_pct"])
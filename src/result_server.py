@@ -0,0 +1,217 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import cv2
+from classifier import STATUS_NAMES
+from dashboard import engagement_percentage
+from instrumentation import metrics
+
+# --- Server Configuration ---
+SERVER_HOST = '127.0.0.1' # Local only; put a reverse proxy in front to expose a node
+SERVER_PORT = 8765
+PREVIEW_FPS = 0.0 # MJPEG preview frames per second; 0 disables the preview
+PREVIEW_WIDTH = 640 # Preview frames are scaled down to this width
+JPEG_QUALITY = 70
+KEEPALIVE_SECS = 15.0 # Comment line sent on idle event streams so proxies keep them open
+
+
+def frame_message(classroom, frame_index, capture_time, stats, tracks):
+    """
+    Builds the message published for one classified frame.
+
+    Args:
+        classroom: The ClassroomStream the frame belongs to.
+        frame_index: Index of the frame from the capture stage.
+        capture_time: Timestamp of the frame in seconds.
+        stats: The frame's dashboard stats from ClassroomStream.classify().
+        tracks: (track_ids, statuses) of the frame; published as [track_id, status_code]
+            pairs, with /meta mapping the codes to STATUS_NAMES.
+    """
+    track_ids, statuses = tracks
+    engagement = engagement_percentage(stats)
+    alert = classroom.dashboard.update_alert(engagement, stats["total_students"], capture_time)
+    return {
+        "stream": classroom.name,
+        "frame": frame_index,
+        "time": round(capture_time, 3),
+        "stats": stats,
+        "engagement": round(engagement, 1),
+        "alert": alert,
+        "tracks": [[int(t), int(s)] for t, s in zip(track_ids, statuses)],
+    }
+
+
+class ResultServer:
+    """
+    Publishes classification results over local HTTP for a remote dashboard.
+
+    Endpoints:
+        /stats        Latest message of every stream, as one JSON object keyed by stream.
+        /events       Server-Sent Events: one compact JSON message per classified frame.
+        /preview.mjpg MJPEG preview of the annotated frames (?stream=name), when enabled.
+        /meta         Stream names and the meaning of the status codes.
+        /metrics      Latest instrumentation snapshot (null while instrumentation is off).
+
+    Publishing only swaps in the newest message and wakes the client threads, so the
+    frame loop never waits on a slow client; a client that falls behind skips ahead.
+    """
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, preview_fps=PREVIEW_FPS,
+                 preview_width=PREVIEW_WIDTH, jpeg_quality=JPEG_QUALITY):
+        self.preview_interval = 1.0 / preview_fps if preview_fps > 0 else None
+        self.preview_width = preview_width
+        self.jpeg_quality = jpeg_quality
+        self.preview_clients = 0
+        self._changed = threading.Condition()
+        self._seq = 0
+        self._latest = {} # {stream: (seq, encoded JSON)}
+        self._previews = {} # {stream: (seq, JPEG bytes)}
+        self._last_preview = {} # {stream: monotonic time of the last encoded preview}
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="result-server", daemon=True)
+
+    @property
+    def address(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        with self._changed:
+            self._changed.notify_all()
+
+    # --- Publishing (frame loop side) ---
+
+    def publish(self, message):
+        encoded = json.dumps(message, separators=(",", ":")).encode("utf-8")
+        with self._changed:
+            self._seq += 1
+            self._latest[message["stream"]] = (self._seq, encoded)
+            self._changed.notify_all()
+
+    def wants_preview(self, stream):
+        """True when a preview client is connected and the stream's next preview frame is due."""
+        if self.preview_interval is None or self.preview_clients == 0:
+            return False
+        return time.monotonic() - self._last_preview.get(stream, 0.0) >= self.preview_interval
+
+    def publish_preview(self, stream, frame):
+        """Scales down and JPEG-encodes an annotated frame for the preview clients."""
+        self._last_preview[stream] = time.monotonic()
+        h, w = frame.shape[:2]
+        if w > self.preview_width:
+            frame = cv2.resize(frame, (self.preview_width, round(h * self.preview_width / w)),
+                               interpolation=cv2.INTER_AREA)
+        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return
+        with self._changed:
+            self._seq += 1
+            self._previews[stream] = (self._seq, jpeg.tobytes())
+            self._changed.notify_all()
+
+    # --- Serving (client thread side) ---
+
+    def _wait_newer(self, source, seq, stream=None):
+        """Blocks until `source` has an entry newer than seq; returns [(seq, payload)] or [] on timeout."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._newer(source, seq, stream), timeout=KEEPALIVE_SECS)
+            return self._newer(source, seq, stream)
+
+    @staticmethod
+    def _newer(source, seq, stream):
+        items = source.values() if stream is None else [source[stream]] if stream in source else []
+        return sorted(item for item in items if item[0] > seq)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass # Keep the console for the pipeline reports
+
+            def _send_json(self, payload):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                try:
+                    if url.path == "/stats":
+                        with server._changed:
+                            parts = [json.dumps(name).encode("utf-8") + b":" + msg
+                                     for name, (_, msg) in server._latest.items()]
+                        self._send_json(b"{" + b",".join(parts) + b"}")
+                    elif url.path == "/meta":
+                        self._send_json(json.dumps({"streams": sorted(server._latest),
+                                                    "status_names": STATUS_NAMES}).encode("utf-8"))
+                    elif url.path == "/metrics":
+                        self._send_json(json.dumps(metrics.last_snapshot).encode("utf-8"))
+                    elif url.path == "/events":
+                        self._stream_events()
+                    elif url.path == "/preview.mjpg" and server.preview_interval is not None:
+                        stream = parse_qs(url.query).get("stream", [None])[0]
+                        self._stream_preview(stream)
+                    else:
+                        self.send_error(404)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass # Client went away
+
+            def _stream_events(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                seq = server._seq
+                while server._thread.is_alive():
+                    items = server._wait_newer(server._latest, seq)
+                    if not items:
+                        self.wfile.write(b": keepalive\n\n")
+                    for item_seq, message in items:
+                        self.wfile.write(b"data: " + message + b"\n\n")
+                        seq = max(seq, item_seq)
+                    self.wfile.flush()
+
+            def _stream_preview(self, stream):
+                if stream is None:
+                    stream = next(iter(server._latest), None)
+                self.send_response(200)
+                self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                with server._changed:
+                    server.preview_clients += 1
+                try:
+                    seq = 0
+                    while server._thread.is_alive():
+                        items = server._wait_newer(server._previews, seq, stream)
+                        for item_seq, jpeg in items[-1:]:
+                            self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                                             + str(len(jpeg)).encode() + b"\r\n\r\n" + jpeg + b"\r\n")
+                            self.wfile.flush()
+                            seq = item_seq
+                finally:
+                    with server._changed:
+                        server.preview_clients -= 1
+
+        return Handler
+
+
+def start_result_server(args):
+    """Starts a ResultServer from the --host/--port/--preview-* options of main.py."""
+    server = ResultServer(args.host, args.port, args.preview_fps, args.preview_width)
+    server.start()
+    print(f"Headless mode: publishing results at {server.address}/events and {server.address}/stats"
+          + (f", preview at {server.address}/preview.mjpg" if args.preview_fps > 0 else ""))
+    return server
@@ -0,0 +1,351 @@
+import csv
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+# --- Session Logging Setup ---
+LOG_DIRECTORY = 'data'
+LOG_FILE = os.path.join(LOG_DIRECTORY, 'session_log.csv')
+TIMELINE_SUFFIX = '.timeline.jsonl'
+OPEN_INTERVAL_SUFFIX = '.open.json'
+TIMELINE_INTERVAL_SECS = 5.0 # Length of each aggregated timeline record
+TIMELINE_FSYNC_SECS = 5.0 # How often the background writer forces the timeline onto disk
+PARTIAL_RECORD_SECS = 1.0 # How often the open interval is saved to the sidecar file, which bounds what a crash loses
+
+STATUS_KEYS = ("attentive", "writing", "inattentive", "sleeping")
+
+
+def timeline_path(log_file=LOG_FILE):
+    """The timeline that belongs to a session log: data/session_log.csv -> data/session_log.timeline.jsonl"""
+    return os.path.splitext(log_file)[0] + TIMELINE_SUFFIX
+
+
+def open_interval_path(timeline_file):
+    """The sidecar that holds a timeline's open interval: data/session_log.timeline.jsonl -> data/session_log.timeline.open.json"""
+    return os.path.splitext(timeline_file)[0] + OPEN_INTERVAL_SUFFIX
+
+
+def write_open_interval(path, record):
+    """Replaces the sidecar with `record`, so a crash leaves either the old or the new one."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(record, f)
+    os.replace(tmp_path, path)
+
+
+def read_open_interval(path):
+    """Returns the record in the sidecar, or None if there is none."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def summary_row(totals, total_frames, duration_secs, timestamp=None):
+    """
+    Averages per-status totals into the row written to the session log.
+
+    Returns:
+        A dictionary keyed by log column, or None if nobody was classified.
+    """
+    total_classifications = sum(totals.values())
+    if total_frames == 0 or total_classifications == 0:
+        return None
+
+    avg_attentive_pct = (totals["attentive"] / total_classifications) * 100
+    avg_inattentive_pct = (totals["inattentive"] / total_classifications) * 100
+    avg_writing_pct = (totals["writing"] / total_classifications) * 100
+    avg_sleeping_pct = (totals["sleeping"] / total_classifications) * 100
+    total_engaged_classifications = totals["attentive"] + totals["writing"]
+    avg_overall_engagement_pct = (total_engaged_classifications / total_classifications) * 100
+
+    return {
+        "Timestamp": (timestamp or datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
+        "Duration (s)": f"{duration_secs:.1f}",
+        "Avg Engagement (%)": f"{avg_overall_engagement_pct:.1f}",
+        "Attentive (%)": f"{avg_attentive_pct:.1f}",
+        "Writing (%)": f"{avg_writing_pct:.1f}",
+        "Inattentive (%)": f"{avg_inattentive_pct:.1f}",
+        "Sleeping (%)": f"{avg_sleeping_pct:.1f}"
+    }
+
+
+def summarize_intervals(intervals):
+    """Sums timeline interval records into (totals, total_frames)."""
+    totals = dict.fromkeys(STATUS_KEYS, 0)
+    total_frames = 0
+    for record in intervals:
+        for key in STATUS_KEYS:
+            totals[key] += record[key]
+        total_frames += record["frames"]
+    return totals, total_frames
+
+
+def append_summary(log_file, log_data):
+    """Appends one summary row to the session log, writing the header for a new file."""
+    os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+    file_exists = os.path.isfile(log_file)
+    with open(log_file, 'a', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=log_data.keys())
+        if not file_exists:
+            writer.writeheader()
+        writer.writerow(log_data)
+
+
+class TimelineWriter(threading.Thread):
+    """
+    Appends timeline records to a JSON Lines file from a background thread.
+
+    Each record is one line, flushed as soon as it is written and fsynced at most
+    every `fsync_secs`, so a crash loses at most the last few seconds. A line cut
+    short by a crash is skipped by read_timeline(). "partial" records of the open
+    interval are not appended: each one replaces the sidecar file instead, which is
+    removed again once the session's end marker is written.
+    """
+    def __init__(self, path, fsync_secs=TIMELINE_FSYNC_SECS):
+        super().__init__(name="timeline-writer", daemon=True)
+        self.path = path
+        self.open_interval_file = open_interval_path(path)
+        self.fsync_secs = fsync_secs
+        self.error = None
+        self._queue = queue.Queue()
+
+    def write(self, record):
+        self._queue.put(record)
+
+    def close(self):
+        """Writes everything still queued and waits for the file to be synced."""
+        self._queue.put(None)
+        self.join()
+
+    def run(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                last_sync = time.monotonic()
+                ended = False
+                while True:
+                    record = self._queue.get()
+                    if record is not None and record["type"] == "partial":
+                        write_open_interval(self.open_interval_file, record)
+                        continue
+                    if record is not None:
+                        f.write(json.dumps(record) + "\n")
+                        f.flush()
+                    if record is None or time.monotonic() - last_sync >= self.fsync_secs:
+                        os.fsync(f.fileno())
+                        last_sync = time.monotonic()
+                    if record is None:
+                        if ended and os.path.exists(self.open_interval_file):
+                            os.remove(self.open_interval_file) # Only once the end marker is synced
+                        return
+                    ended = ended or record["type"] == "end"
+        except OSError as e:
+            self.error = e
+
+
+def read_timeline(path):
+    """
+    Returns {session_id: {"start": record, "intervals": [...], "partial": record or None,
+    "end": record or None}} in file order. The partial record is the one left in the
+    open interval sidecar, or the latest one in the file for timelines that have them.
+    """
+    sessions = {}
+    partial = read_open_interval(open_interval_path(path))
+    if not os.path.isfile(path):
+        return sessions
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue # Torn final line from a crash
+            session = sessions.setdefault(record["session"],
+                                          {"start": None, "intervals": [], "partial": None, "end": None})
+            if record["type"] == "interval":
+                session["intervals"].append(record)
+            else:
+                session[record["type"]] = record
+    if partial is not None and partial.get("session") in sessions:
+        sessions[partial["session"]]["partial"] = partial
+    return sessions
+
+
+def recover_sessions(log_file=LOG_FILE):
+    """
+    Writes the summary row of every session in the timeline that never ended, e.g.
+    because the program crashed, and marks it as ended. The interval that was still
+    open is rebuilt from the partial record in the sidecar and written as a finished
+    one, so the session ends at the last partial record rather than at the last full
+    interval. Returns the number recovered.
+    """
+    path = timeline_path(log_file)
+    unfinished = [(sid, s) for sid, s in read_timeline(path).items()
+                  if s["end"] is None and (s["intervals"] or s["partial"])]
+    if not unfinished:
+        if os.path.exists(open_interval_path(path)):
+            os.remove(open_interval_path(path)) # Left behind by a session that did end
+        return 0
+
+    with open(path, 'a', encoding='utf-8') as f:
+        for session_id, session in unfinished:
+            intervals, partial = session["intervals"], session["partial"]
+            if partial is not None and (not intervals or partial["t0"] >= intervals[-1]["t1"]):
+                last = dict(partial, type="interval")
+                if last["frames"]:
+                    intervals = intervals + [last]
+                    f.write(json.dumps(last) + "\n")
+                end = last["t1"]
+            else:
+                end = intervals[-1]["t1"]
+            start = session["start"]["time"] if session["start"] else (intervals or [partial])[0]["t0"]
+            totals, total_frames = summarize_intervals(intervals)
+            log_data = summary_row(totals, total_frames, end - start, datetime.fromtimestamp(end))
+            if log_data is not None:
+                append_summary(log_file, log_data)
+            f.write(json.dumps({"type": "end", "session": session_id, "time": end, "recovered": True}) + "\n")
+    if os.path.exists(open_interval_path(path)):
+        os.remove(open_interval_path(path))
+    return len(unfinished)
+
+
+class SessionStats:
+    """
+    Per-frame student counts over one monitoring session, aggregated into fixed intervals.
+
+    Intervals are aligned to start_time + k * interval_secs and closed when a frame
+    at or past their end arrives, whether or not anybody is in it, so a stretch with
+    nobody in view leaves a gap instead of stretching the interval before it. Callers
+    report such frames with advance().
+
+    With a timeline file, every finished interval is handed to a background
+    TimelineWriter, along with a partial record of the open interval every
+    PARTIAL_RECORD_SECS, which the writer keeps in a single sidecar file. The end-of-session summary is computed from the same interval
+    records, so a session cut short can be rebuilt with recover_sessions().
+    """
+    def __init__(self, start_time=None, timeline_file=None, interval_secs=TIMELINE_INTERVAL_SECS):
+        self.start_time = time.time() if start_time is None else start_time
+        self.session_id = uuid.uuid4().hex[:12]
+        self.timeline_file = timeline_file
+        self.interval_secs = interval_secs
+        self.intervals = [] # Finished interval records
+        self._writer = None
+        self._last_partial = None
+        self._open_interval(None)
+
+    def _open_interval(self, t0):
+        self._current = dict.fromkeys(STATUS_KEYS, 0)
+        self._current["frames"] = 0
+        self._current_start = t0
+
+    def _record(self, record_type, t1):
+        classified = sum(self._current[key] for key in STATUS_KEYS)
+        engaged = self._current["attentive"] + self._current["writing"]
+        return {"type": record_type, "session": self.session_id, "t0": self._current_start, "t1": t1,
+                **self._current,
+                "engagement_pct": round(engaged / classified * 100, 1) if classified else None}
+
+    def _close_interval(self, t1):
+        if self._current["frames"] == 0:
+            return
+        record = self._record("interval", t1)
+        self.intervals.append(record)
+        self._emit(record)
+
+    def _emit(self, record):
+        if self.timeline_file is None:
+            return
+        if self._writer is None:
+            self._writer = TimelineWriter(self.timeline_file)
+            self._writer.start()
+            self._writer.write({"type": "start", "session": self.session_id, "time": self.start_time})
+        self._writer.write(record)
+
+    @property
+    def totals(self):
+        totals, _ = summarize_intervals(self.intervals + [self._current])
+        return totals
+
+    @property
+    def total_frames(self):
+        return sum(record["frames"] for record in self.intervals) + self._current["frames"]
+
+    def advance(self, now=None):
+        """
+        Moves the session clock to `now` without adding a frame, e.g. for a frame with
+        nobody in view: closes the open interval at its end boundary if `now` is past it.
+        """
+        now = time.time() if now is None else now
+        self._roll(now)
+        self._write_partial(now)
+
+    def _roll(self, now):
+        if self._current_start is None:
+            self._current_start = self._boundary(now)
+        elif now - self._current_start >= self.interval_secs:
+            self._close_interval(self._current_start + self.interval_secs)
+            self._open_interval(self._boundary(now))
+
+    def _boundary(self, now):
+        """Start of the interval that contains `now`."""
+        if now < self.start_time:
+            return now
+        return self.start_time + (now - self.start_time) // self.interval_secs * self.interval_secs
+
+    def _write_partial(self, now):
+        if self.timeline_file is None:
+            return
+        if self._last_partial is None or now - self._last_partial >= PARTIAL_RECORD_SECS:
+            self._last_partial = now
+            self._emit(self._record("partial", now))
+
+    def add(self, stats, now=None):
+        """Adds one frame's dashboard stats to the current interval."""
+        now = time.time() if now is None else now
+        self._roll(now)
+
+        self._current["attentive"] += stats["attentive_count"]
+        self._current["inattentive"] += stats["inattentive_count"]
+        self._current["writing"] += stats["writing_count"]
+        self._current["sleeping"] += stats["sleeping_count"]
+        self._current["frames"] += 1
+        self._write_partial(now)
+
+    def summary(self, end_time=None):
+        """
+        Averages the session's interval records into the row written to the session log.
+
+        Returns:
+            A dictionary keyed by log column, or None if nobody was classified.
+        """
+        end_time = time.time() if end_time is None else end_time
+        totals, total_frames = summarize_intervals(self.intervals + [self._current])
+        return summary_row(totals, total_frames, end_time - self.start_time, datetime.fromtimestamp(end_time))
+
+    def close(self, end_time=None):
+        """Flushes the open interval and the end marker to the timeline and stops the writer."""
+        end_time = time.time() if end_time is None else end_time
+        self._close_interval(end_time)
+        self._open_interval(end_time)
+        if self._writer is not None:
+            self._writer.write({"type": "end", "session": self.session_id, "time": end_time})
+            self._writer.close()
+            if self._writer.error is not None:
+                print(f"Error writing session timeline {self.timeline_file}: {self._writer.error}")
+            self._writer = None
+
+    def save(self, log_file=LOG_FILE, end_time=None):
+        """Appends the session summary as one row to the log file, then closes the timeline.
+        Returns True if a row was written."""
+        end_time = time.time() if end_time is None else end_time
+        log_data = self.summary(end_time)
+        if log_data is not None:
+            append_summary(log_file, log_data)
+        # The end marker goes last: a crash before it leaves the session for recover_sessions()
+        self.close(end_time)
+        return log_data is not None
@@ -0,0 +1,351 @@
+import argparse
+import csv
+import glob
+import io
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from session import LOG_DIRECTORY, TIMELINE_SUFFIX
+
+# --- Store Configuration ---
+STORE_FILE = os.path.join(LOG_DIRECTORY, 'sessions.db')
+DEFAULT_ROOM = 'camera' # Room of the single-camera log, data/session_log.csv
+# A CSV summary row whose start (Timestamp - Duration) is this close to a timeline session's start
+# describes that session. Both are taken from the same start time; the CSV loses the fraction of a
+# second of its Timestamp and rounds Duration to 0.1 s. Unlike the end, the start does not depend on
+# when the last interval was closed.
+SAME_SESSION_SECS = 1.5
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    room TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    duration_secs REAL NOT NULL,
+    engagement_pct REAL,
+    attentive_pct REAL,
+    writing_pct REAL,
+    inattentive_pct REAL,
+    sleeping_pct REAL,
+    alerts INTEGER,
+    finished INTEGER NOT NULL DEFAULT 1,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_room_start ON sessions (room, start_ts);
+CREATE INDEX IF NOT EXISTS sessions_start ON sessions (start_ts);
+CREATE INDEX IF NOT EXISTS sessions_room_end ON sessions (room, end_ts);
+
+CREATE TABLE IF NOT EXISTS intervals (
+    session_id TEXT NOT NULL,
+    room TEXT NOT NULL,
+    t0 REAL NOT NULL,
+    t1 REAL NOT NULL,
+    attentive INTEGER NOT NULL,
+    writing INTEGER NOT NULL,
+    inattentive INTEGER NOT NULL,
+    sleeping INTEGER NOT NULL,
+    frames INTEGER NOT NULL,
+    engagement_pct REAL,
+    PRIMARY KEY (session_id, t0)
+);
+CREATE INDEX IF NOT EXISTS intervals_room_t0 ON intervals (room, t0);
+CREATE INDEX IF NOT EXISTS intervals_t0 ON intervals (t0);
+
+-- Per room and day, maintained on import so the viewer never scans raw sessions
+CREATE TABLE IF NOT EXISTS daily (
+    room TEXT NOT NULL,
+    day TEXT NOT NULL,
+    sessions INTEGER NOT NULL,
+    total_secs REAL NOT NULL,
+    engagement_pct REAL,
+    alerts INTEGER NOT NULL,
+    PRIMARY KEY (room, day)
+);
+
+-- How far each log file has been imported
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL,
+    imported_at REAL NOT NULL
+);
+"""
+
+
+def room_for_file(path):
+    """data/session_log.csv -> 'camera', data/session_log_room12.timeline.jsonl -> 'room12'."""
+    base = os.path.basename(path)
+    base = base[:-len(TIMELINE_SUFFIX)] if base.endswith(TIMELINE_SUFFIX) else os.path.splitext(base)[0]
+    return base[len("session_log_"):] if base.startswith("session_log_") else DEFAULT_ROOM
+
+
+def _day(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+
+
+def count_alerts(intervals, threshold=None, min_secs=None):
+    """
+    Counts runs of consecutive low-engagement intervals lasting longer than min_secs, like
+    the dashboard alert. The thresholds default to the dashboard's own.
+    """
+    if threshold is None or min_secs is None:
+        # Imported here so opening the store does not load OpenCV and NumPy with the dashboard
+        from dashboard import ALERT_ENGAGEMENT_THRESHOLD, ALERT_TIME_THRESHOLD_SECS
+        threshold = ALERT_ENGAGEMENT_THRESHOLD if threshold is None else threshold
+        min_secs = ALERT_TIME_THRESHOLD_SECS if min_secs is None else min_secs
+    alerts = 0
+    run_start = None
+    alerted = False
+    for t0, t1, engagement in intervals:
+        if engagement is not None and engagement < threshold:
+            if run_start is None:
+                run_start, alerted = t0, False
+            if not alerted and t1 - run_start > min_secs:
+                alerts += 1
+                alerted = True
+        else:
+            run_start = None
+    return alerts
+
+
+class SessionStore:
+    """
+    SQLite store of session summaries and per-interval timelines from every room.
+
+    Logs are imported incrementally: the byte offset reached in each file is stored,
+    so a re-import only parses lines appended since the last one. A per-room daily
+    rollup is refreshed for the days an import touched, and the report queries read
+    that rollup.
+    """
+    def __init__(self, path=STORE_FILE):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # --- Import ---
+
+    def _read_new_lines(self, path):
+        """Returns (header line, complete lines appended since the last import, new offset)."""
+        row = self.conn.execute("SELECT offset FROM imports WHERE path = ?", (path,)).fetchone()
+        offset = row["offset"] if row else 0
+        with open(path, 'rb') as f:
+            header = f.readline()
+            if os.fstat(f.fileno()).st_size < offset:
+                offset = 0 # The file was truncated or replaced: start over
+            f.seek(offset)
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1] # A line still being written is left for next time
+        return header.decode('utf-8'), complete.decode('utf-8'), offset, offset + len(complete)
+
+    def _mark_imported(self, path, offset):
+        self.conn.execute("INSERT OR REPLACE INTO imports (path, offset, imported_at) VALUES (?, ?, ?)",
+                          (path, offset, time.time()))
+
+    def import_csv(self, path):
+        """Imports summary rows from a session_log CSV. Returns the set of touched (room, day)."""
+        header, text, offset, new_offset = self._read_new_lines(path)
+        if offset == 0:
+            text = text[len(header):]
+        room = room_for_file(path)
+        touched = set()
+        for row in csv.DictReader(io.StringIO(text), fieldnames=next(csv.reader([header]))):
+            try:
+                end_ts = datetime.strptime(row["Timestamp"], TIMESTAMP_FORMAT).timestamp()
+                duration = float(row["Duration (s)"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            # Sessions that also have a timeline are stored from the timeline instead
+            start_ts = end_ts - duration
+            if self.conn.execute("SELECT 1 FROM sessions WHERE room = ? AND source = 'timeline' AND start_ts BETWEEN ? AND ?",
+                                 (room, start_ts - SAME_SESSION_SECS, start_ts + SAME_SESSION_SECS)).fetchone():
+                continue
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL, 1, 'csv')",
+                (f"csv:{room}:{row['Timestamp']}", room, start_ts, end_ts, duration,
+                 float(row["Avg Engagement (%)"]), float(row["Attentive (%)"]), float(row["Writing (%)"]),
+                 float(row["Inattentive (%)"]), float(row["Sleeping (%)"])))
+            touched.add((room, _day(start_ts)))
+        self._mark_imported(path, new_offset)
+        return touched
+
+    def import_timeline(self, path):
+        """Imports interval records from a session timeline. Returns the set of touched (room, day)."""
+        _, text, _, new_offset = self._read_new_lines(path)
+        room = room_for_file(path)
+        changed = {} # {session_id: start time, if known}
+        ended = set()
+        for line in text.splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            session_id = record.get("session")
+            if record.get("type") == "interval":
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO intervals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (session_id, room, record["t0"], record["t1"], record["attentive"], record["writing"],
+                     record["inattentive"], record["sleeping"], record["frames"], record.get("engagement_pct")))
+                changed.setdefault(session_id, None)
+            elif record.get("type") == "start":
+                changed[session_id] = record["time"]
+            elif record.get("type") == "end":
+                changed.setdefault(session_id, None)
+                ended.add(session_id)
+
+        touched = set()
+        for session_id, start_time in changed.items():
+            touched |= self._refresh_timeline_session(session_id, room, start_time, session_id in ended)
+        self._mark_imported(path, new_offset)
+        return touched
+
+    def _refresh_timeline_session(self, session_id, room, start_time, ended):
+        """Recomputes a timeline session's summary row from its intervals."""
+        intervals = self.conn.execute(
+            "SELECT t0, t1, engagement_pct, attentive, writing, inattentive, sleeping FROM intervals "
+            "WHERE session_id = ? ORDER BY t0", (session_id,)).fetchall()
+        if not intervals:
+            return set()
+        existing = self.conn.execute("SELECT start_ts, finished FROM sessions WHERE session_id = ?",
+                                     (session_id,)).fetchone()
+        if start_time is None:
+            start_time = existing["start_ts"] if existing else intervals[0]["t0"]
+        finished = ended or bool(existing and existing["finished"])
+        end_ts = intervals[-1]["t1"]
+
+        totals = [sum(r[key] for r in intervals) for key in ("attentive", "writing", "inattentive", "sleeping")]
+        classified = sum(totals)
+        pcts = [t / classified * 100 if classified else None for t in totals]
+        engagement = (totals[0] + totals[1]) / classified * 100 if classified else None
+        alerts = count_alerts([(r["t0"], r["t1"], r["engagement_pct"]) for r in intervals])
+
+        # A CSV row written for this session is replaced by the timeline's own summary
+        duplicates = []
+        if finished:
+            match = (room, start_time - SAME_SESSION_SECS, start_time + SAME_SESSION_SECS)
+            where = "WHERE room = ? AND source = 'csv' AND start_ts BETWEEN ? AND ?"
+            duplicates = self.conn.execute(f"SELECT start_ts FROM sessions {where}", match).fetchall()
+            self.conn.execute(f"DELETE FROM sessions {where}", match)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'timeline')",
+            (session_id, room, start_time, end_ts, end_ts - start_time, engagement, *pcts, alerts, int(finished)))
+        touched = {(room, _day(start_time))} | {(room, _day(row["start_ts"])) for row in duplicates}
+        if existing:
+            touched.add((room, _day(existing["start_ts"])))
+        return touched
+
+    def _refresh_daily(self, touched):
+        """Rebuilds the daily rollup rows for the given (room, day) pairs."""
+        for room, day in touched:
+            start = datetime.strptime(day, "%Y-%m-%d").timestamp()
+            row = self.conn.execute(
+                "SELECT COUNT(*) AS sessions, COALESCE(SUM(duration_secs), 0) AS total_secs, "
+                "SUM(engagement_pct * duration_secs) / NULLIF(SUM(CASE WHEN engagement_pct IS NOT NULL "
+                "THEN duration_secs END), 0) AS engagement_pct, COALESCE(SUM(alerts), 0) AS alerts "
+                "FROM sessions WHERE room = ? AND start_ts >= ? AND start_ts < ?",
+                (room, start, start + 86400)).fetchone()
+            if row["sessions"]:
+                self.conn.execute("INSERT OR REPLACE INTO daily VALUES (?, ?, ?, ?, ?, ?)",
+                                  (room, day, row["sessions"], row["total_secs"], row["engagement_pct"], row["alerts"]))
+            else:
+                self.conn.execute("DELETE FROM daily WHERE room = ? AND day = ?", (room, day))
+
+    def import_logs(self, directory=LOG_DIRECTORY):
+        """
+        Imports everything appended to the session logs in `directory` since the last call.
+        Timelines go first so their sessions take precedence over the matching CSV rows.
+
+        Returns:
+            The number of (room, day) rollup rows refreshed.
+        """
+        touched = set()
+        with self.conn:
+            for path in sorted(glob.glob(os.path.join(directory, f"session_log*{TIMELINE_SUFFIX}"))):
+                touched |= self.import_timeline(path)
+            for path in sorted(glob.glob(os.path.join(directory, "session_log*.csv"))):
+                touched |= self.import_csv(path)
+            self._refresh_daily(touched)
+        return len(touched)
+
+    # --- Queries ---
+
+    def version(self):
+        """Changes whenever new data is imported; use it as a cache key for the queries below."""
+        row = self.conn.execute("SELECT COALESCE(SUM(offset), 0) AS total, COUNT(*) AS files FROM imports").fetchone()
+        return (row["total"], row["files"])
+
+    def _rows(self, sql, params=()):
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def rooms(self):
+        return [row["room"] for row in self.conn.execute("SELECT DISTINCT room FROM daily ORDER BY room")]
+
+    def sessions(self, room=None, since=None, limit=1000):
+        """Most recent session summaries, newest first."""
+        return self._rows(
+            "SELECT session_id, room, datetime(start_ts, 'unixepoch', 'localtime') AS start, duration_secs, "
+            "engagement_pct, attentive_pct, writing_pct, inattentive_pct, sleeping_pct, alerts, finished, source "
+            "FROM sessions WHERE (:room IS NULL OR room = :room) AND (:since IS NULL OR start_ts >= :since) "
+            "ORDER BY start_ts DESC LIMIT :limit", {"room": room, "since": since, "limit": limit})
+
+    def daily_engagement(self, room=None):
+        """Per-day engagement (duration-weighted), time monitored and alerts, across rooms unless one is given."""
+        return self._rows(
+            "SELECT day, SUM(sessions) AS sessions, SUM(total_secs) AS total_secs, "
+            "SUM(engagement_pct * total_secs) / NULLIF(SUM(CASE WHEN engagement_pct IS NOT NULL "
+            "THEN total_secs END), 0) AS engagement_pct, SUM(alerts) AS alerts "
+            "FROM daily WHERE (:room IS NULL OR room = :room) GROUP BY day ORDER BY day", {"room": room})
+
+    def weekly_engagement(self, room=None):
+        """Like daily_engagement(), grouped by the Monday that starts each week."""
+        return self._rows(
+            "SELECT date(day, 'weekday 0', '-6 days') AS week, SUM(sessions) AS sessions, "
+            "SUM(total_secs) AS total_secs, SUM(engagement_pct * total_secs) / NULLIF(SUM(CASE WHEN "
+            "engagement_pct IS NOT NULL THEN total_secs END), 0) AS engagement_pct, SUM(alerts) AS alerts "
+            "FROM daily WHERE (:room IS NULL OR room = :room) GROUP BY week ORDER BY week", {"room": room})
+
+    def room_comparison(self, since_day=None):
+        """One row per room: sessions, hours monitored, engagement and alerts."""
+        return self._rows(
+            "SELECT room, SUM(sessions) AS sessions, SUM(total_secs) / 3600.0 AS hours, "
+            "SUM(engagement_pct * total_secs) / NULLIF(SUM(CASE WHEN engagement_pct IS NOT NULL "
+            "THEN total_secs END), 0) AS engagement_pct, SUM(alerts) AS alerts "
+            "FROM daily WHERE (:since IS NULL OR day >= :since) GROUP BY room ORDER BY room", {"since": since_day})
+
+    def alert_counts(self, room=None):
+        """Alerts per room and day, for days that had any."""
+        return self._rows(
+            "SELECT room, day, alerts FROM daily WHERE alerts > 0 AND (:room IS NULL OR room = :room) "
+            "ORDER BY day, room", {"room": room})
+
+    def session_timeline(self, session_id):
+        """The per-interval engagement of one session."""
+        return self._rows(
+            "SELECT datetime(t0, 'unixepoch', 'localtime') AS time, engagement_pct, attentive, writing, "
+            "inattentive, sleeping, frames FROM intervals WHERE session_id = ? ORDER BY t0", (session_id,))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import session logs into the SQLite session store.")
+    parser.add_argument("--logs", default=LOG_DIRECTORY, help=f"Directory with session logs (default: {LOG_DIRECTORY})")
+    parser.add_argument("--store", default=STORE_FILE, help=f"SQLite store to update (default: {STORE_FILE})")
+    args = parser.parse_args()
+
+    store = SessionStore(args.store)
+    start = time.perf_counter()
+    refreshed = store.import_logs(args.logs)
+    print(f"Imported logs from '{args.logs}' in {time.perf_counter() - start:.2f} s; "
+          f"{refreshed} daily rollup rows refreshed.")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import numpy as np
+from classifier import NUM_STATUSES
+from track_state import NO_STATUS
+
+# --- Configuration ---
+SMOOTHING_MODES = ('none', 'vote', 'ema')
+SMOOTHING_WINDOW = 15 # Frames in the voting window (half a second at 30 FPS)
+SMOOTHING_ALPHA = 0.2 # Weight of the newest frame for exponential smoothing
+ENTER_THRESHOLD = 0.6 # A new status takes over once it has this share of the evidence...
+EXIT_THRESHOLD = 0.4 # ...or once the current status has dropped to this share, whichever status leads
+
+
+class TemporalStatusFilter:
+    """
+    Smooths each track's per-frame status over time, with enter/exit hysteresis.
+
+    State lives in NumPy arrays indexed by the TrackStateStore slot of each track:
+    a ring buffer of the last `window` statuses plus running per-status counts for
+    majority voting, or per-status exponential scores for 'ema'. One call updates
+    every track in the frame with a few vectorized operations.
+    """
+    def __init__(self, mode='vote', window=SMOOTHING_WINDOW, alpha=SMOOTHING_ALPHA,
+                 enter_threshold=ENTER_THRESHOLD, exit_threshold=EXIT_THRESHOLD, capacity=0):
+        if mode not in ('vote', 'ema'):
+            raise ValueError(f"Unknown smoothing mode '{mode}'. Expected 'vote' or 'ema'.")
+        self.mode = mode
+        self.window = max(1, window)
+        self.alpha = alpha
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = exit_threshold
+        self.capacity = 0
+        self.resize(capacity)
+
+    def resize(self, capacity):
+        """Grows the per-slot arrays; called by TrackStateStore when it adds slots."""
+        old = self.capacity
+        if capacity <= old:
+            return
+
+        def grow(name, shape, dtype, fill):
+            column = np.full(shape, fill, dtype=dtype)
+            if old:
+                column[:old] = getattr(self, name)
+            setattr(self, name, column)
+
+        grow("history", (capacity, self.window), np.int8, NO_STATUS) # Ring buffer of raw statuses
+        grow("position", capacity, np.int32, 0) # Next write index in each ring
+        grow("filled", capacity, np.int32, 0) # How many ring entries are valid
+        grow("counts", (capacity, NUM_STATUSES), np.int16, 0) # Votes per status inside the window
+        grow("scores", (capacity, NUM_STATUSES), np.float32, 0.0) # Exponentially smoothed evidence
+        grow("stable", capacity, np.int8, NO_STATUS) # The smoothed status reported for the track
+        self.capacity = capacity
+
+    def reset(self, slots):
+        """Forgets the history of slots that now belong to new tracks."""
+        self.history[slots] = NO_STATUS
+        self.position[slots] = 0
+        self.filled[slots] = 0
+        self.counts[slots] = 0
+        self.scores[slots] = 0.0
+        self.stable[slots] = NO_STATUS
+
+    def memory_bytes(self):
+        arrays = (self.history, self.position, self.filled, self.counts, self.scores, self.stable)
+        return sum(a.nbytes for a in arrays)
+
+    def update(self, slots, statuses):
+        """
+        Adds one frame of raw statuses and returns the smoothed status of every track.
+
+        Args:
+            slots: Unique TrackStateStore slots of the tracks in this frame.
+            statuses: Raw status codes aligned with slots.
+        """
+        statuses = np.asarray(statuses, dtype=np.int8)
+        rows = np.arange(len(slots))
+
+        # --- Ring buffer and running vote counts ---
+        position = self.position[slots]
+        evicted = self.history[slots, position]
+        had_value = evicted != NO_STATUS
+        self.counts[slots[had_value], evicted[had_value]] -= 1
+        self.history[slots, position] = statuses
+        self.counts[slots, statuses] += 1
+        self.position[slots] = (position + 1) % self.window
+        filled = np.minimum(self.filled[slots] + 1, self.window)
+        self.filled[slots] = filled
+
+        # --- Evidence per status ---
+        if self.mode == 'vote':
+            scores = self.counts[slots] / filled[:, None]
+        else:
+            first_frame = filled == 1
+            scores = self.scores[slots] * (1 - self.alpha)
+            scores[rows, statuses] += self.alpha
+            scores[first_frame] = 0.0
+            scores[first_frame, statuses[first_frame]] = 1.0
+            self.scores[slots] = scores
+
+        # --- Hysteresis ---
+        current = self.stable[slots]
+        new_track = current == NO_STATUS
+        current[new_track] = statuses[new_track]
+        candidate = scores.argmax(axis=1).astype(np.int8)
+        # A status takes over once it holds enter_threshold of the evidence; and once the
+        # current status has dropped to exit_threshold, the leading status takes over even
+        # below enter_threshold, so a track cannot stay on a status nothing supports any more
+        switch = ((candidate != current)
+                  & ((scores[rows, candidate] >= self.enter_threshold)
+                     | (scores[rows, current] <= self.exit_threshold)))
+        current[switch] = candidate[switch]
+        self.stable[slots] = current
+        return current
+
+
+def status_filter_factory(mode='none', window=SMOOTHING_WINDOW, alpha=SMOOTHING_ALPHA):
+    """Returns a function creating one filter per stream, or None when smoothing is off."""
+    if mode == 'none':
+        return None
+    return lambda: TemporalStatusFilter(mode, window, alpha)
@@ -0,0 +1,195 @@
+import json
+import math
+import os
+import numpy as np
+from features import NUM_KEYPOINTS
+from session import LOG_DIRECTORY
+
+# torch, ultralytics and multi_stream are imported where they are used, so main.py can
+# import the tiling options without paying for them at startup.
+
+# --- Tiling Configuration ---
+LAYOUT_DIRECTORY = os.path.join(LOG_DIRECTORY, 'tile_layouts')
+TILE_SIZE = 640 # Target tile edge in frame pixels; matches the model's default input size
+TILE_OVERLAP = 0.2 # Share of a tile shared with its neighbour, so people on a seam appear whole in one tile
+MERGE_IOU = 0.5 # Detections from different tiles overlapping this much are the same person...
+MERGE_IOS = 0.7 # ...as is a detection lying mostly inside another one (a person cut off by a tile edge)
+
+
+def parse_roi(text):
+    """'x0,y0,x1,y1' in fractions of the frame (0-1) -> tuple of floats."""
+    values = tuple(float(v) for v in text.split(","))
+    if len(values) != 4 or not all(0.0 <= v <= 1.0 for v in values) or values[0] >= values[2] or values[1] >= values[3]:
+        raise ValueError(f"Invalid ROI '{text}': expected x0,y0,x1,y1 as fractions of the frame, x0 < x1 and y0 < y1.")
+    return values
+
+
+def _axis_starts(start, length, tile, overlap):
+    """Evenly spaced tile offsets covering [start, start + length) with at least `overlap` shared pixels."""
+    if length <= tile:
+        return [start]
+    count = math.ceil((length - tile) / (tile * (1 - overlap))) + 1
+    step = (length - tile) / (count - 1)
+    return [start + round(i * step) for i in range(count)]
+
+
+def make_layout(frame_width, frame_height, rois=None, tile_size=TILE_SIZE, overlap=TILE_OVERLAP, full_frame=False):
+    """
+    Covers each seating region with overlapping tiles of about tile_size pixels.
+
+    Args:
+        frame_width, frame_height: Size of the camera frames.
+        rois: Seating regions as (x0, y0, x1, y1) fractions of the frame; the whole frame if None.
+        tile_size: Tile edge in frame pixels. Smaller tiles are upscaled more by the model,
+            which helps with distant rows.
+        overlap: Fraction of a tile overlapping its neighbours.
+        full_frame: Also run the whole frame as one tile, for people close to the camera
+            who are larger than a tile.
+
+    Returns:
+        A layout dict: {"frame_size": [w, h], "tiles": [[x0, y0, x1, y1], ...], "params": {...}}.
+
+    Raises:
+        ValueError: If the frame size is not positive, the tile is larger than the frame
+            or the overlap is not a fraction in [0, 1).
+    """
+    if frame_width <= 0 or frame_height <= 0:
+        raise ValueError(f"Invalid frame size {frame_width}x{frame_height}: both sides must be positive.")
+    if not 0 < tile_size <= min(frame_width, frame_height):
+        raise ValueError(f"Invalid tile size {tile_size}: expected a positive size no larger than the "
+                         f"{frame_width}x{frame_height} frame.")
+    if not 0.0 <= overlap < 1.0:
+        raise ValueError(f"Invalid tile overlap {overlap}: expected a fraction of the tile in [0, 1).")
+    tiles = [[0, 0, frame_width, frame_height]] if full_frame else []
+    for x0, y0, x1, y1 in rois or [(0.0, 0.0, 1.0, 1.0)]:
+        left, top = round(x0 * frame_width), round(y0 * frame_height)
+        width, height = round(x1 * frame_width) - left, round(y1 * frame_height) - top
+        tile_w, tile_h = min(tile_size, width), min(tile_size, height)
+        for ty in _axis_starts(top, height, tile_h, overlap):
+            for tx in _axis_starts(left, width, tile_w, overlap):
+                tile = [tx, ty, tx + tile_w, ty + tile_h]
+                if tile not in tiles:
+                    tiles.append(tile)
+    params = {"rois": [list(roi) for roi in rois] if rois else None, "tile_size": tile_size,
+              "overlap": overlap, "full_frame": full_frame}
+    return {"frame_size": [frame_width, frame_height], "tiles": tiles, "params": params}
+
+
+def layout_path(camera, frame_width, frame_height, directory=LAYOUT_DIRECTORY):
+    return os.path.join(directory, f"{camera}_{frame_width}x{frame_height}.json")
+
+
+def load_layout(path):
+    """Reads a layout saved by load_or_create_layout(), possibly hand-tuned; raises ValueError if a tile is empty or outside the frame."""
+    with open(path) as f:
+        layout = json.load(f)
+    width, height = layout["frame_size"]
+    for x0, y0, x1, y1 in layout["tiles"]:
+        if not (0 <= x0 < x1 <= width and 0 <= y0 < y1 <= height):
+            raise ValueError(f"Invalid tile {[x0, y0, x1, y1]} in {path}: not inside the {width}x{height} frame.")
+    return layout
+
+
+def load_or_create_layout(camera, frame_width, frame_height, directory=LAYOUT_DIRECTORY, **layout_args):
+    """
+    Returns the cached tile layout of a camera at this resolution, creating and saving
+    one with make_layout() when there is none or the layout options have changed.
+    The saved tiles can be hand-tuned; they are kept as long as the options stay the same.
+    """
+    path = layout_path(camera, frame_width, frame_height, directory)
+    layout = make_layout(frame_width, frame_height, **layout_args)
+    if os.path.isfile(path):
+        cached = load_layout(path)
+        if cached.get("params") == layout["params"] and cached.get("tiles"):
+            return cached
+
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(layout, f, indent=1)
+    print(f"Saved a {len(layout['tiles'])}-tile layout for {camera} to {path}")
+    return layout
+
+
+def merge_detections(boxes, scores, iou_threshold=MERGE_IOU, ios_threshold=MERGE_IOS):
+    """
+    Greedy non-maximum suppression across tiles.
+
+    A detection is dropped when a higher-scoring one overlaps it by iou_threshold, or
+    covers ios_threshold of the smaller of the two boxes.
+
+    Returns:
+        Indices of the detections to keep, highest score first.
+    """
+    order = np.argsort(-scores)
+    boxes = boxes[order]
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    suppressed = np.zeros(len(boxes), dtype=bool)
+    keep = []
+    for i in range(len(boxes)):
+        if suppressed[i]:
+            continue
+        keep.append(order[i])
+        rest = slice(i + 1, None)
+        iw = np.clip(np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0]), 0, None)
+        ih = np.clip(np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1]), 0, None)
+        inter = iw * ih
+        iou = inter / np.maximum(areas[i] + areas[rest] - inter, 1e-6)
+        ios = inter / np.maximum(np.minimum(areas[i], areas[rest]), 1e-6)
+        suppressed[rest] |= (iou >= iou_threshold) | (ios >= ios_threshold)
+    return np.asarray(keep, dtype=np.intp)
+
+
+class TiledPoseDetector:
+    """
+    Runs YOLO pose on crops of a frame in one batched call and merges the detections.
+
+    Boxes and keypoints are shifted from tile to frame coordinates, duplicates from
+    overlapping tiles are merged, and the result is returned as one full-frame Results
+    object, so tracking, classification and plotting work as with model.predict().
+    """
+    def __init__(self, model, layout, iou_threshold=MERGE_IOU, ios_threshold=MERGE_IOS):
+        self.model = model
+        self.tiles = np.asarray(layout["tiles"], dtype=np.int64)
+        self.iou_threshold = iou_threshold
+        self.ios_threshold = ios_threshold
+
+    def detect(self, frame):
+        crops = [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in self.tiles.tolist()]
+        results = self.model.predict(crops, verbose=False)
+
+        boxes, keypoints = [], []
+        for (x0, y0, _, _), result in zip(self.tiles.tolist(), results):
+            if len(result.boxes) == 0:
+                continue
+            data = result.boxes.data.cpu().numpy().copy() # x1, y1, x2, y2, conf, cls
+            data[:, [0, 2]] += x0
+            data[:, [1, 3]] += y0
+            kp = result.keypoints.data.cpu().numpy().copy() # x, y, conf per keypoint
+            kp[:, :, 0] += x0
+            kp[:, :, 1] += y0
+            boxes.append(data)
+            keypoints.append(kp)
+
+        if boxes:
+            boxes, keypoints = np.concatenate(boxes), np.concatenate(keypoints)
+            keep = merge_detections(boxes[:, :4], boxes[:, 4], self.iou_threshold, self.ios_threshold)
+            boxes, keypoints = boxes[keep], keypoints[keep]
+        else:
+            boxes, keypoints = np.zeros((0, 6), np.float32), np.zeros((0, NUM_KEYPOINTS, 3), np.float32)
+
+        import torch
+        from ultralytics.engine.results import Results
+        return Results(frame, path="", names=self.model.names,
+                       boxes=torch.as_tensor(boxes), keypoints=torch.as_tensor(keypoints))
+
+
+class TiledPoseTracker:
+    """TiledPoseDetector followed by ByteTrack, a drop-in for model.track(frame, persist=True)[0]."""
+    def __init__(self, model, layout, tracker_config=None):
+        from multi_stream import make_tracker, apply_tracker, TRACKER_CONFIG
+        self.detector = TiledPoseDetector(model, layout)
+        self.tracker = make_tracker(tracker_config or TRACKER_CONFIG)
+        self._apply_tracker = apply_tracker
+
+    def track(self, frame):
+        return self._apply_tracker(self.tracker, self.detector.detect(frame))
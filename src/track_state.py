@@ -0,0 +1,186 @@
+import sys
+import numpy as np
+from classifier import INATTENTIVE, SLEEPING, NUM_STATUSES
+
+# --- Configuration ---
+SLEEP_THRESHOLD_SECS = 120.0 # INATTENTIVE for longer than this counts as SLEEPING
+TRACK_TTL_SECS = 30.0 # Forget a track that has not been seen for this long
+EVICT_INTERVAL_SECS = 1.0 # How often stale tracks are swept out
+INITIAL_CAPACITY = 64
+
+NO_STATUS = -1 # Marks a slot whose track has no history yet
+
+
+class TrackStateStore:
+    """
+    Per-track history for the tracked students, stored column-wise in NumPy arrays.
+
+    Each track ID is mapped to a slot; the slot's row in every array holds that
+    track's state. Freed slots are reused, so memory stays proportional to the
+    largest number of tracks seen at once instead of growing with tracker ID churn.
+
+    An optional status filter (see temporal_filter.py) smooths the classifier output
+    per slot before it is recorded, so a single noisy frame does not flip a status
+    or restart the SLEEPING timer.
+    """
+    def __init__(self, ttl_secs=TRACK_TTL_SECS, sleep_threshold_secs=SLEEP_THRESHOLD_SECS,
+                 initial_capacity=INITIAL_CAPACITY, status_filter=None):
+        self.ttl_secs = ttl_secs
+        self.sleep_threshold_secs = sleep_threshold_secs
+        self.status_filter = status_filter
+        self.evictions = 0
+        self._slot_of = {} # {track_id: slot}
+        self._free_slots = []
+        self._last_evict_time = None
+        self._allocate(initial_capacity)
+
+    def _allocate(self, capacity):
+        """Creates (or grows) the column arrays to hold `capacity` tracks."""
+        old_capacity = getattr(self, "capacity", 0)
+        columns = {
+            "track_id": (np.int64, -1),
+            "raw_status": (np.int8, NO_STATUS),    # Per-frame status from the classifier, before smoothing
+            "status": (np.int8, NO_STATUS),        # Per-frame status from the classifier (after smoothing)
+            "shown_status": (np.int8, NO_STATUS),  # Status last reported (may be SLEEPING)
+            "status_since": (np.float64, 0.0),
+            "last_seen": (np.float64, 0.0),
+        }
+        for name, (dtype, fill) in columns.items():
+            column = np.full(capacity, fill, dtype=dtype)
+            if old_capacity:
+                column[:old_capacity] = getattr(self, name)
+            setattr(self, name, column)
+
+        dwell = np.zeros((capacity, NUM_STATUSES), dtype=np.float64) # Seconds spent in each status
+        if old_capacity:
+            dwell[:old_capacity] = self.dwell
+        self.dwell = dwell
+
+        if self.status_filter is not None:
+            self.status_filter.resize(capacity)
+
+        self._free_slots.extend(range(capacity - 1, old_capacity - 1, -1))
+        self.capacity = capacity
+
+    def _slots_for(self, track_ids):
+        """Returns the slot of every track ID, assigning fresh slots to new tracks."""
+        slots = np.empty(len(track_ids), dtype=np.intp)
+        new_slots = []
+        for i, track_id in enumerate(track_ids.tolist()):
+            slot = self._slot_of.get(track_id)
+            if slot is None:
+                if not self._free_slots:
+                    self._allocate(self.capacity * 2)
+                slot = self._free_slots.pop()
+                self._slot_of[track_id] = slot
+                self.track_id[slot] = track_id
+                self.raw_status[slot] = NO_STATUS
+                self.status[slot] = NO_STATUS
+                self.shown_status[slot] = NO_STATUS
+                self.dwell[slot] = 0.0
+                new_slots.append(slot)
+            slots[i] = slot
+        if new_slots and self.status_filter is not None:
+            self.status_filter.reset(new_slots)
+        return slots
+
+    def update(self, track_ids, statuses, now):
+        """
+        Records one frame of classifier output for all visible tracks.
+
+        Args:
+            track_ids: Integer array of tracker IDs in this frame.
+            statuses: Status codes from classify_keypoints(), aligned with track_ids.
+            now: Timestamp of the frame in seconds.
+
+        Returns:
+            The status codes to report, after smoothing when a status filter is set, with
+            long-running INATTENTIVE promoted to SLEEPING.
+        """
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+        statuses = np.asarray(statuses, dtype=np.int8)
+        slots = self._slots_for(track_ids)
+        self.raw_status[slots] = statuses
+        if self.status_filter is not None:
+            statuses = self.status_filter.update(slots, statuses)
+
+        # Credit the time since each track was last seen to the status it was showing
+        shown = self.shown_status[slots]
+        known = shown != NO_STATUS
+        np.add.at(self.dwell, (slots[known], shown[known]), now - self.last_seen[slots[known]])
+
+        changed = self.status[slots] != statuses
+        changed_slots = slots[changed]
+        self.status[changed_slots] = statuses[changed]
+        self.status_since[changed_slots] = now
+
+        final = statuses.copy()
+        asleep = (statuses == INATTENTIVE) & ~changed & (now - self.status_since[slots] > self.sleep_threshold_secs)
+        final[asleep] = SLEEPING
+
+        self.shown_status[slots] = final
+        self.last_seen[slots] = now
+
+        if self._last_evict_time is None or now - self._last_evict_time >= EVICT_INTERVAL_SECS:
+            self.evict(now)
+        return final
+
+    def last_status(self, track_ids, raw=False):
+        """
+        Returns the last recorded (smoothed) status of each track, NO_STATUS for tracks without history.
+        With raw, returns the classifier's status before smoothing instead, which is what to
+        feed back into update() when a classifier reuses its last output.
+        """
+        column = self.raw_status if raw else self.status
+        statuses = np.full(len(track_ids), NO_STATUS, dtype=np.int8)
+        for i, track_id in enumerate(np.asarray(track_ids).tolist()):
+            slot = self._slot_of.get(track_id)
+            if slot is not None:
+                statuses[i] = column[slot]
+        return statuses
+
+    def evict(self, now):
+        """Frees every track not seen for longer than the TTL. Returns the number evicted."""
+        self._last_evict_time = now
+        stale = np.flatnonzero((self.track_id >= 0) & (now - self.last_seen > self.ttl_secs))
+        for slot in stale.tolist():
+            del self._slot_of[int(self.track_id[slot])]
+            self.track_id[slot] = -1
+            self._free_slots.append(slot)
+        self.evictions += len(stale)
+        return len(stale)
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def __contains__(self, track_id):
+        return track_id in self._slot_of
+
+    def get(self, track_id):
+        """Returns a dict with the stored state of one track, or None if it is unknown."""
+        slot = self._slot_of.get(track_id)
+        if slot is None:
+            return None
+        return {
+            "raw_status": int(self.raw_status[slot]),
+            "status": int(self.status[slot]),
+            "shown_status": int(self.shown_status[slot]),
+            "status_since": float(self.status_since[slot]),
+            "last_seen": float(self.last_seen[slot]),
+            "dwell_secs": self.dwell[slot].tolist(),
+        }
+
+    def memory_bytes(self):
+        """Approximate memory held by the store, including the track ID lookup table."""
+        arrays = (self.track_id, self.raw_status, self.status, self.shown_status, self.status_since, self.last_seen, self.dwell)
+        filter_bytes = self.status_filter.memory_bytes() if self.status_filter is not None else 0
+        return (sum(a.nbytes for a in arrays) + filter_bytes
+                + sys.getsizeof(self._slot_of) + sys.getsizeof(self._free_slots))
+
+    def stats(self):
+        return {
+            "active_tracks": len(self),
+            "capacity": self.capacity,
+            "evictions": self.evictions,
+            "memory_bytes": self.memory_bytes(),
+        }
@@ -0,0 +1,38 @@
+import numpy as np
+from classifier import (classify_keypoints, classify_person, count_statuses, ATTENTIVE, WRITING, INATTENTIVE,
+                        NOSE, L_SHOULDER, R_SHOULDER, L_WRIST, L_HIP, R_HIP, NUM_STATUSES)
+
+
+def random_people(n, seed=0):
+    """People with keypoints spread over a small image and confidences either side of the threshold."""
+    rng = np.random.default_rng(seed)
+    kp = np.empty((n, 17, 3), dtype=np.float32)
+    kp[:, :, :2] = rng.uniform(0, 200, size=(n, 17, 2))
+    kp[:, :, 2] = rng.choice([0.2, 0.9], size=(n, 17), p=[0.2, 0.8])
+    return kp
+
+
+def test_vectorized_matches_per_person():
+    kp = random_people(2000)
+    expected = [classify_person(person) for person in kp]
+    assert classify_keypoints(kp).tolist() == expected
+    # The random poses exercise every rule outcome
+    assert set(expected) == {ATTENTIVE, WRITING, INATTENTIVE}
+
+
+def test_head_raised_is_attentive_and_wrist_at_desk_is_writing():
+    kp = np.full((2, 17, 3), 0.9, dtype=np.float32)
+    kp[:, :, 1] = 100
+    kp[:, [L_SHOULDER, R_SHOULDER], 1] = 100
+    kp[:, [L_HIP, R_HIP], 1] = 200
+    kp[0, NOSE, 1] = 50 # Well above the shoulders
+    kp[1, NOSE, 1] = 120 # Head down...
+    kp[1, L_WRIST, 1] = 150 # ...with a wrist between shoulders and hips
+    assert classify_keypoints(kp).tolist() == [ATTENTIVE, WRITING]
+    assert [classify_person(person) for person in kp] == [ATTENTIVE, WRITING]
+
+
+def test_empty_frame():
+    status = classify_keypoints(np.zeros((0, 17, 3), dtype=np.float32))
+    assert status.shape == (0,)
+    assert count_statuses(status).tolist() == [0] * NUM_STATUSES
@@ -0,0 +1,80 @@
+import csv
+import numpy as np
+import pytest
+
+pytest.importorskip("yaml")
+pytest.importorskip("tqdm")
+from data_processor import Checkpoint, CsvRowWriter, HEADER, NUM_KEYPOINTS
+
+
+def keypoints(n, value):
+    return np.full((n, NUM_KEYPOINTS, 3), value, dtype=np.float32)
+
+
+def commit(writer, checkpoint, labels, value, paths):
+    writer.write(labels, keypoints(len(labels), value), paths)
+    writer.flush()
+    checkpoint.mark(paths, writer.count)
+
+
+def read_rows(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_csv_resume_drops_rows_after_last_checkpoint(tmp_path):
+    output = str(tmp_path / "out.csv")
+    checkpoint = Checkpoint(output)
+    checkpoint.open(resume=False)
+    writer = CsvRowWriter(output, resume=False)
+    commit(writer, checkpoint, ["attentive", "writing"], 1.0, ["a.jpg", "b.jpg"])
+    # Crash after the rows were flushed but before their images were marked done,
+    # with half a row of the next batch on disk
+    writer.write(["sleeping"], keypoints(1, 2.0), ["c.jpg"])
+    writer.flush()
+    writer.close()
+    checkpoint.close()
+    with open(output, 'a') as f:
+        f.write("sleeping,0.5,0.")
+
+    resumed = Checkpoint(output)
+    assert resumed.load() == {"a.jpg", "b.jpg"}
+    assert resumed.rows == 2
+    writer = CsvRowWriter(output, resume=True, rows=resumed.rows)
+    assert writer.count == 2
+    resumed.open(resume=True)
+    commit(writer, resumed, ["sleeping"], 2.0, ["c.jpg"])
+    writer.close()
+    resumed.close()
+
+    rows = read_rows(output)
+    assert rows[0] == HEADER
+    assert [row[0] for row in rows[1:]] == ["attentive", "writing", "sleeping"]
+    assert Checkpoint(output).load() == {"a.jpg", "b.jpg", "c.jpg"}
+
+
+def test_csv_resume_without_markers_keeps_complete_lines(tmp_path):
+    output = str(tmp_path / "out.csv")
+    writer = CsvRowWriter(output, resume=False)
+    writer.write(["attentive"], keypoints(1, 1.0), ["a.jpg"])
+    writer.close()
+    with open(output, 'a') as f:
+        f.write("writing,0.5")
+    with open(output + '.manifest', 'w') as f:
+        f.write("a.jpg\n") # Manifest from before row counts were recorded
+
+    checkpoint = Checkpoint(output)
+    assert checkpoint.load() == {"a.jpg"}
+    writer = CsvRowWriter(output, resume=True, rows=checkpoint.rows)
+    writer.close()
+    assert writer.count == 1
+    assert [row[0] for row in read_rows(output)[1:]] == ["attentive"]
+
+
+def test_checkpoint_ignores_paths_of_an_unfinished_batch(tmp_path):
+    output = str(tmp_path / "out.csv")
+    with open(output + '.manifest', 'w') as f:
+        f.write(f"a.jpg\n{Checkpoint.ROWS_MARKER}1\nb.jpg\n")
+    checkpoint = Checkpoint(output)
+    assert checkpoint.load() == {"a.jpg"}
+    assert checkpoint.rows == 1
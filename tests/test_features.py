@@ -0,0 +1,36 @@
+import numpy as np
+import features
+from features import pose_features, NUM_FEATURES, NUM_KEYPOINTS
+
+
+def random_poses(n, seed=0):
+    rng = np.random.default_rng(seed)
+    kp = np.empty((n, NUM_KEYPOINTS, 3), dtype=np.float32)
+    kp[:, :, :2] = rng.uniform(0, 1280, (n, NUM_KEYPOINTS, 2))
+    kp[:, :, 2] = rng.choice([0.2, 0.9], size=(n, NUM_KEYPOINTS), p=[0.2, 0.8])
+    return kp
+
+
+def test_shape_and_empty_batch():
+    assert pose_features(random_poses(5)).shape == (5, NUM_FEATURES)
+    assert pose_features(np.zeros((0, NUM_KEYPOINTS, 3), dtype=np.float32)).shape == (0, NUM_FEATURES)
+
+
+def test_invariant_to_position_and_scale():
+    kp = random_poses(50)
+    kp[:, :, 2] = 0.9 # Without shoulders or hips there is no body scale to normalise by
+    moved = kp.copy()
+    moved[:, :, :2] = moved[:, :, :2] * 2 + 300
+    np.testing.assert_allclose(pose_features(moved), pose_features(kp), atol=1e-4)
+
+
+def test_chunks_match_single_pass(monkeypatch):
+    kp = random_poses(100)
+    expected = pose_features(kp)
+    monkeypatch.setattr(features, "CHUNK_POSES", 7)
+    np.testing.assert_array_equal(pose_features(kp), expected)
+
+
+def test_batch_matches_one_pose_at_a_time():
+    kp = random_poses(20)
+    np.testing.assert_array_equal(pose_features(kp), np.concatenate([pose_features(p[None]) for p in kp]))
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("pandas")
+from sklearn.ensemble import RandomForestClassifier
+from forest_engine import load_compiled_forest
+from model_trainer import export_forest
+
+
+def make_data(rng, n=400, d=12):
+    X = rng.normal(size=(n, d)).astype(np.float32)
+    y = np.where(X[:, 0] + X[:, 1] > 0, "attentive", np.where(X[:, 2] > 0, "writing", "sleeping"))
+    return X, y
+
+
+@pytest.mark.parametrize("max_depth", [None, 4])
+def test_compiled_forest_matches_sklearn(tmp_path, max_depth):
+    rng = np.random.default_rng(0)
+    X, y = make_data(rng)
+    model = RandomForestClassifier(n_estimators=25, max_depth=max_depth, random_state=0).fit(X, y)
+    path = tmp_path / "model.forest.npz"
+    X_check = rng.normal(size=(200, X.shape[1])).astype(np.float32)
+
+    assert export_forest(model, path, X_check)
+    engine = load_compiled_forest(path)
+    assert engine.classes_.tolist() == model.classes_.tolist()
+    np.testing.assert_allclose(engine.predict_proba(X_check), model.predict_proba(X_check), rtol=0, atol=1e-12)
+
+
+def test_compiled_forest_rejects_wrong_width(tmp_path):
+    rng = np.random.default_rng(1)
+    X, y = make_data(rng, d=5)
+    path = tmp_path / "model.forest.npz"
+    export_forest(RandomForestClassifier(n_estimators=3, random_state=0).fit(X, y), path)
+    with pytest.raises(ValueError):
+        load_compiled_forest(path).predict(np.zeros((1, 4), dtype=np.float32))
+
+
+def test_export_keeps_a_mismatched_forest_out_of_place(tmp_path):
+    rng = np.random.default_rng(2)
+    X, y = make_data(rng)
+    model = RandomForestClassifier(n_estimators=3, random_state=0).fit(X, y)
+    model.predict = lambda X: np.full(len(X), "sleeping") # Disagrees with the compiled trees
+    path = tmp_path / "model.forest.npz"
+    assert not export_forest(model, path, X)
+    assert list(tmp_path.iterdir()) == []
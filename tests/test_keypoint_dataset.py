@@ -0,0 +1,86 @@
+import csv
+import os
+import numpy as np
+from keypoint_dataset import (KeypointDatasetWriter, load_keypoint_dataset, export_csv, is_keypoint_dataset,
+                              KEYPOINTS_FILE, LABELS_FILE, SOURCES_FILE)
+
+
+def sample_keypoints(n, num_keypoints=17, seed=0):
+    return np.random.default_rng(seed).random((n, num_keypoints, 3), dtype=np.float32)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "data.kpds")
+    keypoints = sample_keypoints(5)
+    labels = ["attentive", "writing", "attentive", "sleeping", "writing"]
+    sources = [f"img_{i}.jpg" for i in range(5)]
+
+    writer = KeypointDatasetWriter(path)
+    writer.write(labels[:2], keypoints[:2], sources[:2])
+    writer.flush()
+    writer.write(labels[2:], keypoints[2:], sources[2:])
+    writer.close()
+
+    assert is_keypoint_dataset(path)
+    dataset = load_keypoint_dataset(path)
+    assert len(dataset) == 5
+    assert dataset.num_keypoints == 17
+    np.testing.assert_array_equal(dataset.keypoints, keypoints)
+    assert dataset.label_names.tolist() == labels
+    assert dataset.sources == sources
+    assert dataset.feature_matrix().shape == (5, 17 * 3)
+
+
+def test_export_csv_matches_dataset(tmp_path):
+    path = str(tmp_path / "data.kpds")
+    keypoints = sample_keypoints(3, num_keypoints=2)
+    writer = KeypointDatasetWriter(path)
+    writer.write(["a", "b", "a"], keypoints, ["x", "y", "z"])
+    writer.close()
+
+    csv_path = str(tmp_path / "data.csv")
+    export_csv(load_keypoint_dataset(path), csv_path)
+    with open(csv_path, newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['label', 'kp_0_x', 'kp_0_y', 'kp_0_conf', 'kp_1_x', 'kp_1_y', 'kp_1_conf']
+    assert [row[0] for row in rows[1:]] == ["a", "b", "a"]
+    np.testing.assert_allclose(np.array([row[1:] for row in rows[1:]], dtype=np.float32), keypoints.reshape(3, -1))
+
+
+def crash_after_uncommitted_write(path):
+    """Commits 2 samples, then leaves 1 written but uncommitted, as a crashed run would."""
+    writer = KeypointDatasetWriter(path)
+    writer.write(["a", "b"], sample_keypoints(2), ["0.jpg", "1.jpg"])
+    writer.flush()
+    writer.write(["c"], sample_keypoints(1, seed=1), ["2.jpg"])
+    for f in (writer._keypoints, writer._labels, writer._sources):
+        f.flush()
+
+
+def test_resume_trims_uncommitted_samples(tmp_path):
+    path = str(tmp_path / "data.kpds")
+    crash_after_uncommitted_write(path)
+
+    writer = KeypointDatasetWriter(path, resume=True)
+    assert writer.count == 2
+    assert os.path.getsize(os.path.join(path, KEYPOINTS_FILE)) == 2 * 17 * 3 * 4
+    assert os.path.getsize(os.path.join(path, LABELS_FILE)) == 2
+    writer.write(["c"], sample_keypoints(1, seed=2), ["3.jpg"])
+    writer.close()
+
+    dataset = load_keypoint_dataset(path)
+    assert dataset.label_names.tolist() == ["a", "b", "c"]
+    assert dataset.sources == ["0.jpg", "1.jpg", "3.jpg"]
+
+
+def test_resume_trims_to_checkpoint_count(tmp_path):
+    path = str(tmp_path / "data.kpds")
+    writer = KeypointDatasetWriter(path)
+    writer.write(["a", "b", "c"], sample_keypoints(3), ["0.jpg", "1.jpg", "2.jpg"])
+    writer.close()
+
+    KeypointDatasetWriter(path, resume=True, count=1).close()
+    dataset = load_keypoint_dataset(path)
+    assert len(dataset) == 1
+    with open(os.path.join(path, SOURCES_FILE)) as f:
+        assert f.read() == "0.jpg\n"
@@ -0,0 +1,67 @@
+import numpy as np
+from classifier import ATTENTIVE, INATTENTIVE
+from learned_classifier import LearnedClassifier
+from temporal_filter import TemporalStatusFilter
+from track_state import TrackStateStore
+
+
+class FixedModel:
+    """Stands in for a trained model: predicts `label` for everyone."""
+    classes_ = np.array(["ATTENTIVE", "INATTENTIVE"])
+    n_features_in_ = 17 * 3
+
+    def __init__(self):
+        self.label = "ATTENTIVE"
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        proba = np.zeros((len(X), 2))
+        proba[:, list(self.classes_).index(self.label)] = 1.0
+        return proba
+
+
+def test_skipped_frames_reuse_labels_and_predict_new_tracks():
+    model = FixedModel()
+    classifier = LearnedClassifier(model, predict_every=2)
+    store = TrackStateStore()
+    keypoints = np.zeros((2, 17, 3), dtype=np.float32)
+
+    statuses = classifier.classify(keypoints[:1], np.array([1]), store)
+    store.update(np.array([1]), statuses, 0.1)
+    model.label = "INATTENTIVE"
+    statuses = classifier.classify(keypoints, np.array([1, 2]), store) # Skipped frame, track 2 is new
+    assert statuses.tolist() == [ATTENTIVE, INATTENTIVE]
+    assert model.calls == 2
+
+
+def test_features_are_zero_padded_to_the_model_width():
+    model = FixedModel()
+    model.n_features_in_ = 33 * 3 # Trained on the legacy 33-keypoint CSV
+    features = LearnedClassifier(model).build_features(np.ones((2, 17, 3), dtype=np.float32))
+    assert features.shape == (2, 33 * 3)
+    assert features[:, :17 * 3].all() and not features[:, 17 * 3:].any()
+
+
+def test_skipped_frames_reuse_the_raw_prediction():
+    model = FixedModel()
+    classifier = LearnedClassifier(model, predict_every=2)
+    store = TrackStateStore(status_filter=TemporalStatusFilter('vote', window=5, capacity=64))
+    track_ids, keypoints = np.array([7]), np.zeros((1, 17, 3), dtype=np.float32)
+    now = 0.0
+
+    def frame():
+        nonlocal now
+        now += 0.1
+        raw = classifier.classify(keypoints, track_ids, store)
+        return raw, store.update(track_ids, raw, now)
+
+    for _ in range(6):
+        frame()
+    model.label = "INATTENTIVE"
+    raw, shown = frame() # Predicted frame: the vote still shows ATTENTIVE
+    assert raw.tolist() == [INATTENTIVE] and shown.tolist() == [ATTENTIVE]
+    calls = model.calls
+    raw, _ = frame() # Skipped frame: re-feeds the model's INATTENTIVE, not the smoothed ATTENTIVE
+    assert model.calls == calls
+    assert raw.tolist() == [INATTENTIVE]
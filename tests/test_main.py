@@ -0,0 +1,20 @@
+import sys
+import pytest
+import main
+
+
+def parse(monkeypatch, argv):
+    monkeypatch.setattr(sys, "argv", ["main.py"] + argv)
+    return main.parse_args()
+
+
+def test_single_stream_options_are_rejected_with_several_sources(monkeypatch, capsys):
+    with pytest.raises(SystemExit):
+        parse(monkeypatch, ["--source", "a.mp4", "b.mp4", "--drop-policy", "block", "--cpu-budget", "0.5"])
+    assert "--drop-policy, --cpu-budget cannot be used with more than one --source" in capsys.readouterr().err
+
+
+def test_single_stream_options_are_accepted_with_one_source(monkeypatch):
+    args = parse(monkeypatch, ["--source", "a.mp4", "--drop-policy", "block", "--roi", "0,0,1,0.5"])
+    assert args.drop_policy == "block" and args.tiles
+    assert parse(monkeypatch, ["--source", "a.mp4", "b.mp4", "--stats-interval", "2"]).stats_interval == 2
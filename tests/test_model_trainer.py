@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("pandas")
+import model_trainer
+from model_trainer import run_search, select_best
+
+
+def test_search_fits_each_candidate_once_per_fold(monkeypatch):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(120, 6)).astype(np.float32)
+    y = np.where(X[:, 0] > 0, "attentive", "writing")
+    built = []
+    build_estimator = model_trainer.build_estimator
+    monkeypatch.setattr(model_trainer, "build_estimator", lambda *args: built.append(args) or build_estimator(*args))
+
+    grid = {"random_forest": {"n_estimators": [3, 5], "max_depth": [3]}, "logistic_regression": {"C": [1.0]}}
+    best, results = run_search(X, y, grid, folds=3, jobs=1, max_latency_ms=1000.0)
+
+    assert len(built) == 3 * 3 # No extra fit per candidate just to time it
+    assert len(results) == 3 and best in results
+    assert all(r["latency_ms"] > 0 for r in results)
+
+
+def test_select_best_prefers_the_fastest_of_equally_accurate_models():
+    results = [
+        {"name": "slow", "cv_accuracy": 0.95, "latency_ms": 5.0},
+        {"name": "fast", "cv_accuracy": 0.945, "latency_ms": 1.0},
+        {"name": "over_budget", "cv_accuracy": 0.99, "latency_ms": 50.0},
+    ]
+    assert select_best(results, max_latency_ms=10.0)["name"] == "fast"
+    assert select_best(results, max_latency_ms=0.5)["name"] == "fast" # None fits: the fastest wins
@@ -0,0 +1,58 @@
+import csv
+import json
+import os
+from session import SessionStats, open_interval_path, recover_sessions, read_timeline, timeline_path
+
+STATS = {"total_students": 2, "attentive_count": 1, "writing_count": 1, "inattentive_count": 0, "sleeping_count": 0}
+
+
+def test_intervals_close_on_time_boundaries():
+    session = SessionStats(start_time=0.0, interval_secs=5.0)
+    for t in (0.5, 1.0, 3.0):
+        session.add(STATS, t)
+    for t in range(4, 60):
+        session.advance(float(t)) # Nobody in view
+    session.add(STATS, 61.0)
+    session.add(STATS, 66.0)
+
+    assert [(r["t0"], r["t1"], r["frames"]) for r in session.intervals] == [(0.0, 5.0, 3), (60.0, 65.0, 1)]
+
+
+def test_recovery_keeps_the_open_interval(tmp_path):
+    log_file = str(tmp_path / "session_log.csv")
+    session = SessionStats(start_time=1000.0, timeline_file=timeline_path(log_file), interval_secs=5.0)
+    t = 1000.0
+    while t < 1030.0:
+        session.add(STATS, t)
+        t += 0.5
+    session._writer.close() # Crash: the timeline is on disk but has no end marker
+
+    assert recover_sessions(log_file) == 1
+    with open(log_file, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 1
+    assert float(rows[0]["Duration (s)"]) >= 29.0
+    timeline = next(iter(read_timeline(timeline_path(log_file)).values()))
+    assert sum(r["frames"] for r in timeline["intervals"]) >= 58
+    assert timeline["end"]["recovered"]
+    assert recover_sessions(log_file) == 0
+
+
+def test_partial_records_stay_out_of_the_timeline(tmp_path):
+    log_file = str(tmp_path / "session_log.csv")
+    path = timeline_path(log_file)
+    session = SessionStats(start_time=1000.0, timeline_file=path, interval_secs=5.0)
+    for i in range(60):
+        session.add(STATS, 1000.0 + i * 0.5)
+    session._writer.close() # Crash
+    with open(path, encoding='utf-8') as f:
+        types = [json.loads(line)["type"] for line in f]
+    assert types == ["start"] + ["interval"] * 5
+    assert os.path.isfile(open_interval_path(path))
+    recover_sessions(log_file)
+    assert not os.path.exists(open_interval_path(path))
+
+    session = SessionStats(start_time=2000.0, timeline_file=path, interval_secs=5.0)
+    session.add(STATS, 2000.0)
+    session.save(log_file, end_time=2001.0)
+    assert not os.path.exists(open_interval_path(path))
@@ -0,0 +1,55 @@
+import json
+from datetime import datetime
+from session import append_summary, summary_row, timeline_path
+from session_store import SessionStore
+
+START = 1704096000.3
+
+
+def write_timeline(path, session_id, start, intervals, end):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({"type": "start", "session": session_id, "time": start}) + "\n")
+        for t0, t1 in intervals:
+            f.write(json.dumps({"type": "interval", "session": session_id, "t0": t0, "t1": t1, "attentive": 3,
+                                "writing": 1, "inattentive": 0, "sleeping": 0, "frames": 2,
+                                "engagement_pct": 100.0}) + "\n")
+        f.write(json.dumps({"type": "end", "session": session_id, "time": end}) + "\n")
+
+
+def write_csv_row(log_file, start, end):
+    totals = {"attentive": 3, "writing": 1, "inattentive": 0, "sleeping": 0}
+    append_summary(log_file, summary_row(totals, 2, end - start, datetime.fromtimestamp(end)))
+
+
+def test_csv_row_of_a_timeline_session_is_not_duplicated(tmp_path):
+    log_file = str(tmp_path / "session_log.csv")
+    # The CSV row ends 8 s after the timeline's last interval, beyond any end-based window
+    write_timeline(timeline_path(log_file), "abc", START, [(START, START + 5), (START + 5, START + 10)], START + 10)
+    write_csv_row(log_file, START, START + 18.0)
+    # A separate session that only has a CSV row
+    write_csv_row(log_file, START + 3600, START + 3660)
+
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    try:
+        store.import_logs(str(tmp_path))
+        sessions = store.sessions()
+    finally:
+        store.close()
+    assert sorted(s["source"] for s in sessions) == ["csv", "timeline"]
+    assert [s["session_id"] for s in sessions if s["source"] == "timeline"] == ["abc"]
+
+
+def test_timeline_imported_later_replaces_the_csv_row(tmp_path):
+    log_file = str(tmp_path / "session_log.csv")
+    db = str(tmp_path / "sessions.db")
+    write_csv_row(log_file, START, START + 18.0)
+    store = SessionStore(db)
+    try:
+        store.import_logs(str(tmp_path))
+        assert [s["source"] for s in store.sessions()] == ["csv"]
+
+        write_timeline(timeline_path(log_file), "abc", START, [(START, START + 5)], START + 5)
+        store.import_logs(str(tmp_path))
+        assert [s["source"] for s in store.sessions()] == ["timeline"]
+    finally:
+        store.close()
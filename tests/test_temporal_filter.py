@@ -0,0 +1,53 @@
+import numpy as np
+from classifier import ATTENTIVE, WRITING, INATTENTIVE, SLEEPING
+from temporal_filter import TemporalStatusFilter
+
+
+def run(status_filter, statuses):
+    slots = np.array([0])
+    return [int(status_filter.update(slots, [status])[0]) for status in statuses]
+
+
+def test_first_frame_is_reported_as_is():
+    assert run(TemporalStatusFilter('vote', window=5, capacity=1), [SLEEPING]) == [SLEEPING]
+
+
+def test_vote_ignores_single_frame_flicker():
+    status_filter = TemporalStatusFilter('vote', window=5, capacity=1)
+    output = run(status_filter, [ATTENTIVE] * 5 + [INATTENTIVE] + [ATTENTIVE] * 5)
+    assert output == [ATTENTIVE] * 11
+
+
+def test_vote_switches_once_new_status_dominates():
+    status_filter = TemporalStatusFilter('vote', window=10, capacity=1)
+    output = run(status_filter, [ATTENTIVE] * 10 + [INATTENTIVE] * 10)
+    assert output[-1] == INATTENTIVE
+    assert output.index(INATTENTIVE) > 10 # Not on the first contradicting frame
+
+
+def test_vote_does_not_stick_on_unsupported_status():
+    # ATTENTIVE loses all its votes while INATTENTIVE and WRITING split the window 5/5,
+    # so neither reaches the enter threshold
+    status_filter = TemporalStatusFilter('vote', window=10, capacity=1)
+    output = run(status_filter, [ATTENTIVE] * 10 + [INATTENTIVE, WRITING] * 20)
+    assert status_filter.counts[0].tolist() == [0, 5, 5, 0]
+    assert output[-1] in (INATTENTIVE, WRITING)
+    assert ATTENTIVE not in output[-25:]
+
+
+def test_ema_switches_and_tracks_are_independent():
+    status_filter = TemporalStatusFilter('ema', alpha=0.3, capacity=2)
+    slots = np.array([0, 1])
+    for _ in range(20):
+        output = status_filter.update(slots, [ATTENTIVE, SLEEPING])
+    assert output.tolist() == [ATTENTIVE, SLEEPING]
+    for _ in range(20):
+        output = status_filter.update(slots, [WRITING, SLEEPING])
+    assert output.tolist() == [WRITING, SLEEPING]
+
+
+def test_reset_forgets_history():
+    status_filter = TemporalStatusFilter('vote', window=5, capacity=1)
+    run(status_filter, [ATTENTIVE] * 5)
+    status_filter.reset(np.array([0]))
+    assert run(status_filter, [SLEEPING]) == [SLEEPING]
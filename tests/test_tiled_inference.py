@@ -0,0 +1,30 @@
+import json
+import pytest
+from tiled_inference import load_layout, make_layout
+
+
+def test_tiles_cover_the_frame_with_overlap():
+    layout = make_layout(1920, 1080, tile_size=640, overlap=0.2)
+    tiles = layout["tiles"]
+    assert all(x1 - x0 == 640 and y1 - y0 == 640 for x0, y0, x1, y1 in tiles)
+    assert max(x1 for _, _, x1, _ in tiles) == 1920 and max(y1 for _, _, _, y1 in tiles) == 1080
+    assert min(x0 for x0, _, _, _ in tiles) == 0 and min(y0 for _, y0, _, _ in tiles) == 0
+
+
+@pytest.mark.parametrize("frame, args", [
+    ((0, 480), {}),
+    ((640, 480), {"tile_size": 640}), # Taller than the frame
+    ((1920, 1080), {"tile_size": 0}),
+    ((1920, 1080), {"overlap": 1.0}),
+    ((1920, 1080), {"overlap": -0.1}),
+])
+def test_invalid_layout_arguments_are_rejected(frame, args):
+    with pytest.raises(ValueError):
+        make_layout(*frame, **args)
+
+
+def test_hand_edited_tile_outside_the_frame_is_rejected(tmp_path):
+    path = tmp_path / "layout.json"
+    path.write_text(json.dumps({"frame_size": [640, 480], "tiles": [[0, 0, 640, 640]], "params": {}}))
+    with pytest.raises(ValueError):
+        load_layout(str(path))